@@ -0,0 +1,29 @@
+"""
+Gunicorn Configuration for RWA-Studio
+Author: Sowad Al-Mughni
+
+Request handlers spend most of their time waiting on IPFS, Onfido, Stripe
+and the database, so each worker runs a thread pool (gthread) and keeps
+many requests in flight instead of blocking on one.
+"""
+
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))  # Large IPFS uploads
+
+
+def post_worker_init(worker):
+    """Warm provider connection pools in each worker before it takes traffic"""
+    from src.services import warm_connections
+    warm_connections()
+
+
+def worker_exit(server, worker):
+    """Close provider connection pools as the worker shuts down"""
+    from src.services import close_connections
+    close_connections()
@@ -80,6 +80,18 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Server-side cap on a single statement (PostgreSQL only, 0 disables).
+    # Web requests run on gthread workers; a runaway query would otherwise
+    # hold a worker thread and a pooled connection until it finishes.
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    
+    # Connection pool (server databases only). Size for gunicorn threads
+    # plus the transfer agent query pool so requests do not queue on it.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 20))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    
     # ==========================================
     # CORS CONFIGURATION
     # ==========================================
@@ -104,7 +116,7 @@ class Config:
     RATELIMIT_PUBLIC = os.environ.get('RATELIMIT_PUBLIC', '60 per minute')
     RATELIMIT_SENSITIVE = os.environ.get('RATELIMIT_SENSITIVE', '5 per minute')
     RATELIMIT_HEADERS_ENABLED = True
-    RATELIMIT_STRATEGY = 'fixed-window'
+    RATELIMIT_STRATEGY = os.environ.get('RATELIMIT_STRATEGY', 'moving-window')
     
     # ==========================================
     # BLOCKCHAIN CONFIGURATION
@@ -143,6 +155,10 @@ class Config:
     STRIPE_PRICE_PROFESSIONAL = os.environ.get('STRIPE_PRICE_PROFESSIONAL')
     STRIPE_PRICE_ENTERPRISE = os.environ.get('STRIPE_PRICE_ENTERPRISE')
     
+    # HTTP connection pool for Stripe API calls
+    STRIPE_HTTP_POOL_CONNECTIONS = int(os.environ.get('STRIPE_HTTP_POOL_CONNECTIONS', 20))
+    STRIPE_HTTP_POOL_MAXSIZE = int(os.environ.get('STRIPE_HTTP_POOL_MAXSIZE', 50))
+    
     # ==========================================
     # EMAIL SERVICE (SendGrid)
     # ==========================================
@@ -151,6 +167,13 @@ class Config:
     EMAIL_FROM_ADDRESS = os.environ.get('EMAIL_FROM_ADDRESS', 'noreply@rwa-studio.com')
     EMAIL_FROM_NAME = os.environ.get('EMAIL_FROM_NAME', 'RWA-Studio')
     
+    # SendGrid dynamic templates rendered server-side instead of our HTML
+    # (comma-separated template=id pairs, e.g. "welcome=d-123,compliance_alert=d-456")
+    SENDGRID_DYNAMIC_TEMPLATE_IDS = dict(
+        pair.split('=', 1) for pair in os.environ.get('SENDGRID_DYNAMIC_TEMPLATE_IDS', '').split(',')
+        if '=' in pair
+    )
+    
     # ==========================================
     # IPFS STORAGE (Pinata)
     # ==========================================
@@ -160,6 +183,21 @@ class Config:
     PINATA_JWT = os.environ.get('PINATA_JWT')
     IPFS_GATEWAY_URL = os.environ.get('IPFS_GATEWAY_URL', 'https://gateway.pinata.cloud/ipfs')
     
+    # Public gateways raced against IPFS_GATEWAY_URL on reads (comma-separated, empty to disable)
+    IPFS_FALLBACK_GATEWAYS = [
+        url for url in os.environ.get(
+            'IPFS_FALLBACK_GATEWAYS',
+            'https://ipfs.io/ipfs,https://dweb.link/ipfs'
+        ).split(',') if url
+    ]
+    
+    # ==========================================
+    # CACHING (Redis)
+    # ==========================================
+    
+    # Shared cache for immutable IPFS content and hot read paths (optional)
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    
     # ==========================================
     # CELERY (Async Tasks)
     # ==========================================
@@ -23,6 +23,7 @@ from src.config import get_config
 from src.middleware.rate_limit import init_rate_limiter
 from src.middleware.error_handler import init_error_handlers
 from src.middleware.security import init_security_headers
+from src.middleware.json_provider import init_json_provider, json_dumps, json_loads
 
 # Import models and routes
 from src.models.user import db
@@ -62,10 +63,33 @@ app.config['JWT_HEADER_NAME'] = config.JWT_HEADER_NAME
 app.config['JWT_HEADER_TYPE'] = config.JWT_HEADER_TYPE
 app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_DATABASE_URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = config.SQLALCHEMY_TRACK_MODIFICATIONS
+if config.SQLALCHEMY_DATABASE_URI.startswith('postgresql'):
+    engine_options = {
+        'pool_size': config.DB_POOL_SIZE,
+        'max_overflow': config.DB_MAX_OVERFLOW,
+        'pool_timeout': config.DB_POOL_TIMEOUT,
+        'pool_recycle': config.DB_POOL_RECYCLE,
+        'pool_pre_ping': True,
+        # JSONB columns (compliance event metadata) go through orjson, with
+        # the stdlib fallback for integers past 64 bits
+        'json_serializer': json_dumps,
+        'json_deserializer': json_loads,
+    }
+    # Sessions run in UTC so server-side now() matches the naive UTC
+    # timestamps written from Python
+    session_options = '-c timezone=UTC'
+    if config.DB_STATEMENT_TIMEOUT_MS:
+        session_options += f' -c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}'
+    engine_options['connect_args'] = {'options': session_options}
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
 
 # Rate limiting configuration
 app.config['RATELIMIT_STORAGE_URL'] = config.RATELIMIT_STORAGE_URL
 app.config['RATELIMIT_HEADERS_ENABLED'] = config.RATELIMIT_HEADERS_ENABLED
+app.config['RATELIMIT_STRATEGY'] = config.RATELIMIT_STRATEGY
+
+# Use orjson for JSON request/response handling
+init_json_provider(app)
 
 # Initialize security middleware
 init_security_headers(app)
@@ -0,0 +1,101 @@
+"""
+JSON Provider for RWA-Studio
+Author: Sowad Al-Mughni
+
+Replaces Flask's stdlib-json provider with orjson so that jsonify()
+and request.get_json() go through a faster serializer that emits
+bytes directly.
+
+orjson only handles 64-bit integers: it parses larger ones as floats and
+refuses to serialize them. Wei amounts and token metadata routinely go
+past that, so documents holding such integers fall back to stdlib json.
+"""
+
+import json
+import re
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+import orjson
+
+# Any integer orjson might not hold exactly: 19 digits can already
+# overflow a signed 64-bit value. Digit runs inside strings match too,
+# which only costs those documents the slower parser.
+_BIG_INT = re.compile(rb'\d{19,}')
+
+
+def json_loads(s):
+    """Parse JSON with orjson, or stdlib json when it holds a big integer"""
+    data = s.encode('utf-8') if isinstance(s, str) else s
+    if _BIG_INT.search(data):
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+def _fallback_default(obj):
+    """Encode the types orjson handles natively for the stdlib fallback"""
+    if isinstance(obj, orjson.Fragment):
+        return json.loads(obj.contents)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def json_dumps(obj) -> str:
+    """Serialize with orjson, or stdlib json when obj holds a big integer"""
+    try:
+        return orjson.dumps(obj).decode('utf-8')
+    except TypeError:
+        return json.dumps(obj, default=_fallback_default, separators=(',', ':'))
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def _options(self) -> int:
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, **kwargs) -> bytes:
+        """Serialize obj to JSON bytes"""
+        default = kwargs.get('default', self.default)
+        option = self._options()
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            pass
+
+        # Integers past 64 bits; anything truly unserializable fails again here
+        def fallback(o):
+            try:
+                return _fallback_default(o)
+            except TypeError:
+                return default(o)
+
+        indent = 2 if option & orjson.OPT_INDENT_2 else None
+        return json.dumps(
+            obj, default=fallback, sort_keys=self.sort_keys, ensure_ascii=False,
+            indent=indent, separators=None if indent else (',', ':')
+        ).encode('utf-8')
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return json_loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response without the bytes -> str -> bytes round trip"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Install the orjson provider on the app"""
+    app.json_provider_class = OrjsonProvider
+    app.json = OrjsonProvider(app)
+    return app
@@ -0,0 +1,95 @@
+"""
+Keyset Pagination Helpers for RWA-Studio
+Author: Sowad Al-Mughni
+
+Opaque cursors for keyset (seek) pagination. A cursor encodes the sort
+key of the last row on a page, so the next page is fetched with
+WHERE (sort_key, id) < (:cursor_key, :cursor_id) instead of OFFSET.
+"""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from flask import Response, jsonify
+import orjson
+
+from src.middleware.validation import ValidationError
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor.
+
+    datetime values are stored as ISO-8601 strings and restored by
+    decode_cursor().
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return urlsafe_b64encode(orjson.dumps(payload)).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str], *types: type) -> Optional[Tuple]:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Args:
+        cursor: Cursor string from the query string (None/empty for first page)
+        types: Expected type of each value (datetime, int, str)
+
+    Returns:
+        Tuple of decoded values, or None for the first page
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = orjson.loads(urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError('cursor length mismatch')
+        return tuple(
+            datetime.fromisoformat(v) if t is datetime else t(v)
+            for v, t in zip(values, types)
+        )
+    except (ValueError, TypeError) as e:
+        raise ValidationError('Invalid pagination cursor', field='cursor') from e
+
+
+def fetch_page(rows: Iterable, limit: int) -> Tuple[list, bool]:
+    """
+    Read one page from rows that yield up to limit + 1 items.
+
+    Returns the first limit rows and whether the extra one, which only
+    signals that another page follows, was there. The page is read in
+    full, so the body can be built (and any database error raised)
+    before a response is returned and the connection is released.
+    """
+    rows = list(islice(rows, limit + 1))
+    has_more = len(rows) > limit
+    del rows[limit:]
+    return rows, has_more
+
+
+def page_response(
+    key: str,
+    rows: Iterable,
+    limit: int,
+    serialize: Callable[[Any], dict],
+    cursor_of: Callable[[Any], Tuple]
+) -> Response:
+    """
+    JSON response for one keyset page as {key: [...], limit, has_more, next_cursor}.
+
+    rows should yield up to limit + 1 items (see fetch_page()).
+    """
+    rows, has_more = fetch_page(rows, limit)
+    return jsonify({
+        key: [serialize(row) for row in rows],
+        'limit': limit,
+        'has_more': has_more,
+        'next_cursor': encode_cursor(*cursor_of(rows[-1])) if has_more else None
+    })
@@ -51,12 +51,15 @@ def get_rate_limit_key():
     return f"ip:{ip_address}"
 
 
-# Initialize limiter with combined IP + user key function
+# Initialize limiter with combined IP + user key function.
+# Moving window avoids the burst-at-boundary of fixed windows; with Redis
+# storage each hit is a single Lua round-trip (ZADD/ZREMRANGEBYSCORE/ZCARD)
+# shared by all workers.
 limiter = Limiter(
     key_func=get_rate_limit_key,
     default_limits=[os.environ.get('RATELIMIT_DEFAULT', '1000 per minute')],
     storage_uri=os.environ.get('RATELIMIT_STORAGE_URL', 'memory://'),
-    strategy='fixed-window',
+    strategy=os.environ.get('RATELIMIT_STRATEGY', 'moving-window'),
     headers_enabled=True
 )
 
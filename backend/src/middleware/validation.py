@@ -49,6 +49,10 @@ class UnexpectedFieldsError(ValidationError):
 # VALIDATION HELPERS
 # ==========================================
 
+# RFC 5322 compliant email pattern (simplified), compiled once
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+
 def is_valid_email(email: str) -> bool:
     """
     Validate email format.
@@ -58,32 +62,58 @@ def is_valid_email(email: str) -> bool:
     """
     if not email:
         return False
-    # RFC 5322 compliant email pattern (simplified)
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(pattern, email):
-        return False
-    # Additional checks
+    # Cheap checks first: the length cap also bounds regex backtracking
     if len(email) > 254:  # Max email length per RFC
         return False
     if '..' in email:  # No consecutive dots
         return False
-    return True
+    # fullmatch, unlike '$', does not accept a trailing newline
+    return _EMAIL_RE.fullmatch(email) is not None
+
+
+# Translation table that deletes ASCII hex digits; a string is pure hex
+# iff translating it leaves nothing (runs in C, no match object)
+_HEX_DELETE_TABLE = str.maketrans('', '', '0123456789abcdefABCDEF')
+
+
+def _is_prefixed_hex(value: str, digits: int) -> bool:
+    """True if value is '0x' followed by exactly `digits` hex characters"""
+    return (
+        isinstance(value, str)
+        and len(value) == digits + 2
+        and value.startswith('0x')
+        and not value[2:].translate(_HEX_DELETE_TABLE)
+    )
 
 
 def is_valid_ethereum_address(address: str) -> bool:
     """Validate Ethereum address format (0x + 40 hex chars)"""
-    if not address:
-        return False
-    pattern = r'^0x[a-fA-F0-9]{40}$'
-    return bool(re.match(pattern, address))
+    return _is_prefixed_hex(address, 40)
 
 
 def is_valid_tx_hash(tx_hash: str) -> bool:
     """Validate Ethereum transaction hash format (0x + 64 hex chars)"""
-    if not tx_hash:
-        return False
-    pattern = r'^0x[a-fA-F0-9]{64}$'
-    return bool(re.match(pattern, tx_hash))
+    return _is_prefixed_hex(tx_hash, 64)
+
+
+_BOOL_VALUES = {
+    'true': True, '1': True, 'yes': True,
+    'false': False, '0': False, 'no': False,
+}
+
+
+def parse_bool(value: str) -> bool:
+    """
+    Parse a boolean query parameter ('true'/'false', '1'/'0', 'yes'/'no').
+    
+    Meant for request.args.get(name, type=parse_bool): unlike type=bool,
+    'false' parses as False, and unrecognized values raise ValueError so
+    Werkzeug falls back to the default (no filter).
+    """
+    try:
+        return _BOOL_VALUES[value.lower()]
+    except KeyError:
+        raise ValueError(f'Invalid boolean: {value!r}') from None
 
 
 def is_strong_password(password: str) -> bool:
@@ -150,6 +180,46 @@ def sanitize_string(value: str, max_length: int = 1000) -> str:
     return value.strip()[:max_length]
 
 
+def normalize_address(value: str) -> str:
+    """
+    Sanitize and lowercase a hex address.
+    
+    Used as the schema sanitizer for address fields, so handlers receive
+    the canonical (lowercase) form once and compare it against the
+    lowercase values stored in the database without re-normalizing.
+    """
+    return sanitize_string(value, max_length=100).lower()
+
+
+def normalize_email(value: str) -> str:
+    """
+    Sanitize and lowercase an email address.
+    
+    Schema sanitizer for email fields; emails are stored lowercase, so
+    handlers can look them up and save them without re-normalizing.
+    """
+    return sanitize_string(value).lower()
+
+
+# Patterns stripped by sanitize_html(), compiled once. Every one needs a
+# '<', '=' or ':' to match, so text without those is returned untouched.
+_HTML_STRIP_PATTERNS = [
+    # Script tags
+    (re.compile(r'<script[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL), ''),
+    # Event handlers (onclick, onerror, etc.)
+    (re.compile(r'\s*on\w+\s*=\s*["\'][^"\']*["\']', re.IGNORECASE), ''),
+    (re.compile(r'\s*on\w+\s*=\s*\S+', re.IGNORECASE), ''),
+    # javascript: URLs
+    (re.compile(r'javascript\s*:', re.IGNORECASE), ''),
+    # data: URLs (can contain scripts)
+    (re.compile(r'data\s*:[^,]*,', re.IGNORECASE), 'data:removed,'),
+    # iframe tags
+    (re.compile(r'<iframe[^>]*>.*?</iframe>', re.IGNORECASE | re.DOTALL), ''),
+    # object/embed tags
+    (re.compile(r'<(object|embed)[^>]*>.*?</(object|embed)>', re.IGNORECASE | re.DOTALL), ''),
+]
+
+
 def sanitize_html(value: str) -> str:
     """
     Remove potentially dangerous HTML/script content.
@@ -159,19 +229,10 @@ def sanitize_html(value: str) -> str:
     """
     if not isinstance(value, str):
         return str(value)
-    # Remove script tags
-    value = re.sub(r'<script[^>]*>.*?</script>', '', value, flags=re.IGNORECASE | re.DOTALL)
-    # Remove event handlers (onclick, onerror, etc.)
-    value = re.sub(r'\s*on\w+\s*=\s*["\'][^"\']*["\']', '', value, flags=re.IGNORECASE)
-    value = re.sub(r'\s*on\w+\s*=\s*\S+', '', value, flags=re.IGNORECASE)
-    # Remove javascript: URLs
-    value = re.sub(r'javascript\s*:', '', value, flags=re.IGNORECASE)
-    # Remove data: URLs (can contain scripts)
-    value = re.sub(r'data\s*:[^,]*,', 'data:removed,', value, flags=re.IGNORECASE)
-    # Remove iframe tags
-    value = re.sub(r'<iframe[^>]*>.*?</iframe>', '', value, flags=re.IGNORECASE | re.DOTALL)
-    # Remove object/embed tags
-    value = re.sub(r'<(object|embed)[^>]*>.*?</(object|embed)>', '', value, flags=re.IGNORECASE | re.DOTALL)
+    if '<' not in value and '=' not in value and ':' not in value:
+        return value
+    for pattern, replacement in _HTML_STRIP_PATTERNS:
+        value = pattern.sub(replacement, value)
     return value
 
 
@@ -213,6 +274,10 @@ class FieldSchema:
     default: Any = None
     error_message: str = None  # Custom error message for this field
     choices: List[Any] = None
+    
+    def __post_init__(self):
+        # Compile once when the schema is defined, not per request
+        self.regex = re.compile(self.pattern) if self.pattern else None
 
 
 @dataclass
@@ -307,7 +372,7 @@ class RequestSchema:
                     continue
                 
                 # Pattern validation
-                if field_schema.pattern and not re.match(field_schema.pattern, value):
+                if field_schema.regex and not field_schema.regex.match(value):
                     errors.append({
                         'field': field_name,
                         'message': f'{field_name} has invalid format'
@@ -408,6 +473,7 @@ REGISTER_SCHEMA = RequestSchema(
         FieldSchema(
             name='email', 
             max_length=254,
+            sanitizer=normalize_email,
             validator=is_valid_email,
             error_message='Please provide a valid email address'
         ),
@@ -431,7 +497,7 @@ REGISTER_SCHEMA = RequestSchema(
 # Login schema
 LOGIN_SCHEMA = RequestSchema(
     fields=[
-        FieldSchema(name='email', required=False, max_length=254),
+        FieldSchema(name='email', required=False, max_length=254, sanitizer=normalize_email),
         FieldSchema(name='username', required=False, max_length=50),
         FieldSchema(name='password', max_length=128),
     ],
@@ -492,6 +558,7 @@ PROFILE_UPDATE_SCHEMA = RequestSchema(
             name='email', 
             required=False,
             max_length=254,
+            sanitizer=normalize_email,
             validator=is_valid_email
         ),
         FieldSchema(
@@ -506,16 +573,16 @@ PROFILE_UPDATE_SCHEMA = RequestSchema(
 # Token registration schema
 TOKEN_REGISTER_SCHEMA = RequestSchema(
     fields=[
-        FieldSchema(name='token_address', validator=is_valid_ethereum_address),
+        FieldSchema(name='token_address', sanitizer=normalize_address, validator=is_valid_ethereum_address),
         FieldSchema(name='token_name', min_length=1, max_length=100),
         FieldSchema(name='token_symbol', min_length=1, max_length=10, pattern=r'^[A-Z0-9]+$'),
         FieldSchema(name='asset_type', choices=['real_estate', 'equity', 'debt', 'commodity', 'art', 'other']),
         FieldSchema(name='regulatory_framework', choices=['reg_d', 'reg_s', 'reg_a', 'reg_cf', 'mifid_ii', 'other']),
         FieldSchema(name='jurisdiction', min_length=2, max_length=100),
         FieldSchema(name='max_supply', field_type=int, min_value=1, max_value=10**18),
-        FieldSchema(name='deployer_address', validator=is_valid_ethereum_address),
-        FieldSchema(name='compliance_address', validator=is_valid_ethereum_address),
-        FieldSchema(name='identity_registry_address', validator=is_valid_ethereum_address),
+        FieldSchema(name='deployer_address', sanitizer=normalize_address, validator=is_valid_ethereum_address),
+        FieldSchema(name='compliance_address', sanitizer=normalize_address, validator=is_valid_ethereum_address),
+        FieldSchema(name='identity_registry_address', sanitizer=normalize_address, validator=is_valid_ethereum_address),
         FieldSchema(name='deployment_tx_hash', required=False, validator=is_valid_tx_hash),
         FieldSchema(name='description', required=False, max_length=2000, sanitizer=sanitize_html),
         FieldSchema(name='document_hash', required=False, max_length=66, pattern=r'^0x[a-fA-F0-9]{64}$'),
@@ -526,7 +593,7 @@ TOKEN_REGISTER_SCHEMA = RequestSchema(
 # Address verification schema
 ADDRESS_VERIFY_SCHEMA = RequestSchema(
     fields=[
-        FieldSchema(name='address', validator=is_valid_ethereum_address),
+        FieldSchema(name='address', sanitizer=normalize_address, validator=is_valid_ethereum_address),
         FieldSchema(name='verification_level', choices=['basic', 'accredited', 'institutional']),
         FieldSchema(name='jurisdiction', min_length=2, max_length=100),
         FieldSchema(name='expiration_date', required=True),
@@ -540,11 +607,11 @@ ADDRESS_VERIFY_SCHEMA = RequestSchema(
 # Compliance event schema
 COMPLIANCE_EVENT_SCHEMA = RequestSchema(
     fields=[
-        FieldSchema(name='token_address', validator=is_valid_ethereum_address),
+        FieldSchema(name='token_address', sanitizer=normalize_address, validator=is_valid_ethereum_address),
         FieldSchema(name='event_type', choices=['transfer_blocked', 'compliance_check', 'verification_expired', 'limit_exceeded', 'jurisdiction_violation']),
         FieldSchema(name='reason', min_length=1, max_length=1000),
-        FieldSchema(name='from_address', required=False, validator=is_valid_ethereum_address),
-        FieldSchema(name='to_address', required=False, validator=is_valid_ethereum_address),
+        FieldSchema(name='from_address', required=False, sanitizer=normalize_address, validator=is_valid_ethereum_address),
+        FieldSchema(name='to_address', required=False, sanitizer=normalize_address, validator=is_valid_ethereum_address),
         FieldSchema(name='amount', required=False, field_type=int, min_value=0),
         FieldSchema(name='transaction_hash', required=False, validator=is_valid_tx_hash),
         FieldSchema(name='block_number', required=False, field_type=int, min_value=0),
@@ -554,6 +621,21 @@ COMPLIANCE_EVENT_SCHEMA = RequestSchema(
     strict=True
 )
 
+# Batched compliance events; each item is validated with COMPLIANCE_EVENT_SCHEMA
+MAX_COMPLIANCE_EVENT_BATCH = 500
+
+COMPLIANCE_EVENT_BATCH_SCHEMA = RequestSchema(
+    fields=[
+        FieldSchema(
+            name='events',
+            field_type=list,
+            validator=lambda events: 0 < len(events) <= MAX_COMPLIANCE_EVENT_BATCH,
+            error_message=f'events must contain between 1 and {MAX_COMPLIANCE_EVENT_BATCH} items'
+        ),
+    ],
+    strict=True
+)
+
 # Pagination schema (lenient for query params)
 PAGINATION_SCHEMA = RequestSchema(
     fields=[
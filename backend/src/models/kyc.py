@@ -6,9 +6,35 @@ KYC Provider Integration
 """
 
 from src.models.user import db, utc_now
+from sqlalchemy.orm import validates
 from datetime import datetime
 import json
 
+# Statuses that block starting a new verification for the same wallet
+ACTIVE_KYC_STATUSES = ('queued', 'pending', 'in_progress', 'approved')
+_ACTIVE_KYC_FILTER = db.text(
+    "status IN (" + ", ".join(f"'{status}'" for status in ACTIVE_KYC_STATUSES) + ")"
+)
+
+
+def _parse_rejection_reasons(raw):
+    """Decode the JSON rejection_reasons column"""
+    if not raw:
+        return []
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return [raw]
+
+
+def _is_valid(status, expires_at) -> bool:
+    """Approved and not past its expiry"""
+    if status != 'approved':
+        return False
+    if expires_at and expires_at < datetime.utcnow():
+        return False
+    return True
+
 
 class KYCVerification(db.Model):
     """Model for tracking KYC verification status"""
@@ -29,7 +55,7 @@ class KYCVerification(db.Model):
     
     # Verification status
     status = db.Column(db.String(20), nullable=False, default='pending')
-    # pending, in_progress, approved, rejected, requires_review, expired
+    # queued, pending, in_progress, approved, rejected, requires_review, expired, error
     
     # Verification details
     verification_level = db.Column(db.Integer, default=1)  # 1-3
@@ -54,22 +80,48 @@ class KYCVerification(db.Model):
     # Relationship
     user = db.relationship('User', backref=db.backref('kyc_verifications', lazy=True))
     
+    __table_args__ = (
+        # Addresses are stored lowercase so equality lookups hit the indexes
+        db.CheckConstraint('wallet_address = lower(wallet_address)', name='ck_kyc_wallet_lowercase'),
+        # "Existing active verification" lookup in start_verification
+        db.Index(
+            'ix_kyc_active', 'wallet_address',
+            postgresql_where=_ACTIVE_KYC_FILTER, sqlite_where=_ACTIVE_KYC_FILTER
+        ),
+        # Latest verification per address (get_verification_status)
+        db.Index('ix_kyc_wallet_created', wallet_address, created_at.desc()),
+    )
+    
+    @validates('wallet_address')
+    def _lowercase_wallet_address(self, key, value):
+        return value.lower() if value else value
+    
     def __repr__(self):
         return f'<KYCVerification {self.id} - {self.wallet_address} ({self.status})>'
     
     def to_dict(self):
+        return self.row_to_dict(self)
+    
+    @staticmethod
+    def row_to_dict(row):
+        """
+        Serialize anything with the KYC_LIST_COLUMNS attributes.
+        
+        Works for both model instances and the plain Core rows selected by
+        the admin list endpoint, which skip ORM instrumentation.
+        """
         return {
-            'id': self.id,
-            'wallet_address': self.wallet_address,
-            'provider': self.provider,
-            'status': self.status,
-            'verification_level': self.verification_level,
-            'country_code': self.country_code,
-            'rejection_reasons': self.get_rejection_reasons(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
-            'is_valid': self.is_valid(),
+            'id': row.id,
+            'wallet_address': row.wallet_address,
+            'provider': row.provider,
+            'status': row.status,
+            'verification_level': row.verification_level,
+            'country_code': row.country_code,
+            'rejection_reasons': _parse_rejection_reasons(row.rejection_reasons),
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'completed_at': row.completed_at.isoformat() if row.completed_at else None,
+            'expires_at': row.expires_at.isoformat() if row.expires_at else None,
+            'is_valid': _is_valid(row.status, row.expires_at),
         }
     
     def to_public_dict(self):
@@ -86,12 +138,7 @@ class KYCVerification(db.Model):
     
     def get_rejection_reasons(self):
         """Get rejection reasons as list"""
-        if not self.rejection_reasons:
-            return []
-        try:
-            return json.loads(self.rejection_reasons)
-        except json.JSONDecodeError:
-            return [self.rejection_reasons]
+        return _parse_rejection_reasons(self.rejection_reasons)
     
     def set_rejection_reasons(self, reasons: list):
         """Set rejection reasons from list"""
@@ -112,11 +159,7 @@ class KYCVerification(db.Model):
     
     def is_valid(self) -> bool:
         """Check if verification is currently valid"""
-        if self.status != 'approved':
-            return False
-        if self.expires_at and self.expires_at < datetime.utcnow():
-            return False
-        return True
+        return _is_valid(self.status, self.expires_at)
     
     def is_expired(self) -> bool:
         """Check if verification has expired"""
@@ -138,10 +181,25 @@ class KYCVerification(db.Model):
         """Get pending verification for an address"""
         return cls.query.filter(
             cls.wallet_address == wallet_address.lower(),
-            cls.status.in_(['pending', 'in_progress'])
+            cls.status.in_(['queued', 'pending', 'in_progress'])
         ).order_by(cls.created_at.desc()).first()
 
 
+# Columns the admin list endpoint selects (no PII beyond the wallet)
+KYC_LIST_COLUMNS = (
+    KYCVerification.id,
+    KYCVerification.wallet_address,
+    KYCVerification.provider,
+    KYCVerification.status,
+    KYCVerification.verification_level,
+    KYCVerification.country_code,
+    KYCVerification.rejection_reasons,
+    KYCVerification.created_at,
+    KYCVerification.completed_at,
+    KYCVerification.expires_at,
+)
+
+
 class KYCDocument(db.Model):
     """Model for tracking KYC documents uploaded"""
     __tablename__ = 'kyc_documents'
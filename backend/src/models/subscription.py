@@ -6,7 +6,9 @@ Payment Gateway Integration
 """
 
 from src.models.user import db, utc_now
+from sqlalchemy import func
 from datetime import datetime
+from types import MappingProxyType
 
 
 class Subscription(db.Model):
@@ -36,17 +38,17 @@ class Subscription(db.Model):
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=utc_now)
-    updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)
+    updated_at = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
     
     # Relationship
     user = db.relationship('User', backref=db.backref('subscription', uselist=False))
     
-    # Plan token limits
-    PLAN_LIMITS = {
+    # Plan token limits (read-only)
+    PLAN_LIMITS = MappingProxyType({
         'starter': 3,
         'professional': 10,
         'enterprise': 100,
-    }
+    })
     
     def __repr__(self):
         return f'<Subscription {self.id} - {self.plan} ({self.status})>'
@@ -77,7 +79,6 @@ class Subscription(db.Model):
     def increment_token_usage(self):
         """Increment the token usage counter"""
         self.tokens_used += 1
-        self.updated_at = utc_now()
     
     def update_from_stripe(self, subscription_data):
         """Update model from Stripe subscription data"""
@@ -88,7 +89,6 @@ class Subscription(db.Model):
         self.cancel_at_period_end = subscription_data.cancel_at_period_end
         if subscription_data.canceled_at:
             self.canceled_at = datetime.fromtimestamp(subscription_data.canceled_at)
-        self.updated_at = utc_now()
 
 
 class BillingHistory(db.Model):
@@ -116,6 +116,14 @@ class BillingHistory(db.Model):
     paid_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=utc_now)
     
+    # Serves keyset pagination of a subscription's invoices (newest first)
+    __table_args__ = (
+        db.Index(
+            'ix_billing_history_subscription_date_id',
+            subscription_id, invoice_date.desc(), id.desc()
+        ),
+    )
+    
     # Relationship
     subscription = db.relationship('Subscription', backref=db.backref('billing_history', lazy=True))
     
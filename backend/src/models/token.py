@@ -3,9 +3,19 @@ Token model for RWA-Studio Transfer Agent Console
 Author: Sowad Al-Mughni
 """
 
-from src.models.user import db
+from src.models.user import db, insert_ignore_conflicts
+from collections import Counter
 from datetime import datetime
-import json
+from sqlalchemy import Text, cast, func, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+import orjson
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def _metadata_fragment(raw):
+    """Embed event_metadata JSON text as-is when serializing with orjson"""
+    return orjson.Fragment(raw) if raw else None
 
 class TokenDeployment(db.Model):
     """Model for tracking deployed RWA tokens"""
@@ -28,30 +38,53 @@ class TokenDeployment(db.Model):
     description = db.Column(db.Text, nullable=True)
     document_hash = db.Column(db.String(100), nullable=True)  # IPFS hash
     
+    __table_args__ = (
+        # Serves keyset pagination of get_tokens (newest first)
+        db.Index('ix_token_deployments_date_id', deployment_date.desc(), id.desc()),
+        # Same, filtered by is_active; the included columns let the dashboard
+        # distributions over active tokens run as index-only scans
+        db.Index(
+            'ix_token_deployments_active_date_id',
+            is_active, deployment_date.desc(), id.desc(),
+            postgresql_include=['asset_type', 'regulatory_framework']
+        ),
+    )
+    
     # Relationships
     verified_addresses = db.relationship('VerifiedAddress', backref='token_deployment', lazy=True, cascade='all, delete-orphan')
     compliance_events = db.relationship('ComplianceEvent', backref='token_deployment', lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self):
+        return self.row_to_dict(self)
+    
+    @staticmethod
+    def row_to_dict(row):
+        """
+        Serialize anything with the TOKEN_LIST_COLUMNS attributes.
+        
+        Works for both model instances and the plain Core rows selected by
+        the list endpoints. The child counts are deferred COUNT subqueries,
+        so neither path loads the verified address or event collections.
+        """
         return {
-            'id': self.id,
-            'token_address': self.token_address,
-            'token_name': self.token_name,
-            'token_symbol': self.token_symbol,
-            'asset_type': self.asset_type,
-            'regulatory_framework': self.regulatory_framework,
-            'jurisdiction': self.jurisdiction,
-            'max_supply': self.max_supply,
-            'deployer_address': self.deployer_address,
-            'compliance_address': self.compliance_address,
-            'identity_registry_address': self.identity_registry_address,
-            'deployment_tx_hash': self.deployment_tx_hash,
-            'deployment_date': self.deployment_date.isoformat() if self.deployment_date else None,
-            'is_active': self.is_active,
-            'description': self.description,
-            'document_hash': self.document_hash,
-            'verified_addresses_count': len(self.verified_addresses),
-            'compliance_events_count': len(self.compliance_events)
+            'id': row.id,
+            'token_address': row.token_address,
+            'token_name': row.token_name,
+            'token_symbol': row.token_symbol,
+            'asset_type': row.asset_type,
+            'regulatory_framework': row.regulatory_framework,
+            'jurisdiction': row.jurisdiction,
+            'max_supply': row.max_supply,
+            'deployer_address': row.deployer_address,
+            'compliance_address': row.compliance_address,
+            'identity_registry_address': row.identity_registry_address,
+            'deployment_tx_hash': row.deployment_tx_hash,
+            'deployment_date': _isoformat(row.deployment_date),
+            'is_active': row.is_active,
+            'description': row.description,
+            'document_hash': row.document_hash,
+            'verified_addresses_count': row.verified_addresses_count,
+            'compliance_events_count': row.compliance_events_count
         }
 
 class VerifiedAddress(db.Model):
@@ -70,23 +103,48 @@ class VerifiedAddress(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     notes = db.Column(db.Text, nullable=True)
     
-    # Unique constraint to prevent duplicate addresses per token
-    __table_args__ = (db.UniqueConstraint('token_deployment_id', 'address', name='unique_token_address'),)
+    __table_args__ = (
+        # Unique constraint to prevent duplicate addresses per token
+        db.UniqueConstraint('token_deployment_id', 'address', name='unique_token_address'),
+        # Serves keyset pagination of a token's verified addresses (newest first)
+        db.Index(
+            'ix_verified_addresses_token_date_id',
+            token_deployment_id, verification_date.desc(), id.desc()
+        ),
+        # Same, filtered by is_active
+        db.Index(
+            'ix_verified_addresses_token_active_date_id',
+            token_deployment_id, is_active, verification_date.desc(), id.desc()
+        ),
+        # Partial index over active rows only: active-address counts (per
+        # token and dashboard-wide) read just this small index
+        db.Index(
+            'ix_verified_addresses_active_token',
+            token_deployment_id,
+            postgresql_where=is_active.is_(True),
+            sqlite_where=is_active.is_(True)
+        ),
+    )
     
     def to_dict(self):
+        return self.row_to_dict(self)
+    
+    @staticmethod
+    def row_to_dict(row):
+        """Serialize a model instance or a VERIFIED_ADDRESS_COLUMNS row"""
         return {
-            'id': self.id,
-            'token_deployment_id': self.token_deployment_id,
-            'address': self.address,
-            'verification_level': self.verification_level,
-            'jurisdiction': self.jurisdiction,
-            'verification_date': self.verification_date.isoformat() if self.verification_date else None,
-            'expiration_date': self.expiration_date.isoformat() if self.expiration_date else None,
-            'identity_hash': self.identity_hash,
-            'kyc_provider': self.kyc_provider,
-            'is_active': self.is_active,
-            'notes': self.notes,
-            'is_expired': datetime.utcnow() > self.expiration_date if self.expiration_date else False
+            'id': row.id,
+            'token_deployment_id': row.token_deployment_id,
+            'address': row.address,
+            'verification_level': row.verification_level,
+            'jurisdiction': row.jurisdiction,
+            'verification_date': _isoformat(row.verification_date),
+            'expiration_date': _isoformat(row.expiration_date),
+            'identity_hash': row.identity_hash,
+            'kyc_provider': row.kyc_provider,
+            'is_active': row.is_active,
+            'notes': row.notes,
+            'is_expired': datetime.utcnow() > row.expiration_date if row.expiration_date else False
         }
 
 class ComplianceEvent(db.Model):
@@ -107,27 +165,122 @@ class ComplianceEvent(db.Model):
     resolved = db.Column(db.Boolean, default=False)
     resolved_by = db.Column(db.String(42), nullable=True)
     resolved_date = db.Column(db.DateTime, nullable=True)
-    event_metadata = db.Column(db.Text, nullable=True)  # JSON string for additional data
+    # Additional data; JSONB on PostgreSQL, JSON text elsewhere
+    event_metadata = db.Column(
+        db.JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), 'postgresql'),
+        nullable=True
+    )
+    
+    __table_args__ = (
+        # Serves keyset pagination of a token's compliance events (newest first)
+        db.Index(
+            'ix_compliance_events_token_timestamp_id',
+            token_deployment_id, timestamp.desc(), id.desc()
+        ),
+        # Same, filtered by event_type
+        db.Index(
+            'ix_compliance_events_token_type_timestamp_id',
+            token_deployment_id, event_type, timestamp.desc(), id.desc()
+        ),
+        # Partial index over unresolved events only, which should stay a
+        # small fraction of the table: unresolved counts read just these
+        # rows, and the open-events list (resolved=false) pages through it
+        db.Index(
+            'ix_compliance_events_unresolved_token',
+            token_deployment_id, timestamp.desc(), id.desc(),
+            postgresql_where=resolved.is_(False),
+            sqlite_where=resolved.is_(False)
+        ),
+        # Containment/key lookups on event metadata (PostgreSQL only)
+        db.Index(
+            'ix_compliance_events_metadata',
+            event_metadata,
+            postgresql_using='gin'
+        ).ddl_if(dialect='postgresql'),
+    )
     
     def to_dict(self):
+        return self.row_to_dict(self)
+    
+    @staticmethod
+    def row_to_dict(row, raw_metadata=False):
+        """
+        Serialize a model instance or a COMPLIANCE_EVENT_COLUMNS row.
+        
+        Instances carry decoded metadata. COMPLIANCE_EVENT_COLUMNS rows
+        carry it as JSON text, which raw_metadata=True hands to orjson
+        verbatim; only use that for dicts going to the app's JSON provider.
+        """
+        metadata = _metadata_fragment(row.event_metadata) if raw_metadata else row.event_metadata
         return {
-            'id': self.id,
-            'token_deployment_id': self.token_deployment_id,
-            'event_type': self.event_type,
-            'from_address': self.from_address,
-            'to_address': self.to_address,
-            'amount': self.amount,
-            'reason': self.reason,
-            'transaction_hash': self.transaction_hash,
-            'block_number': self.block_number,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
-            'severity': self.severity,
-            'resolved': self.resolved,
-            'resolved_by': self.resolved_by,
-            'resolved_date': self.resolved_date.isoformat() if self.resolved_date else None,
-            'metadata': json.loads(self.event_metadata) if self.event_metadata else None
+            'id': row.id,
+            'token_deployment_id': row.token_deployment_id,
+            'event_type': row.event_type,
+            'from_address': row.from_address,
+            'to_address': row.to_address,
+            'amount': row.amount,
+            'reason': row.reason,
+            'transaction_hash': row.transaction_hash,
+            'block_number': row.block_number,
+            'timestamp': _isoformat(row.timestamp),
+            'severity': row.severity,
+            'resolved': row.resolved,
+            'resolved_by': row.resolved_by,
+            'resolved_date': _isoformat(row.resolved_date),
+            'metadata': metadata
         }
 
+# Child counts are loaded on access (or selected alongside the columns),
+# never by materializing the relationship collections
+TokenDeployment.verified_addresses_count = db.column_property(
+    select(func.count(VerifiedAddress.id))
+    .where(VerifiedAddress.token_deployment_id == TokenDeployment.id)
+    .correlate_except(VerifiedAddress)
+    .scalar_subquery(),
+    deferred=True
+)
+TokenDeployment.compliance_events_count = db.column_property(
+    select(func.count(ComplianceEvent.id))
+    .where(ComplianceEvent.token_deployment_id == TokenDeployment.id)
+    .correlate_except(ComplianceEvent)
+    .scalar_subquery(),
+    deferred=True
+)
+
+# Columns the list endpoints select as plain rows (no ORM identity map)
+TOKEN_LIST_COLUMNS = (
+    TokenDeployment.id,
+    TokenDeployment.token_address,
+    TokenDeployment.token_name,
+    TokenDeployment.token_symbol,
+    TokenDeployment.asset_type,
+    TokenDeployment.regulatory_framework,
+    TokenDeployment.jurisdiction,
+    TokenDeployment.max_supply,
+    TokenDeployment.deployer_address,
+    TokenDeployment.compliance_address,
+    TokenDeployment.identity_registry_address,
+    TokenDeployment.deployment_tx_hash,
+    TokenDeployment.deployment_date,
+    TokenDeployment.is_active,
+    TokenDeployment.description,
+    TokenDeployment.document_hash,
+    TokenDeployment.verified_addresses_count,
+    TokenDeployment.compliance_events_count,
+)
+
+VERIFIED_ADDRESS_COLUMNS = tuple(
+    getattr(VerifiedAddress, column.key) for column in VerifiedAddress.__table__.columns
+)
+
+# event_metadata is selected as text so list endpoints can embed it
+# without a decode/encode round trip (see row_to_dict(raw_metadata=True))
+COMPLIANCE_EVENT_COLUMNS = tuple(
+    cast(ComplianceEvent.event_metadata, Text).label('event_metadata')
+    if column.key == 'event_metadata' else getattr(ComplianceEvent, column.key)
+    for column in ComplianceEvent.__table__.columns
+)
+
 class TransferAgentUser(db.Model):
     """Model for transfer agent console users"""
     __tablename__ = 'transfer_agent_users'
@@ -151,7 +304,7 @@ class TransferAgentUser(db.Model):
             'name': self.name,
             'email': self.email,
             'organization': self.organization,
-            'permissions': json.loads(self.permissions) if self.permissions else None,
+            'permissions': orjson.loads(self.permissions) if self.permissions else None,
             'is_active': self.is_active,
             'created_date': self.created_date.isoformat() if self.created_date else None,
             'last_login': self.last_login.isoformat() if self.last_login else None
@@ -175,15 +328,127 @@ class TokenMetrics(db.Model):
     __table_args__ = (db.UniqueConstraint('token_deployment_id', 'metric_date', name='unique_token_date'),)
     
     def to_dict(self):
+        return self.row_to_dict(self)
+    
+    @staticmethod
+    def row_to_dict(row):
+        """Serialize a model instance or a token_metrics table row"""
         return {
-            'id': self.id,
-            'token_deployment_id': self.token_deployment_id,
-            'metric_date': self.metric_date.isoformat() if self.metric_date else None,
-            'total_supply': self.total_supply,
-            'total_holders': self.total_holders,
-            'verified_holders': self.verified_holders,
-            'total_transfers': self.total_transfers,
-            'blocked_transfers': self.blocked_transfers,
-            'compliance_score': self.compliance_score
+            'id': row.id,
+            'token_deployment_id': row.token_deployment_id,
+            'metric_date': row.metric_date.isoformat() if row.metric_date else None,
+            'total_supply': row.total_supply,
+            'total_holders': row.total_holders,
+            'verified_holders': row.verified_holders,
+            'total_transfers': row.total_transfers,
+            'blocked_transfers': row.blocked_transfers,
+            'compliance_score': row.compliance_score
         }
 
+class TokenStats(db.Model):
+    """
+    Per-token counters kept in step with the transfer agent write endpoints.
+    
+    Read paths look these up instead of running COUNT(*) over
+    verified_addresses and compliance_events on every request.
+    """
+    __tablename__ = 'token_stats'
+    
+    token_deployment_id = db.Column(db.Integer, db.ForeignKey('token_deployments.id'), primary_key=True)
+    verified_active = db.Column(db.Integer, nullable=False, default=0)
+    events_total = db.Column(db.Integer, nullable=False, default=0)
+    events_unresolved = db.Column(db.Integer, nullable=False, default=0)
+    # Active verified addresses per verification level
+    verified_basic = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    verified_accredited = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    verified_institutional = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # verification_level -> counter column
+    LEVEL_COLUMNS = {
+        'basic': 'verified_basic',
+        'accredited': 'verified_accredited',
+        'institutional': 'verified_institutional',
+    }
+    
+    @classmethod
+    def recount(cls, token_deployment_id):
+        """Build a counter row from the source tables (includes pending changes via autoflush)"""
+        # IS TRUE / IS FALSE so the planner matches the partial indexes
+        level_counts = dict(db.session.query(
+            VerifiedAddress.verification_level, func.count(VerifiedAddress.id)
+        ).filter(
+            VerifiedAddress.token_deployment_id == token_deployment_id,
+            VerifiedAddress.is_active.is_(True)
+        ).group_by(VerifiedAddress.verification_level).all())
+        return cls(
+            token_deployment_id=token_deployment_id,
+            verified_active=sum(level_counts.values()),
+            events_total=ComplianceEvent.query.filter_by(
+                token_deployment_id=token_deployment_id
+            ).count(),
+            events_unresolved=ComplianceEvent.query.filter(
+                ComplianceEvent.token_deployment_id == token_deployment_id,
+                ComplianceEvent.resolved.is_(False)
+            ).count(),
+            **{column: level_counts.get(level, 0) for level, column in cls.LEVEL_COLUMNS.items()}
+        )
+    
+    @classmethod
+    def verification_deltas(cls, old_level, was_active, new_level, is_active):
+        """Counter deltas for a verified address moving from (old_level, was_active) to (new_level, is_active)"""
+        deltas = Counter()
+        if was_active:
+            deltas['verified_active'] -= 1
+            if old_level in cls.LEVEL_COLUMNS:
+                deltas[cls.LEVEL_COLUMNS[old_level]] -= 1
+        if is_active:
+            deltas['verified_active'] += 1
+            if new_level in cls.LEVEL_COLUMNS:
+                deltas[cls.LEVEL_COLUMNS[new_level]] += 1
+        return deltas
+    
+    @classmethod
+    def verification_stats(cls, row):
+        """
+        Active verified addresses per level, as [{'level', 'count'}] for non-zero levels.
+        
+        Takes a model instance or a token_stats table row.
+        """
+        return [
+            {'level': level, 'count': getattr(row, column)}
+            for level, column in cls.LEVEL_COLUMNS.items()
+            if getattr(row, column)
+        ]
+    
+    @classmethod
+    def bump(cls, token_deployment_id, **deltas):
+        """
+        Apply counter deltas in the current transaction.
+        
+        The UPDATE is atomic in the database, so concurrent writers do not
+        lose increments. Tokens registered before this table existed have no
+        row yet; one is inserted from a recount, which already reflects the
+        change being made. When two first writers race, the loser's insert
+        does nothing and its deltas go to the winner's row instead.
+        """
+        values = {name: getattr(cls, name) + delta for name, delta in deltas.items() if delta}
+        if not values:
+            return
+        stmt = update(cls).where(cls.token_deployment_id == token_deployment_id).values(values)
+        if db.session.execute(stmt).rowcount:
+            return
+        
+        row = cls.recount(token_deployment_id)
+        inserted = db.session.execute(insert_ignore_conflicts(cls).values({
+            column.key: getattr(row, column.key) for column in cls.__table__.columns
+        })).rowcount
+        if not inserted:
+            db.session.execute(stmt)
+    
+    def to_dict(self):
+        return {
+            'token_deployment_id': self.token_deployment_id,
+            'verified_active': self.verified_active,
+            'events_total': self.events_total,
+            'events_unresolved': self.events_unresolved
+        }
@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import insert
 from datetime import datetime, timezone
 import bcrypt
 
@@ -10,6 +11,19 @@ def utc_now():
 
 db = SQLAlchemy()
 
+
+def insert_ignore_conflicts(model):
+    """Build an INSERT that skips rows violating a unique constraint"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(model).on_conflict_do_nothing()
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -65,16 +79,29 @@ class User(db.Model):
             self.password_hash.encode('utf-8')
         )
 
-    def to_dict(self):
+    def token_claims(self):
+        """Claims embedded in access tokens so hot paths can skip the user lookup"""
         return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'wallet_address': self.wallet_address,
             'role': self.role,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None
+            'username': self.username,
+            'wallet_address': self.wallet_address
+        }
+
+    def to_dict(self):
+        return self.row_to_dict(self)
+
+    @staticmethod
+    def row_to_dict(row):
+        """Serialize a model instance or a USER_LIST_COLUMNS row"""
+        return {
+            'id': row.id,
+            'username': row.username,
+            'email': row.email,
+            'wallet_address': row.wallet_address,
+            'role': row.role,
+            'is_active': row.is_active,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'last_login': row.last_login.isoformat() if row.last_login else None
         }
 
     def to_public_dict(self):
@@ -85,3 +112,17 @@ class User(db.Model):
             'wallet_address': self.wallet_address,
             'role': self.role
         }
+
+
+# Columns read by User.row_to_dict; list endpoints select just these as
+# plain rows (no password hash, no ORM instances or identity map)
+USER_LIST_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.wallet_address,
+    User.role,
+    User.is_active,
+    User.created_at,
+    User.last_login,
+)
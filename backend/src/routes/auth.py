@@ -114,7 +114,7 @@ def register(validated_data):
             return jsonify({'success': False, 'error': 'Username already exists'}), 409
         
         # Check if email already exists
-        if User.query.filter_by(email=validated_data['email'].lower()).first():
+        if User.query.filter_by(email=validated_data['email']).first():
             return jsonify({'success': False, 'error': 'Email already registered'}), 409
         
         # Check if wallet address already exists (if provided)
@@ -126,7 +126,7 @@ def register(validated_data):
         # Create new user (role is always 'user' for self-registration - security)
         user = User(
             username=validated_data['username'],
-            email=validated_data['email'].lower(),
+            email=validated_data['email'],
             wallet_address=wallet_address.lower() if wallet_address else None,
             role='user'  # Never allow role escalation through registration
         )
@@ -140,7 +140,7 @@ def register(validated_data):
         # Generate tokens
         access_token = create_access_token(
             identity=str(user.id),
-            additional_claims={'role': user.role, 'username': user.username}
+            additional_claims=user.token_claims()
         )
         refresh_token = create_refresh_token(identity=str(user.id))
         
@@ -191,7 +191,7 @@ def login(validated_data):
         # Find user by email or username
         user = None
         if validated_data.get('email'):
-            user = User.query.filter_by(email=validated_data['email'].lower()).first()
+            user = User.query.filter_by(email=validated_data['email']).first()
         elif validated_data.get('username'):
             user = User.query.filter_by(username=validated_data['username']).first()
         
@@ -225,7 +225,7 @@ def login(validated_data):
         # Generate tokens
         access_token = create_access_token(
             identity=str(user.id),
-            additional_claims={'role': user.role, 'username': user.username}
+            additional_claims=user.token_claims()
         )
         refresh_token = create_refresh_token(identity=str(user.id))
         
@@ -359,11 +359,7 @@ def login_with_wallet(validated_data):
         # Generate tokens with wallet claim
         access_token = create_access_token(
             identity=str(user.id),
-            additional_claims={
-                'role': user.role, 
-                'username': user.username, 
-                'wallet': wallet_address
-            }
+            additional_claims={**user.token_claims(), 'wallet': wallet_address}
         )
         refresh_token = create_refresh_token(identity=str(user.id))
         
@@ -446,7 +442,7 @@ def refresh():
         
         access_token = create_access_token(
             identity=str(user.id),
-            additional_claims={'role': user.role, 'username': user.username}
+            additional_claims=user.token_claims()
         )
         
         return jsonify({
@@ -531,10 +527,10 @@ def update_current_user(validated_data):
         
         # Update email if provided
         if validated_data.get('email'):
-            existing = User.query.filter_by(email=validated_data['email'].lower()).first()
+            existing = User.query.filter_by(email=validated_data['email']).first()
             if existing and existing.id != user.id:
                 return jsonify({'success': False, 'error': 'Email already registered'}), 409
-            user.email = validated_data['email'].lower()
+            user.email = validated_data['email']
         
         # Update wallet address if provided
         if validated_data.get('wallet_address'):
@@ -10,78 +10,117 @@ Security:
 - Webhook signature verification
 """
 
-from flask import Blueprint, request, jsonify, redirect
+from flask import Blueprint, Response, request, jsonify, redirect
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import gzip
+import orjson
+from sqlalchemy import func, literal, select, tuple_, update
 import structlog
 
-from src.models.user import db, User
+from src.models.user import db, User, insert_ignore_conflicts
 from src.models.subscription import Subscription, BillingHistory
 from src.services.payments import get_payment_service, SubscriptionPlan, SubscriptionStatus
 from src.tasks.email_tasks import send_subscription_email
 from src.middleware.rate_limit import rate_limit_read, rate_limit_write, rate_limit_sensitive, rate_limit_public
+from src.middleware.pagination import encode_cursor, decode_cursor
+from src.middleware.validation import ValidationError
 
 logger = structlog.get_logger()
 
 billing_bp = Blueprint('billing', __name__, url_prefix='/api/billing')
 
+# Plan ID -> enum mapping used by checkout
+_PLAN_MAP: dict[str, SubscriptionPlan] = {
+    'starter': SubscriptionPlan.STARTER,
+    'professional': SubscriptionPlan.PROFESSIONAL,
+    'enterprise': SubscriptionPlan.ENTERPRISE,
+}
+
+# Prebound lookup for Subscription.PLAN_LIMITS on the webhook/checkout paths
+_plan_limits_getitem = Subscription.PLAN_LIMITS.__getitem__
+
+
+def _plan_limit(plan: str) -> int:
+    """Token limit for a plan, defaulting to the starter limit"""
+    try:
+        return _plan_limits_getitem(plan)
+    except KeyError:
+        return 3
+
+
+# Available subscription plans (static, served by GET /plans)
+_PLANS = [
+    {
+        'id': 'starter',
+        'name': 'Starter',
+        'price': 99,
+        'currency': 'usd',
+        'interval': 'month',
+        'tokens_limit': 3,
+        'features': [
+            'Up to 3 tokenized assets',
+            'Basic compliance rules',
+            'Email support',
+            'Standard analytics'
+        ]
+    },
+    {
+        'id': 'professional',
+        'name': 'Professional',
+        'price': 299,
+        'currency': 'usd',
+        'interval': 'month',
+        'tokens_limit': 10,
+        'features': [
+            'Up to 10 tokenized assets',
+            'All compliance rules',
+            'Priority support',
+            'Advanced analytics',
+            'Custom branding',
+            'API access'
+        ],
+        'recommended': True
+    },
+    {
+        'id': 'enterprise',
+        'name': 'Enterprise',
+        'price': None,  # Custom pricing
+        'currency': 'usd',
+        'interval': 'month',
+        'tokens_limit': 100,
+        'features': [
+            'Unlimited tokenized assets',
+            'Custom compliance rules',
+            '24/7 dedicated support',
+            'White-label solution',
+            'SLA guarantees',
+            'On-premise deployment option'
+        ],
+        'contact_sales': True
+    }
+]
+
+# /plans body is constant: serialize and gzip once at import
+_PLANS_JSON = orjson.dumps({'plans': _PLANS})
+_PLANS_GZ = gzip.compress(_PLANS_JSON, compresslevel=9)
+
+# Worker pool for Stripe calls that can overlap with local DB work
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='billing')
+
 
 @billing_bp.route('/plans', methods=['GET'])
 @rate_limit_public  # Public endpoint to view plans
 def get_plans():
     """Get available subscription plans"""
-    plans = [
-        {
-            'id': 'starter',
-            'name': 'Starter',
-            'price': 99,
-            'currency': 'usd',
-            'interval': 'month',
-            'tokens_limit': 3,
-            'features': [
-                'Up to 3 tokenized assets',
-                'Basic compliance rules',
-                'Email support',
-                'Standard analytics'
-            ]
-        },
-        {
-            'id': 'professional',
-            'name': 'Professional',
-            'price': 299,
-            'currency': 'usd',
-            'interval': 'month',
-            'tokens_limit': 10,
-            'features': [
-                'Up to 10 tokenized assets',
-                'All compliance rules',
-                'Priority support',
-                'Advanced analytics',
-                'Custom branding',
-                'API access'
-            ],
-            'recommended': True
-        },
-        {
-            'id': 'enterprise',
-            'name': 'Enterprise',
-            'price': None,  # Custom pricing
-            'currency': 'usd',
-            'interval': 'month',
-            'tokens_limit': 100,
-            'features': [
-                'Unlimited tokenized assets',
-                'Custom compliance rules',
-                '24/7 dedicated support',
-                'White-label solution',
-                'SLA guarantees',
-                'On-premise deployment option'
-            ],
-            'contact_sales': True
-        }
-    ]
-    
-    return jsonify({'plans': plans})
+    if request.accept_encodings['gzip']:
+        response = Response(_PLANS_GZ, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(_PLANS_JSON, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 
 @billing_bp.route('/subscription', methods=['GET'])
@@ -135,14 +174,7 @@ def create_checkout():
         success_url = data.get('success_url', 'http://localhost:5173/billing/success')
         cancel_url = data.get('cancel_url', 'http://localhost:5173/billing/cancel')
         
-        # Map plan ID to enum
-        plan_map = {
-            'starter': SubscriptionPlan.STARTER,
-            'professional': SubscriptionPlan.PROFESSIONAL,
-            'enterprise': SubscriptionPlan.ENTERPRISE,
-        }
-        
-        plan = plan_map.get(plan_id)
+        plan = _PLAN_MAP.get(plan_id)
         if not plan:
             return jsonify({'error': 'Invalid plan'}), 400
         
@@ -162,8 +194,9 @@ def create_checkout():
         
         # Get or create Stripe customer
         subscription = Subscription.query.filter_by(user_id=user.id).first()
+        is_new_customer = not (subscription and subscription.stripe_customer_id)
         
-        if subscription and subscription.stripe_customer_id:
+        if not is_new_customer:
             customer_id = subscription.stripe_customer_id
         else:
             # Create new customer
@@ -181,22 +214,27 @@ def create_checkout():
                     stripe_customer_id=customer_id,
                     plan=plan_id,
                     status='incomplete',
-                    tokens_limit=Subscription.PLAN_LIMITS.get(plan_id, 3)
+                    tokens_limit=_plan_limit(plan_id)
                 )
                 db.session.add(subscription)
             else:
                 subscription.stripe_customer_id = customer_id
-            
+        
+        # Create checkout session on a worker thread while the customer record
+        # is committed here (the scoped DB session must stay on this thread)
+        session_future = _executor.submit(
+            payment_service.create_checkout_session,
+            customer_id=customer_id,
+            plan=plan,
+            success_url=success_url + '?session_id={CHECKOUT_SESSION_ID}',
+            cancel_url=cancel_url
+        )
+        
+        if is_new_customer:
             db.session.commit()
         
-        # Create checkout session
         try:
-            session = payment_service.create_checkout_session(
-                customer_id=customer_id,
-                plan=plan,
-                success_url=success_url + '?session_id={CHECKOUT_SESSION_ID}',
-                cancel_url=cancel_url
-            )
+            session = session_future.result()
         except Exception as e:
             logger.error("checkout_session_failed", error=str(e))
             return jsonify({'error': 'Failed to create checkout session'}), 500
@@ -233,31 +271,44 @@ def cancel_subscription():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        subscription = Subscription.query.filter_by(user_id=user.id).first()
+        # Fetch only what the checks need and lock the row so that retried
+        # requests cannot cancel the same subscription twice
+        row = db.session.execute(
+            select(Subscription.id, Subscription.stripe_subscription_id, Subscription.status)
+            .where(Subscription.user_id == user.id)
+            .with_for_update()
+        ).first()
         
-        if not subscription or not subscription.stripe_subscription_id:
+        if row is None or not row.stripe_subscription_id:
+            db.session.rollback()
             return jsonify({'error': 'No active subscription found'}), 404
         
-        if subscription.status == 'canceled':
+        if row.status == 'canceled':
+            db.session.rollback()
             return jsonify({'error': 'Subscription already canceled'}), 400
         
         payment_service = get_payment_service()
         
         try:
             result = payment_service.cancel_subscription(
-                subscription.stripe_subscription_id,
+                row.stripe_subscription_id,
                 at_period_end=at_period_end
             )
         except Exception as e:
+            db.session.rollback()
             logger.error("cancel_subscription_failed", error=str(e))
             return jsonify({'error': 'Failed to cancel subscription'}), 500
         
         # Update local subscription
-        subscription.cancel_at_period_end = at_period_end
+        values = {'cancel_at_period_end': at_period_end}
         if not at_period_end:
-            subscription.status = 'canceled'
-            subscription.canceled_at = datetime.utcnow()
-        subscription.updated_at = datetime.utcnow()
+            values.update(status='canceled', canceled_at=func.now())
+        subscription = db.session.scalars(
+            update(Subscription)
+            .where(Subscription.id == row.id)
+            .values(**values)
+            .returning(Subscription)
+        ).one()
         db.session.commit()
         
         # Send email notification
@@ -291,8 +342,20 @@ def cancel_subscription():
 @jwt_required()
 @rate_limit_read  # Reading invoices
 def get_invoices():
-    """Get billing history/invoices"""
+    """
+    Get billing history/invoices
+    
+    Query params:
+    - limit: Page size (default: 20, max: 100)
+    - cursor: next_cursor from the previous page (keyset pagination)
+    """
     try:
+        try:
+            limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+            cursor = decode_cursor(request.args.get('cursor'), datetime, int)
+        except (ValueError, ValidationError):
+            return jsonify({'error': 'Invalid pagination parameters'}), 400
+        
         current_user_id = get_jwt_identity()
         user = User.query.get(current_user_id)
         
@@ -302,16 +365,25 @@ def get_invoices():
         subscription = Subscription.query.filter_by(user_id=user.id).first()
         
         if not subscription or not subscription.stripe_customer_id:
-            return jsonify({'invoices': []})
-        
-        # Get from local database first
-        local_invoices = BillingHistory.query.filter_by(
-            subscription_id=subscription.id
-        ).order_by(BillingHistory.invoice_date.desc()).limit(20).all()
-        
-        if local_invoices:
+            return jsonify({'invoices': [], 'next_cursor': None})
+        
+        # Get from local database first, seeking past the cursor
+        stmt = select(BillingHistory).where(BillingHistory.subscription_id == subscription.id)
+        if cursor:
+            stmt = stmt.where(tuple_(BillingHistory.invoice_date, BillingHistory.id) < tuple_(*cursor))
+        stmt = stmt.order_by(BillingHistory.invoice_date.desc(), BillingHistory.id.desc()).limit(limit + 1)
+        local_invoices = db.session.scalars(stmt).all()
+        
+        if local_invoices or cursor:
+            next_cursor = None
+            if len(local_invoices) > limit:
+                local_invoices = local_invoices[:limit]
+                last = local_invoices[-1]
+                next_cursor = encode_cursor(last.invoice_date, last.id)
+            
             return jsonify({
-                'invoices': [inv.to_dict() for inv in local_invoices]
+                'invoices': [inv.to_dict() for inv in local_invoices],
+                'next_cursor': next_cursor
             })
         
         # Fallback to Stripe API
@@ -332,11 +404,12 @@ def get_invoices():
                         'pdf_url': inv.pdf_url
                     }
                     for inv in invoices
-                ]
+                ],
+                'next_cursor': None
             })
         except Exception as e:
             logger.error("get_invoices_failed", error=str(e))
-            return jsonify({'invoices': []})
+            return jsonify({'invoices': [], 'next_cursor': None})
         
     except Exception as e:
         logger.error("get_invoices_error", error=str(e))
@@ -370,24 +443,31 @@ def webhook():
         # Parse the webhook
         parsed = payment_service.parse_webhook(data)
         
-        # Handle different event types
-        if event_type == 'checkout.session.completed':
-            _handle_checkout_completed(parsed)
+        # Handle the event in a single transaction (one COMMIT per webhook).
+        # Handlers return the email to send instead of enqueueing it, so no
+        # email goes out for a change that is rolled back
+        email = None
+        with db.session.begin():
+            if event_type == 'checkout.session.completed':
+                email = _handle_checkout_completed(parsed)
+        
+            elif event_type == 'customer.subscription.created':
+                _handle_subscription_created(parsed)
         
-        elif event_type == 'customer.subscription.created':
-            _handle_subscription_created(parsed)
+            elif event_type == 'customer.subscription.updated':
+                _handle_subscription_updated(parsed)
         
-        elif event_type == 'customer.subscription.updated':
-            _handle_subscription_updated(parsed)
+            elif event_type == 'customer.subscription.deleted':
+                _handle_subscription_deleted(parsed)
         
-        elif event_type == 'customer.subscription.deleted':
-            _handle_subscription_deleted(parsed)
+            elif event_type == 'invoice.paid':
+                _handle_invoice_paid(parsed)
         
-        elif event_type == 'invoice.paid':
-            _handle_invoice_paid(parsed)
+            elif event_type == 'invoice.payment_failed':
+                email = _handle_payment_failed(parsed)
         
-        elif event_type == 'invoice.payment_failed':
-            _handle_payment_failed(parsed)
+        if email is not None:
+            send_subscription_email.delay(*email)
         
         return jsonify({'success': True}), 200
         
@@ -397,7 +477,7 @@ def webhook():
 
 
 def _handle_checkout_completed(data: dict):
-    """Handle checkout.session.completed event"""
+    """Handle checkout.session.completed event; returns the welcome email's arguments, if any"""
     customer_id = data.get('customer_id')
     subscription_id = data.get('subscription_id')
     plan = data.get('plan')
@@ -406,30 +486,31 @@ def _handle_checkout_completed(data: dict):
         stripe_customer_id=customer_id
     ).first()
     
-    if subscription:
-        subscription.stripe_subscription_id = subscription_id
-        subscription.status = 'active'
-        subscription.plan = plan or subscription.plan
-        subscription.tokens_limit = Subscription.PLAN_LIMITS.get(plan, 3)
-        subscription.updated_at = datetime.utcnow()
-        db.session.commit()
-        
-        # Send welcome email
-        user = User.query.get(subscription.user_id)
-        if user:
-            send_subscription_email.delay(
-                user.email,
-                user.username,
-                'created',
-                {
-                    'plan': plan.title() if plan else 'Pro',
-                    'tokens_limit': subscription.tokens_limit,
-                    'next_billing_date': subscription.current_period_end.strftime('%B %d, %Y')
-                        if subscription.current_period_end else 'N/A'
-                }
-            )
-        
-        logger.info("checkout_completed", customer_id=customer_id, plan=plan)
+    if not subscription:
+        return None
+    
+    subscription.stripe_subscription_id = subscription_id
+    subscription.status = 'active'
+    subscription.plan = plan or subscription.plan
+    subscription.tokens_limit = _plan_limit(plan)
+    
+    logger.info("checkout_completed", customer_id=customer_id, plan=plan)
+    
+    # Welcome email, sent once the transaction commits
+    user = User.query.get(subscription.user_id)
+    if not user:
+        return None
+    return (
+        user.email,
+        user.username,
+        'created',
+        {
+            'plan': plan.title() if plan else 'Pro',
+            'tokens_limit': subscription.tokens_limit,
+            'next_billing_date': subscription.current_period_end.strftime('%B %d, %Y')
+                if subscription.current_period_end else 'N/A'
+        }
+    )
 
 
 def _handle_subscription_created(data: dict):
@@ -447,8 +528,6 @@ def _handle_subscription_created(data: dict):
         subscription.status = sub_data.status.value
         subscription.current_period_start = sub_data.current_period_start
         subscription.current_period_end = sub_data.current_period_end
-        subscription.updated_at = datetime.utcnow()
-        db.session.commit()
         
         logger.info("subscription_created_webhook", subscription_id=sub_data.id)
 
@@ -459,20 +538,24 @@ def _handle_subscription_updated(data: dict):
     if not sub_data:
         return
     
-    subscription = Subscription.query.filter_by(
-        stripe_subscription_id=sub_data.id
-    ).first()
+    result = db.session.execute(
+        update(Subscription)
+        .where(Subscription.stripe_subscription_id == sub_data.id)
+        .values(
+            status=sub_data.status.value,
+            current_period_start=sub_data.current_period_start,
+            current_period_end=sub_data.current_period_end,
+            cancel_at_period_end=sub_data.cancel_at_period_end,
+            canceled_at=sub_data.canceled_at,
+        )
+        .returning(Subscription.id)
+    )
     
-    if subscription:
-        subscription.status = sub_data.status.value
-        subscription.current_period_start = sub_data.current_period_start
-        subscription.current_period_end = sub_data.current_period_end
-        subscription.cancel_at_period_end = sub_data.cancel_at_period_end
-        subscription.canceled_at = sub_data.canceled_at
-        subscription.updated_at = datetime.utcnow()
-        db.session.commit()
-        
-        logger.info("subscription_updated_webhook", subscription_id=sub_data.id)
+    if result.first() is None:
+        logger.info("subscription_updated_webhook_no_match", subscription_id=sub_data.id)
+        return
+    
+    logger.info("subscription_updated_webhook", subscription_id=sub_data.id)
 
 
 def _handle_subscription_deleted(data: dict):
@@ -481,64 +564,82 @@ def _handle_subscription_deleted(data: dict):
     if not sub_data:
         return
     
-    subscription = Subscription.query.filter_by(
-        stripe_subscription_id=sub_data.id
-    ).first()
+    result = db.session.execute(
+        update(Subscription)
+        .where(Subscription.stripe_subscription_id == sub_data.id)
+        .values(
+            status='canceled',
+            canceled_at=func.now(),
+        )
+        .returning(Subscription.id)
+    )
     
-    if subscription:
-        subscription.status = 'canceled'
-        subscription.canceled_at = datetime.utcnow()
-        subscription.updated_at = datetime.utcnow()
-        db.session.commit()
-        
-        logger.info("subscription_deleted_webhook", subscription_id=sub_data.id)
+    if result.first() is None:
+        logger.info("subscription_deleted_webhook_no_match", subscription_id=sub_data.id)
+        return
+    
+    logger.info("subscription_deleted_webhook", subscription_id=sub_data.id)
 
 
 def _handle_invoice_paid(data: dict):
     """Handle invoice.paid event"""
-    subscription = Subscription.query.filter_by(
-        stripe_customer_id=data.get('customer_id')
-    ).first()
+    invoice_id = data.get('invoice_id')
     
-    if subscription:
-        # Record billing history
-        billing = BillingHistory(
-            subscription_id=subscription.id,
-            stripe_invoice_id=data.get('invoice_id'),
-            amount=int(data.get('amount', 0) * 100),  # Convert to cents
-            currency='usd',
-            status='paid',
-            invoice_date=datetime.utcnow(),
-            paid_at=datetime.utcnow()
-        )
-        db.session.add(billing)
-        db.session.commit()
-        
-        logger.info("invoice_paid_webhook", invoice_id=data.get('invoice_id'))
+    # Resolve the subscription and record billing history in one statement;
+    # replayed webhooks are ignored via the unique stripe_invoice_id
+    source = select(
+        Subscription.id,
+        literal(invoice_id),
+        literal(int(data.get('amount', 0) * 100)),  # Convert to cents
+        literal('usd'),
+        literal('paid'),
+        func.now(),
+        func.now(),
+        func.now(),
+    ).where(
+        Subscription.stripe_customer_id == data.get('customer_id')
+    ).limit(1)
+    
+    stmt = insert_ignore_conflicts(BillingHistory).from_select(
+        [
+            'subscription_id', 'stripe_invoice_id', 'amount', 'currency',
+            'status', 'invoice_date', 'paid_at', 'created_at',
+        ],
+        source,
+    )
+    
+    result = db.session.execute(stmt)
+    
+    if result.rowcount:
+        logger.info("invoice_paid_webhook", invoice_id=invoice_id)
 
 
 def _handle_payment_failed(data: dict):
-    """Handle invoice.payment_failed event"""
-    subscription = Subscription.query.filter_by(
-        stripe_customer_id=data.get('customer_id')
-    ).first()
+    """Handle invoice.payment_failed event; returns the notice email's arguments, if any"""
+    result = db.session.execute(
+        update(Subscription)
+        .where(Subscription.stripe_customer_id == data.get('customer_id'))
+        .values(status='past_due')
+        .returning(Subscription.user_id)
+    )
+    row = result.first()
     
-    if subscription:
-        subscription.status = 'past_due'
-        subscription.updated_at = datetime.utcnow()
-        db.session.commit()
-        
-        # Send payment failed email
-        user = User.query.get(subscription.user_id)
-        if user:
-            send_subscription_email.delay(
-                user.email,
-                user.username,
-                'payment_failed',
-                {'amount': f"{data.get('amount', 0):.2f}"}
-            )
-        
-        logger.info("payment_failed_webhook", customer_id=data.get('customer_id'))
+    if row is None:
+        logger.info("payment_failed_webhook_no_match", customer_id=data.get('customer_id'))
+        return None
+    
+    logger.info("payment_failed_webhook", customer_id=data.get('customer_id'))
+    
+    # Payment failed email, sent once the transaction commits
+    user = db.session.get(User, row.user_id)
+    if not user:
+        return None
+    return (
+        user.email,
+        user.username,
+        'payment_failed',
+        {'amount': f"{data.get('amount', 0):.2f}"}
+    )
 
 
 @billing_bp.route('/usage', methods=['GET'])
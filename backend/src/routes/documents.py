@@ -11,24 +11,36 @@ Security:
 - Path traversal prevention
 """
 
-from flask import Blueprint, request, jsonify, send_file
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, request, jsonify, send_file
+from flask_jwt_extended import jwt_required, get_jwt
+from werkzeug.exceptions import RequestEntityTooLarge
+from dataclasses import asdict
 from datetime import datetime
+from typing import BinaryIO, Optional, Union
+import hashlib
 import io
+import os
+import time
+import unicodedata
+from urllib.parse import quote
+import orjson
 import structlog
 
-from src.models.user import db, User
+from src.models.user import db
 from src.models.token import TokenDeployment
-from src.services.storage import get_storage_service
+from src.services.storage import get_storage_service, StorageService, StoredDocument
+from src.services.cache import LRUCache, cache_get, cache_set, cache_delete
+from src.tasks.storage_tasks import warm_gateways
 from src.middleware.rate_limit import rate_limit_read, rate_limit_write, rate_limit_sensitive
-from src.middleware.validation import sanitize_string, sanitize_filename
+from src.middleware.validation import sanitize_string, sanitize_filename, ValidationError
+from src.middleware.pagination import encode_cursor, decode_cursor
 
 logger = structlog.get_logger()
 
 documents_bp = Blueprint('documents', __name__, url_prefix='/api/documents')
 
 # Allowed file types for document upload
-ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'png', 'jpg', 'jpeg'}
+ALLOWED_EXTENSIONS = frozenset({'pdf', 'doc', 'docx', 'png', 'jpg', 'jpeg'})
 ALLOWED_MIME_TYPES = {
     'application/pdf',
     'application/msword',
@@ -37,11 +49,197 @@ ALLOWED_MIME_TYPES = {
     'image/jpeg',
 }
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MULTIPART_OVERHEAD = 64 * 1024  # Allowance for form fields and boundaries
+UPLOAD_BUFFER_SIZE = 1 << 20  # Read the spooled upload in 1 MiB chunks
+
+# Content types served by get_document, keyed by lowercase extension
+EXT_TO_MIME = {
+    'pdf': 'application/pdf',
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'json': 'application/json',
+    'doc': 'application/msword',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+
+class LimitedReader(io.RawIOBase):
+    """
+    Read-only stream wrapper that enforces a byte limit while streaming.
+    
+    Lets uploads flow straight from the request stream to the storage
+    backend, counting bytes as they pass instead of seeking to the end
+    up front. Raises RequestEntityTooLarge once the limit is exceeded.
+    """
+    
+    def __init__(self, stream, limit: int):
+        self._stream = stream
+        self._limit = limit
+        self.bytes_read = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, b) -> int:
+        chunk = self._stream.read(len(b))
+        n = len(chunk)
+        b[:n] = chunk
+        self.bytes_read += n
+        if self.bytes_read > self._limit:
+            raise RequestEntityTooLarge()
+        return n
+
+
+# Document caching: IPFS content is content-addressed and immutable, so bodies
+# are cached for a long time; pin metadata can change (unpin) so it gets a TTL
+DOCUMENT_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+CONTENT_CACHE_TTL = 24 * 60 * 60
+METADATA_CACHE_TTL = 5 * 60
+LRU_MAX_OBJECT_SIZE = 256 * 1024
+DEDUPE_CACHE_TTL = 30 * 24 * 60 * 60
+
+_content_lru = LRUCache(maxsize=256)
+_metadata_lru = LRUCache(maxsize=1024)
+
+
+def _metadata_to_json(doc: StoredDocument) -> bytes:
+    return orjson.dumps(asdict(doc))
+
+
+def _metadata_from_json(raw: bytes) -> StoredDocument:
+    data = orjson.loads(raw)
+    if data.get('pin_date'):
+        data['pin_date'] = datetime.fromisoformat(data['pin_date'])
+    return StoredDocument(**data)
+
+
+def get_cached_metadata(
+    storage_service: StorageService,
+    ipfs_hash: str,
+    fetch: bool = True
+) -> Optional[StoredDocument]:
+    """Get pin metadata through the process LRU and Redis tiers"""
+    now = time.monotonic()
+    entry = _metadata_lru.get(ipfs_hash)
+    if entry and entry[0] > now:
+        return entry[1]
+    
+    key = f'ipfs:meta:{ipfs_hash}'
+    raw = cache_get(key)
+    if raw is not None:
+        doc = _metadata_from_json(raw)
+    elif not fetch:
+        return None
+    else:
+        doc = storage_service.get_metadata(ipfs_hash)
+        if doc is None:
+            return None
+        cache_set(key, _metadata_to_json(doc), METADATA_CACHE_TTL)
+    
+    _metadata_lru.set(ipfs_hash, (now + METADATA_CACHE_TTL, doc))
+    return doc
+
+
+def get_cached_content(storage_service: StorageService, ipfs_hash: str) -> Union[bytes, BinaryIO]:
+    """
+    Get document content through the process LRU and Redis tiers.
+    
+    Small objects stay in the process LRU; anything up to MAX_FILE_SIZE is
+    shared via Redis. Large uncached objects are returned as the storage
+    backend's temp file so they can still be served with sendfile(2).
+    """
+    content = _content_lru.get(ipfs_hash)
+    if content is not None:
+        return content
+    
+    key = f'ipfs:file:{ipfs_hash}'
+    content = cache_get(key)
+    if content is None:
+        content = storage_service.open_file(ipfs_hash)
+        if not isinstance(content, bytes):
+            if os.fstat(content.fileno()).st_size <= MAX_FILE_SIZE:
+                cache_set(key, content.read(), CONTENT_CACHE_TTL)
+                content.seek(0)
+            return content
+        cache_set(key, content, CONTENT_CACHE_TTL)
+    
+    if len(content) <= LRU_MAX_OBJECT_SIZE:
+        _content_lru.set(ipfs_hash, content)
+    return content
+
+
+def invalidate_document_cache(ipfs_hash: str) -> None:
+    """Drop cached metadata/content for a document (e.g. after unpin)"""
+    _metadata_lru.delete(ipfs_hash)
+    _content_lru.delete(ipfs_hash)
+    cache_delete(f'ipfs:meta:{ipfs_hash}', f'ipfs:file:{ipfs_hash}')
+
+
+def file_sha256(stream: BinaryIO) -> str:
+    """
+    SHA-256 of an uploaded file, rewound afterwards for the real upload.
+    
+    Werkzeug has already spooled the upload to memory or a temp file, so
+    this is a local read into one reused buffer (hashlib runs in OpenSSL).
+    """
+    sha = hashlib.sha256()
+    buf = bytearray(UPLOAD_BUFFER_SIZE)
+    view = memoryview(buf)
+    while True:
+        n = stream.readinto(buf)
+        if not n:
+            break
+        sha.update(view[:n])
+    stream.seek(0)
+    return sha.hexdigest()
+
+
+# Pin metadata that describes the document. Uploader and upload time are
+# per-upload, so they never make a duplicate a different document
+DOCUMENT_METADATA_KEYS = ('document_type', 'description', 'token_address', 'token_name')
+
+
+def same_document_metadata(doc: StoredDocument, filename: str, metadata: dict) -> bool:
+    """Whether an existing pin already carries this upload's name and metadata"""
+    keyvalues = doc.metadata or {}
+    return doc.name == filename and all(
+        keyvalues.get(key) == metadata.get(key) for key in DOCUMENT_METADATA_KEYS
+    )
+
+
+def find_duplicate_upload(storage_service: StorageService, digest: str) -> Optional[StoredDocument]:
+    """Return the existing pin for identical content, if it is still pinned"""
+    ipfs_hash = cache_get(f'ipfs:sha256:{digest}')
+    if ipfs_hash is None:
+        return None
+    return get_cached_metadata(storage_service, ipfs_hash.decode())
+
+
+def content_disposition_names(download_name: str) -> dict:
+    """
+    Content-Disposition filename parameters, built the way send_file does.
+    
+    Header values must be latin-1, so a non-ASCII name is sent as an ASCII
+    fallback plus an RFC 5987 filename* that clients prefer.
+    """
+    try:
+        download_name.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', download_name).encode('ascii', 'ignore').decode('ascii')
+        quoted = quote(download_name, safe="!#$&+-.^_`|~")
+        return {'filename': simple, 'filename*': f"UTF-8''{quoted}"}
+    return {'filename': download_name}
 
 
 def allowed_file(filename: str) -> bool:
     """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return _file_extension(filename) in ALLOWED_EXTENSIONS
+
+
+def _file_extension(filename: str) -> str:
+    """Lowercase extension without the dot ('' if there is none)"""
+    return os.path.splitext(filename)[1][1:].lower()
 
 
 @documents_bp.route('/upload', methods=['POST'])
@@ -73,12 +271,9 @@ def upload_document():
                 'allowed_types': list(ALLOWED_EXTENSIONS)
             }), 400
         
-        # Check file size
-        file.seek(0, 2)  # Seek to end
-        size = file.tell()
-        file.seek(0)  # Seek back to start
-        
-        if size > MAX_FILE_SIZE:
+        # Reject obviously oversized requests up front; the exact file size
+        # is enforced by LimitedReader while streaming to storage
+        if request.content_length and request.content_length > MAX_FILE_SIZE + MULTIPART_OVERHEAD:
             return jsonify({
                 'error': f'File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB'
             }), 400
@@ -88,15 +283,14 @@ def upload_document():
         document_type = request.form.get('document_type', 'general')
         description = request.form.get('description', '')
         
-        # Get current user
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        # Uploader comes from the token claims; no user lookup needed
+        claims = get_jwt()
         
         # Prepare metadata
         metadata = {
             'document_type': document_type,
             'description': description,
-            'uploaded_by': user.wallet_address if user else 'unknown',
+            'uploaded_by': claims.get('wallet_address') or 'unknown',
             'uploaded_at': datetime.utcnow().isoformat(),
         }
         
@@ -106,24 +300,64 @@ def upload_document():
                 metadata['token_address'] = token.token_address
                 metadata['token_name'] = token.token_name
         
-        # Upload to IPFS
         storage_service = get_storage_service()
         
+        # Identical content was pinned before: reuse it, skip the IPFS upload
+        digest = file_sha256(file.stream)
+        metadata['sha256'] = digest
+        existing = find_duplicate_upload(storage_service, digest)
+        
+        # A pin has one metadata record shared by every upload of its bytes,
+        # so only reuse it when it already describes this upload; otherwise
+        # pin again rather than retag a pin other uploads point to
+        if existing and not same_document_metadata(existing, file.filename, metadata):
+            existing = None
+        
+        if existing:
+            if token_id and token:
+                token.document_hash = existing.ipfs_hash
+                db.session.commit()
+            
+            logger.info("document_upload_deduplicated", ipfs_hash=existing.ipfs_hash, sha256=digest)
+            
+            return jsonify({
+                'success': True,
+                'ipfs_hash': existing.ipfs_hash,
+                'gateway_url': existing.gateway_url,
+                'filename': existing.name,
+                'size': existing.size,
+                'document_type': document_type,
+                'duplicate': True
+            }), 200
+        
+        # Upload to IPFS
         try:
             result = storage_service.upload_file(
-                file=file,
+                file=io.BufferedReader(
+                    LimitedReader(file.stream, MAX_FILE_SIZE),
+                    buffer_size=UPLOAD_BUFFER_SIZE
+                ),
                 filename=file.filename,
                 metadata=metadata
             )
+        except RequestEntityTooLarge:
+            return jsonify({
+                'error': f'File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB'
+            }), 400
         except Exception as e:
             logger.error("document_upload_failed", error=str(e))
             return jsonify({'error': 'Failed to upload document to IPFS'}), 500
         
+        cache_set(f'ipfs:sha256:{digest}', result.ipfs_hash.encode(), DEDUPE_CACHE_TTL)
+        
         # Update token with document hash if provided
         if token_id and token:
             token.document_hash = result.ipfs_hash
             db.session.commit()
         
+        # Warm public gateways in the background before the first read
+        warm_gateways.delay(result.ipfs_hash)
+        
         logger.info(
             "document_uploaded",
             ipfs_hash=result.ipfs_hash,
@@ -165,12 +399,11 @@ def upload_json():
         if not data.get('name') or not data.get('data'):
             return jsonify({'error': 'name and data are required'}), 400
         
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        claims = get_jwt()
         
         # Prepare metadata
         metadata = {
-            'uploaded_by': user.wallet_address if user else 'unknown',
+            'uploaded_by': claims.get('wallet_address') or 'unknown',
             'uploaded_at': datetime.utcnow().isoformat(),
         }
         
@@ -193,6 +426,8 @@ def upload_json():
             logger.error("json_upload_failed", error=str(e))
             return jsonify({'error': 'Failed to upload JSON to IPFS'}), 500
         
+        warm_gateways.delay(result.ipfs_hash)
+        
         logger.info(
             "json_uploaded",
             ipfs_hash=result.ipfs_hash,
@@ -224,11 +459,11 @@ def get_document(ipfs_hash: str):
         storage_service = get_storage_service()
         
         # Get document metadata first
-        doc_metadata = storage_service.get_metadata(ipfs_hash)
+        doc_metadata = get_cached_metadata(storage_service, ipfs_hash)
         
-        # Get document content
+        # Get document content (bytes, or a temp file for large objects)
         try:
-            content = storage_service.get_file(ipfs_hash)
+            content = get_cached_content(storage_service, ipfs_hash)
         except Exception as e:
             logger.error("document_fetch_failed", error=str(e), ipfs_hash=ipfs_hash)
             return jsonify({'error': 'Failed to fetch document from IPFS'}), 404
@@ -236,24 +471,27 @@ def get_document(ipfs_hash: str):
         # Determine content type
         content_type = 'application/octet-stream'
         if doc_metadata and doc_metadata.name:
-            ext = doc_metadata.name.rsplit('.', 1)[-1].lower()
-            content_types = {
-                'pdf': 'application/pdf',
-                'png': 'image/png',
-                'jpg': 'image/jpeg',
-                'jpeg': 'image/jpeg',
-                'json': 'application/json',
-                'doc': 'application/msword',
-                'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            }
-            content_type = content_types.get(ext, content_type)
-        
-        return send_file(
-            io.BytesIO(content),
-            mimetype=content_type,
-            as_attachment=False,
-            download_name=doc_metadata.name if doc_metadata else ipfs_hash
-        )
+            content_type = EXT_TO_MIME.get(_file_extension(doc_metadata.name), content_type)
+        
+        download_name = doc_metadata.name if doc_metadata else ipfs_hash
+        
+        # Small objects: send the bytes as-is, no file-like copy
+        if isinstance(content, bytes):
+            response = Response(content, mimetype=content_type)
+            response.headers.set('Content-Disposition', 'inline', **content_disposition_names(download_name))
+        else:
+            # A real file descriptor lets Werkzeug hand the body to
+            # wsgi.file_wrapper, which gunicorn serves with sendfile(2)
+            response = send_file(
+                content,
+                mimetype=content_type,
+                as_attachment=False,
+                download_name=download_name
+            )
+        
+        # Content-addressed: browsers and CDNs may cache it forever
+        response.headers['Cache-Control'] = DOCUMENT_CACHE_CONTROL
+        return response
         
     except Exception as e:
         logger.error("document_get_error", error=str(e), ipfs_hash=ipfs_hash)
@@ -267,7 +505,7 @@ def get_document_metadata(ipfs_hash: str):
     try:
         storage_service = get_storage_service()
         
-        doc = storage_service.get_metadata(ipfs_hash)
+        doc = get_cached_metadata(storage_service, ipfs_hash)
         
         if not doc:
             return jsonify({'error': 'Document not found'}), 404
@@ -292,20 +530,32 @@ def get_document_metadata(ipfs_hash: str):
 def list_documents():
     """List pinned documents (admin only)"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        claims = get_jwt()
         
-        if not user or user.role not in ['admin', 'transfer_agent']:
+        if claims.get('role') not in ['admin', 'transfer_agent']:
             return jsonify({'error': 'Unauthorized'}), 403
         
-        limit = request.args.get('limit', 20, type=int)
-        offset = request.args.get('offset', 0, type=int)
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))  # Cap at 100
+        try:
+            cursor = decode_cursor(request.args.get('cursor'), datetime, str)
+        except ValidationError:
+            return jsonify({'error': 'Invalid pagination cursor'}), 400
         
         storage_service = get_storage_service()
         
         # Check if service supports listing
         if hasattr(storage_service, 'list_pins'):
-            docs = storage_service.list_pins(limit=limit, offset=offset)
+            pinned_before, before_hash = cursor or (None, None)
+            docs = storage_service.list_pins(
+                limit=limit,
+                pinned_before=pinned_before,
+                before_hash=before_hash
+            )
+            
+            # (pin_date, ipfs_hash): the hash breaks ties between pins sharing a date
+            next_cursor = None
+            if len(docs) == limit and docs[-1].pin_date:
+                next_cursor = encode_cursor(docs[-1].pin_date, docs[-1].ipfs_hash)
             
             return jsonify({
                 'documents': [
@@ -320,7 +570,7 @@ def list_documents():
                     for doc in docs
                 ],
                 'limit': limit,
-                'offset': offset
+                'next_cursor': next_cursor
             })
         else:
             return jsonify({
@@ -338,10 +588,9 @@ def list_documents():
 def delete_document(ipfs_hash: str):
     """Unpin a document from IPFS (admin only)"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        claims = get_jwt()
         
-        if not user or user.role != 'admin':
+        if claims.get('role') != 'admin':
             return jsonify({'error': 'Unauthorized'}), 403
         
         storage_service = get_storage_service()
@@ -349,7 +598,8 @@ def delete_document(ipfs_hash: str):
         success = storage_service.unpin(ipfs_hash)
         
         if success:
-            logger.info("document_unpinned", ipfs_hash=ipfs_hash, by=user.username)
+            invalidate_document_cache(ipfs_hash)
+            logger.info("document_unpinned", ipfs_hash=ipfs_hash, by=claims.get('username'))
             return jsonify({'success': True, 'message': 'Document unpinned'})
         else:
             return jsonify({'error': 'Failed to unpin document'}), 500
@@ -370,7 +620,20 @@ def verify_document(ipfs_hash: str):
     try:
         storage_service = get_storage_service()
         
-        doc = storage_service.get_metadata(ipfs_hash)
+        # Cached pin metadata first, then a gateway HEAD; only hit the
+        # Pinata pin API when both miss
+        doc = get_cached_metadata(storage_service, ipfs_hash, fetch=False)
+        if doc is None:
+            size = storage_service.stat_file(ipfs_hash)
+            if size is not None:
+                return jsonify({
+                    'verified': True,
+                    'ipfs_hash': ipfs_hash,
+                    'gateway_url': storage_service.get_gateway_url(ipfs_hash),
+                    'size': size,
+                    'pin_date': None
+                })
+            doc = get_cached_metadata(storage_service, ipfs_hash)
         
         return jsonify({
             'verified': doc is not None,
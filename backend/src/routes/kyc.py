@@ -11,27 +11,46 @@ Security:
 """
 
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from dataclasses import asdict
 from datetime import datetime, timedelta
+from sqlalchemy import select, text, tuple_
 import structlog
 
-from src.models.user import db, User
-from src.models.kyc import KYCVerification
+from src.models.user import db
+from src.models.kyc import KYCVerification, ACTIVE_KYC_STATUSES, KYC_LIST_COLUMNS
 from src.services.kyc import get_kyc_service, ApplicantData, KYCStatus
 from src.tasks.email_tasks import send_kyc_started_email
-from src.tasks.kyc_tasks import process_kyc_webhook
+from src.tasks.kyc_tasks import process_kyc_webhook, create_kyc_applicant, create_kyc_check
 from src.middleware.rate_limit import rate_limit_sensitive, rate_limit_read, rate_limit_write
-from src.middleware.validation import sanitize_string, is_valid_ethereum_address
+from src.middleware.validation import (
+    is_valid_ethereum_address, validate_request, ValidationError, KYC_START_SCHEMA
+)
+from src.middleware.pagination import decode_cursor, page_response
 
 logger = structlog.get_logger()
 
 kyc_bp = Blueprint('kyc', __name__, url_prefix='/api/kyc')
 
 
+def _commit_without_wal_wait():
+    """
+    Commit without waiting for the WAL flush on PostgreSQL.
+    
+    Only for rows that can be recreated (a queued verification the user
+    can restart); the row is visible to other sessions immediately, only
+    durability across a server crash is relaxed.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text('SET LOCAL synchronous_commit TO OFF'))
+    db.session.commit()
+
+
 @kyc_bp.route('/start', methods=['POST'])
 @jwt_required()
 @rate_limit_sensitive  # Strict rate limiting for KYC initiation
-def start_verification():
+@validate_request(KYC_START_SCHEMA)
+def start_verification(validated_data):
     """
     Start KYC verification process
     
@@ -46,33 +65,19 @@ def start_verification():
     }
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'Request body required'}), 400
-        
-        # Validate required fields
-        required_fields = ['wallet_address', 'first_name', 'last_name', 'email']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'{field} is required'}), 400
-        
-        # Sanitize and validate inputs
-        wallet_address = data['wallet_address'].strip().lower()
-        if not is_valid_ethereum_address(wallet_address):
-            return jsonify({'error': 'Invalid wallet address format'}), 400
-        
-        first_name = sanitize_string(data['first_name'], max_length=100)
-        last_name = sanitize_string(data['last_name'], max_length=100)
-        email = sanitize_string(data['email'], max_length=255)
-        country = sanitize_string(data.get('country', ''), max_length=2) if data.get('country') else None
-        date_of_birth = data.get('date_of_birth')  # Will be validated by KYC service
+        # Required fields, formats and lengths are checked by KYC_START_SCHEMA
+        wallet_address = validated_data['wallet_address'].lower()
+        first_name = validated_data['first_name']
+        last_name = validated_data['last_name']
+        email = validated_data['email']
+        country = validated_data.get('country')
+        date_of_birth = validated_data.get('date_of_birth')
         
         # Check for existing pending or approved verification
         existing = KYCVerification.query.filter(
             KYCVerification.wallet_address == wallet_address,
-            KYCVerification.status.in_(['pending', 'in_progress', 'approved'])
-        ).first()
+            KYCVerification.status.in_(ACTIVE_KYC_STATUSES)
+        ).limit(1).first()
         
         if existing:
             if existing.status == 'approved' and existing.is_valid():
@@ -80,18 +85,14 @@ def start_verification():
                     'error': 'This wallet already has a valid verification',
                     'verification': existing.to_public_dict()
                 }), 400
-            elif existing.status in ['pending', 'in_progress']:
+            elif existing.status in ['queued', 'pending', 'in_progress']:
                 return jsonify({
                     'error': 'Verification already in progress',
                     'verification': existing.to_public_dict()
                 }), 400
         
-        # Get current user
+        # Identity is the user id; no need to load the user row
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id) if current_user_id else None
-        
-        # Create applicant with KYC provider
-        kyc_service = get_kyc_service()
         
         applicant_data = ApplicantData(
             first_name=first_name,
@@ -102,58 +103,46 @@ def start_verification():
             date_of_birth=date_of_birth
         )
         
-        try:
-            applicant_result = kyc_service.create_applicant(applicant_data)
-        except Exception as e:
-            logger.error("kyc_create_applicant_failed", error=str(e), wallet=wallet_address)
-            return jsonify({'error': 'Failed to create verification applicant'}), 500
-        
-        # Create verification record
+        # Create verification record; the provider applicant is created by a
+        # Celery task so the request does not wait on the provider API
         verification = KYCVerification(
             wallet_address=wallet_address,
-            user_id=user.id if user else None,
-            provider=kyc_service.provider_name,
-            applicant_id=applicant_result['applicant_id'],
-            status='pending',
+            user_id=int(current_user_id) if current_user_id else None,
+            status='queued',
             first_name=first_name,
             last_name=last_name,
             email=email,
-            country_code=data.get('country')
+            country_code=country
         )
         
+        # Flush for the id and read it before commit: committing expires the
+        # instance, and touching verification.id afterwards would re-SELECT
         db.session.add(verification)
-        db.session.commit()
+        db.session.flush()
+        verification_id = verification.id
+        _commit_without_wal_wait()
         
-        # Generate SDK token for frontend
-        try:
-            sdk_token = kyc_service.generate_sdk_token(
-                applicant_result['applicant_id'],
-                referrer="*/*"  # Allow all referrers - should be restricted in production
-            )
-        except Exception as e:
-            logger.error("kyc_generate_sdk_token_failed", error=str(e))
-            sdk_token = None
+        create_kyc_applicant.delay(verification_id, asdict(applicant_data))
         
         # Send email notification (async)
         send_kyc_started_email.delay(
-            data['email'],
-            f"{data['first_name']} {data['last_name']}",
+            email,
+            f"{first_name} {last_name}",
             {'wallet_address': wallet_address}
         )
         
         logger.info(
-            "kyc_verification_started",
+            "kyc_verification_queued",
             wallet_address=wallet_address,
-            verification_id=verification.id
+            verification_id=verification_id
         )
         
+        # Client polls /status and then fetches /sdk-token/<id> once pending
         return jsonify({
             'success': True,
-            'verification_id': verification.id,
-            'applicant_id': applicant_result['applicant_id'],
-            'sdk_token': sdk_token,
-            'status': 'pending'
-        }), 201
+            'verification_id': verification_id,
+            'status': 'queued'
+        }), 202
         
     except Exception as e:
         logger.error("kyc_start_error", error=str(e))
@@ -183,37 +172,26 @@ def create_check():
         if not verification:
             return jsonify({'error': 'Verification not found'}), 404
         
-        if verification.status not in ['pending']:
+        if verification.status not in ['pending'] or not verification.applicant_id:
             return jsonify({'error': 'Verification already in progress or completed'}), 400
         
-        kyc_service = get_kyc_service()
-        
-        try:
-            check_result = kyc_service.create_check(
-                verification.applicant_id,
-                check_types=['document', 'facial_similarity_photo']
-            )
-        except Exception as e:
-            logger.error("kyc_create_check_failed", error=str(e), verification_id=verification_id)
-            return jsonify({'error': 'Failed to create verification check'}), 500
-        
-        # Update verification record
-        verification.check_id = check_result['check_id']
+        # Mark in progress now so the check is only queued once; the task
+        # creates the provider check and records its check_id
         verification.status = 'in_progress'
-        verification.updated_at = datetime.utcnow()
         db.session.commit()
         
-        logger.info(
-            "kyc_check_created",
-            verification_id=verification_id,
-            check_id=check_result['check_id']
+        create_kyc_check.delay(
+            verification.id,
+            ['document', 'facial_similarity_photo']
         )
         
+        logger.info("kyc_check_queued", verification_id=verification_id)
+        
         return jsonify({
             'success': True,
-            'check_id': check_result['check_id'],
+            'verification_id': verification.id,
             'status': 'in_progress'
-        })
+        }), 202
         
     except Exception as e:
         logger.error("kyc_create_check_error", error=str(e))
@@ -233,7 +211,7 @@ def get_verification_status(wallet_address: str):
         # Get latest verification for this address
         verification = KYCVerification.query.filter_by(
             wallet_address=wallet_address
-        ).order_by(KYCVerification.created_at.desc()).first()
+        ).order_by(KYCVerification.created_at.desc()).limit(1).first()
         
         if not verification:
             return jsonify({
@@ -295,32 +273,39 @@ def webhook():
 def list_verifications():
     """List all KYC verifications (admin only)"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        claims = get_jwt()
         
-        if not user or user.role not in ['admin', 'transfer_agent']:
+        if claims.get('role') not in ['admin', 'transfer_agent']:
             return jsonify({'error': 'Unauthorized'}), 403
         
-        # Pagination
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        # Keyset pagination on (created_at, id); no COUNT(*) per page
+        try:
+            limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+            cursor = decode_cursor(request.args.get('cursor'), datetime, int)
+        except ValidationError:
+            return jsonify({'error': 'Invalid pagination cursor'}), 400
         status_filter = request.args.get('status')
         
-        query = KYCVerification.query
+        # Plain column rows: no ORM identity map or instrumented attributes
+        stmt = select(*KYC_LIST_COLUMNS)
         
         if status_filter:
-            query = query.filter_by(status=status_filter)
+            stmt = stmt.where(KYCVerification.status == status_filter)
         
-        query = query.order_by(KYCVerification.created_at.desc())
-        pagination = query.paginate(page=page, per_page=per_page)
+        if cursor:
+            stmt = stmt.where(tuple_(KYCVerification.created_at, KYCVerification.id) < tuple_(*cursor))
         
-        return jsonify({
-            'verifications': [v.to_dict() for v in pagination.items],
-            'total': pagination.total,
-            'page': page,
-            'per_page': per_page,
-            'pages': pagination.pages
-        })
+        stmt = stmt.order_by(
+            KYCVerification.created_at.desc(), KYCVerification.id.desc()
+        ).limit(limit + 1)
+        
+        rows = db.session.execute(stmt)
+        
+        return page_response(
+            'verifications', rows, limit,
+            serialize=KYCVerification.row_to_dict,
+            cursor_of=lambda row: (row.created_at, row.id)
+        )
         
     except Exception as e:
         logger.error("kyc_list_error", error=str(e))
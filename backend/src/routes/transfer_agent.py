@@ -8,25 +8,270 @@ Security Features (OWASP):
 - Role-based access control (transfer_agent role required for writes)
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
-from sqlalchemy import desc, func
+from collections import Counter
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import desc, func, insert, lambda_stmt, literal, select, tuple_, union_all
 from src.models.token import (
     db, TokenDeployment, VerifiedAddress, ComplianceEvent, 
-    TransferAgentUser, TokenMetrics
+    TransferAgentUser, TokenMetrics, TokenStats,
+    TOKEN_LIST_COLUMNS, VERIFIED_ADDRESS_COLUMNS, COMPLIANCE_EVENT_COLUMNS
 )
 from src.middleware.auth import transfer_agent_required, admin_required
 from src.middleware.rate_limit import rate_limit_read, rate_limit_write, rate_limit_public
 from src.middleware.validation import (
     validate_request, validate_query_params, PAGINATION_SCHEMA,
-    TOKEN_REGISTER_SCHEMA, ADDRESS_VERIFY_SCHEMA, COMPLIANCE_EVENT_SCHEMA,
-    is_valid_ethereum_address, sanitize_string, sanitize_html
+    TOKEN_REGISTER_SCHEMA, ADDRESS_VERIFY_SCHEMA, COMPLIANCE_EVENT_SCHEMA, COMPLIANCE_EVENT_BATCH_SCHEMA,
+    is_valid_ethereum_address, parse_bool, sanitize_string, sanitize_html, ValidationError
+)
+from src.middleware.pagination import encode_cursor, decode_cursor, fetch_page
+from src.services.cache import (
+    LRUCache, cache_get, cache_set, cache_delete, cache_version, cache_bump_version
 )
-import json
 
 transfer_agent_bp = Blueprint('transfer_agent', __name__)
 
+# Allowed filter values: frozensets for membership, messages built once
+_ASSET_TYPES = ['real_estate', 'equity', 'debt', 'commodity', 'art', 'other']
+_FRAMEWORKS = ['reg_d', 'reg_s', 'reg_a', 'reg_cf', 'mifid_ii', 'other']
+_VERIFICATION_LEVELS = ['basic', 'accredited', 'institutional']
+_EVENT_TYPES = ['transfer_blocked', 'compliance_check', 'verification_expired', 'limit_exceeded', 'jurisdiction_violation']
+_SEVERITIES = ['info', 'warning', 'critical']
+
+_VALID_ASSET_TYPES = frozenset(_ASSET_TYPES)
+_VALID_FRAMEWORKS = frozenset(_FRAMEWORKS)
+_VALID_VERIFICATION_LEVELS = frozenset(_VERIFICATION_LEVELS)
+_VALID_EVENT_TYPES = frozenset(_EVENT_TYPES)
+_VALID_SEVERITIES = frozenset(_SEVERITIES)
+
+_INVALID_ASSET_TYPE_MSG = f'Invalid asset_type. Must be one of: {_ASSET_TYPES}'
+_INVALID_FRAMEWORK_MSG = f'Invalid regulatory_framework. Must be one of: {_FRAMEWORKS}'
+_INVALID_LEVEL_MSG = f'Invalid verification_level. Must be one of: {_VERIFICATION_LEVELS}'
+_INVALID_EVENT_TYPE_MSG = f'Invalid event_type. Must be one of: {_EVENT_TYPES}'
+_INVALID_SEVERITY_MSG = f'Invalid severity. Must be one of: {_SEVERITIES}'
+
+# Public aggregate endpoints are versioned by Redis counters that writes
+# bump. The version is the ETag, and cached bodies are keyed by it, so a
+# write makes both stale at once and old bodies just age out by TTL.
+DASHBOARD_VERSION_KEY = 'dashboard:version'
+DASHBOARD_CACHE_TTL = 30
+METRICS_CACHE_TTL = 60
+
+# Per-token metrics versions expire, so one exists only for tokens read in
+# the last day and no ETag outlives it. Writes delete the version instead
+# of bumping it; the next read seeds a newer one from the clock.
+METRICS_VERSION_TTL = 86400
+
+# Process tier in front of Redis for the dashboard body. Keyed by version,
+# so entries never go stale: a write anywhere moves every worker to a new key
+_dashboard_lru = LRUCache(maxsize=4)
+
+# Health responses are rebuilt at most once per second
+HEALTH_CACHE_TTL = 1
+_health_lru = LRUCache(maxsize=1)
+
+# Token address -> id never changes, so the TTL only bounds drift after a
+# database reset
+TOKEN_ID_CACHE_TTL = 300
+
+
+def _metrics_version_key(token_address: str) -> str:
+    return f'token:metrics:version:{token_address}'
+
+
+def _invalidate_cached_stats(token_address=None):
+    """Move dashboard (and per-token metrics) to a new version after a committed write"""
+    cache_bump_version(DASHBOARD_VERSION_KEY)
+    if token_address:
+        cache_delete(_metrics_version_key(token_address))
+
+
+def _json_response(body: bytes, etag=None) -> Response:
+    response = Response(body, mimetype='application/json')
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def _not_modified(etag):
+    """
+    304 response if the client's If-None-Match already holds etag, else None.
+    
+    etag is None when Redis is unavailable; the request is then served
+    normally and without an ETag.
+    """
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    return response
+
+
+def _token_id_cache_key(token_address: str) -> str:
+    return f'token:id:{token_address}'
+
+
+def _token_not_found(token_address: str):
+    """
+    404 for a token address, dropping any cached id for it.
+    
+    A cached id can outlive its row (see _find_token_id), so every "not
+    found" also clears the entry that may have led here.
+    """
+    cache_delete(_token_id_cache_key(token_address))
+    return jsonify({'success': False, 'error': 'Token not found'}), 404
+
+
+def _lookup_token_id(token_address: str):
+    """Id of the token at a lowercased address, read from the database"""
+    return db.session.scalar(lambda_stmt(
+        lambda: select(TokenDeployment.id).where(TokenDeployment.token_address == token_address)
+    ))
+
+
+def _find_token_id(token_address: str):
+    """
+    Id of the token at a lowercased address, or None.
+    
+    Looked up on almost every transfer agent request. The API never
+    deletes or re-addresses tokens, so found ids are cached in Redis and
+    no write has to invalidate them; misses are not cached, so a newly registered
+    token is visible at once. On a cache miss the statement is a
+    lambda_stmt: SQLAlchemy caches it by code location and only binds the
+    address, skipping statement construction and cache-key generation.
+    
+    A database reset can still leave a cached id that is missing or now
+    belongs to another token. Callers therefore confirm the id against the
+    address where they read by it (_token_id_matches) and answer a
+    mismatch with _token_not_found(), which evicts the entry. Checks that
+    must be exact, such as registration, use _lookup_token_id() instead.
+    """
+    cache_key = _token_id_cache_key(token_address)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return int(cached)
+    
+    token_id = _lookup_token_id(token_address)
+    if token_id is not None:
+        cache_set(cache_key, str(token_id).encode(), TOKEN_ID_CACHE_TTL)
+    return token_id
+
+
+def _token_id_matches(token_id: int, token_address: str):
+    """
+    SQL condition that holds only while token_id still belongs to token_address.
+    
+    An uncorrelated scalar subquery, evaluated once per statement; added to
+    queries by a cached token id so a stale id cannot pull in another
+    token's rows.
+    """
+    return select(TokenDeployment.token_address).where(
+        TokenDeployment.id == token_id
+    ).scalar_subquery() == token_address
+
+
+def _token_address_of(token_id: int):
+    """Address of the token with this id, or None"""
+    return db.session.scalar(lambda_stmt(
+        lambda: select(TokenDeployment.token_address).where(TokenDeployment.id == token_id)
+    ))
+
+
+def _find_token(token_address: str):
+    """Token at a lowercased address, or None (see _find_token_id)"""
+    return db.session.scalars(lambda_stmt(
+        lambda: select(TokenDeployment).where(TokenDeployment.token_address == token_address).limit(1)
+    )).first()
+
+
+def _compliance_event_values(token_id: int, validated_data: dict) -> dict:
+    """Column values for a ComplianceEvent from COMPLIANCE_EVENT_SCHEMA data"""
+    amount = validated_data.get('amount')
+    return {
+        'token_deployment_id': token_id,
+        'event_type': validated_data['event_type'],
+        'from_address': validated_data.get('from_address'),
+        'to_address': validated_data.get('to_address'),
+        # Wei amounts overflow database integers; the column is text
+        'amount': str(amount) if amount is not None else None,
+        'reason': validated_data['reason'],
+        'transaction_hash': validated_data.get('transaction_hash'),
+        'block_number': validated_data.get('block_number'),
+        'severity': validated_data.get('severity', 'info'),
+        'event_metadata': validated_data.get('metadata') or None
+    }
+
+
+# Worker pool for independent read queries within one request; each worker
+# pushes its own app context, so it gets its own session and connection
+_query_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='transfer-agent-query')
+
+
+def _gather(*queries):
+    """
+    Run independent read-only query callables and return their results in order.
+    
+    On PostgreSQL they run concurrently, so the request waits for the
+    slowest query instead of the sum of all of them. Other databases (the
+    in-memory SQLite used by tests shares one connection) run them serially.
+    Results must be plain values or Core rows, not ORM instances: the
+    worker session is closed when its app context ends, leaving instances
+    detached with nothing to load expired or lazy attributes from.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return [query() for query in queries]
+    
+    app = current_app._get_current_object()
+    
+    def run(query):
+        with app.app_context():
+            return query()
+    
+    return list(_query_executor.map(run, queries))
+
+
+def _seek_page(key, stmt, sort_column, id_column, per_page, page, cursor, serialize, token=None):
+    """
+    One newest-first keyset page of the select() stmt as
+    {"success": true, "data": {key: [...], "pagination": {...}}}.
+    
+    With a cursor the page starts after (sort_key, id) of the previous
+    page's last row. Without one, page numbers are still honoured via
+    OFFSET for existing clients, but no COUNT(*) is issued either way.
+    
+    token is the (token_id, token_address) a per-token stmt filters on
+    with _token_id_matches(). That filter keeps a stale id from returning
+    another token's rows; an empty page is then checked once more so a
+    missing token is a 404 rather than an empty list.
+    """
+    if cursor:
+        stmt = stmt.where(tuple_(sort_column, id_column) < tuple_(*cursor))
+    elif page > 1:
+        stmt = stmt.offset((page - 1) * per_page)
+    
+    rows, has_next = fetch_page(db.session.execute(
+        stmt.order_by(sort_column.desc(), id_column.desc()).limit(per_page + 1)
+    ), per_page)
+    
+    if not rows and token is not None and _token_address_of(token[0]) != token[1]:
+        return _token_not_found(token[1])
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            key: [serialize(row) for row in rows],
+            'pagination': {
+                'page': None if cursor else page,
+                'per_page': per_page,
+                'has_next': has_next,
+                'next_cursor': encode_cursor(getattr(rows[-1], sort_column.key), rows[-1].id) if has_next else None
+            }
+        }
+    })
+
 # Token Management Endpoints
 
 @transfer_agent_bp.route('/tokens', methods=['GET'])
@@ -38,55 +283,41 @@ def get_tokens(validated_params):
     try:
         page = validated_params.get('page', 1)
         per_page = validated_params.get('per_page', 20)
+        try:
+            cursor = decode_cursor(request.args.get('cursor'), datetime, int)
+        except ValidationError:
+            return jsonify({'success': False, 'error': 'Invalid pagination cursor'}), 400
         
         # Get optional filters from query params (validated separately)
         asset_type = request.args.get('asset_type')
         regulatory_framework = request.args.get('regulatory_framework')
-        is_active = request.args.get('is_active', type=bool)
+        is_active = request.args.get('is_active', type=parse_bool)
         
         # Validate filter values if provided
-        valid_asset_types = ['real_estate', 'equity', 'debt', 'commodity', 'art', 'other']
-        valid_frameworks = ['reg_d', 'reg_s', 'reg_a', 'reg_cf', 'mifid_ii', 'other']
-        
-        if asset_type and asset_type not in valid_asset_types:
-            return jsonify({'success': False, 'error': f'Invalid asset_type. Must be one of: {valid_asset_types}'}), 400
+        if asset_type and asset_type not in _VALID_ASSET_TYPES:
+            return jsonify({'success': False, 'error': _INVALID_ASSET_TYPE_MSG}), 400
         
-        if regulatory_framework and regulatory_framework not in valid_frameworks:
-            return jsonify({'success': False, 'error': f'Invalid regulatory_framework. Must be one of: {valid_frameworks}'}), 400
+        if regulatory_framework and regulatory_framework not in _VALID_FRAMEWORKS:
+            return jsonify({'success': False, 'error': _INVALID_FRAMEWORK_MSG}), 400
         
-        query = TokenDeployment.query
+        # Plain column rows: no ORM identity map, and the child counts come
+        # from correlated subqueries instead of loading each collection
+        stmt = select(*TOKEN_LIST_COLUMNS)
         
         # Apply filters
         if asset_type:
-            query = query.filter(TokenDeployment.asset_type == asset_type)
+            stmt = stmt.where(TokenDeployment.asset_type == asset_type)
         if regulatory_framework:
-            query = query.filter(TokenDeployment.regulatory_framework == regulatory_framework)
+            stmt = stmt.where(TokenDeployment.regulatory_framework == regulatory_framework)
         if is_active is not None:
-            query = query.filter(TokenDeployment.is_active == is_active)
+            stmt = stmt.where(TokenDeployment.is_active == is_active)
         
-        # Order by deployment date (newest first)
-        query = query.order_by(desc(TokenDeployment.deployment_date))
-        
-        # Paginate
-        tokens = query.paginate(
-            page=page, per_page=per_page, error_out=False
+        # Newest first, seeking on (deployment_date, id)
+        return _seek_page(
+            'tokens', stmt, TokenDeployment.deployment_date, TokenDeployment.id,
+            per_page, page, cursor, serialize=TokenDeployment.row_to_dict
         )
         
-        return jsonify({
-            'success': True,
-            'data': {
-                'tokens': [token.to_dict() for token in tokens.items],
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': tokens.total,
-                    'pages': tokens.pages,
-                    'has_next': tokens.has_next,
-                    'has_prev': tokens.has_prev
-                }
-            }
-        })
-        
     except Exception as e:
         return jsonify({'success': False, 'error': 'Failed to fetch tokens'}), 500
 
@@ -100,38 +331,47 @@ def get_token_details(token_address):
         if not is_valid_ethereum_address(token_address):
             return jsonify({'success': False, 'error': 'Invalid token address format'}), 400
         
-        token = TokenDeployment.query.filter_by(token_address=token_address.lower()).first()
-        if not token:
+        token_address = token_address.lower()
+        token_id = _find_token_id(token_address)
+        if token_id is None:
             return jsonify({'success': False, 'error': 'Token not found'}), 404
         
-        # Get recent compliance events
-        recent_events = ComplianceEvent.query.filter_by(
-            token_deployment_id=token.id
-        ).order_by(desc(ComplianceEvent.timestamp)).limit(10).all()
+        token, recent_events, stats, latest_metrics = _gather(
+            # Token row with its child counts selected inline, rather than an
+            # instance whose deferred counts would each cost a round trip
+            lambda: db.session.execute(select(*TOKEN_LIST_COLUMNS).where(
+                TokenDeployment.id == token_id
+            )).one_or_none(),
+            # Recent compliance events
+            lambda: db.session.execute(select(*COMPLIANCE_EVENT_COLUMNS).where(
+                ComplianceEvent.token_deployment_id == token_id
+            ).order_by(desc(ComplianceEvent.timestamp)).limit(10)).all(),
+            # Verification statistics, from the per-level counters rather
+            # than a GROUP BY over every verified address
+            lambda: db.session.execute(select(TokenStats.__table__).where(
+                TokenStats.token_deployment_id == token_id
+            )).one_or_none(),
+            # Latest metrics
+            lambda: db.session.execute(select(TokenMetrics.__table__).where(
+                TokenMetrics.token_deployment_id == token_id
+            ).order_by(desc(TokenMetrics.metric_date)).limit(1)).first()
+        )
         
-        # Get verification statistics
-        verification_stats = db.session.query(
-            VerifiedAddress.verification_level,
-            func.count(VerifiedAddress.id).label('count')
-        ).filter_by(
-            token_deployment_id=token.id,
-            is_active=True
-        ).group_by(VerifiedAddress.verification_level).all()
+        # A stale cached id: the row is gone or is now another token's
+        if token is None or token.token_address != token_address:
+            return _token_not_found(token_address)
         
-        # Get latest metrics
-        latest_metrics = TokenMetrics.query.filter_by(
-            token_deployment_id=token.id
-        ).order_by(desc(TokenMetrics.metric_date)).first()
+        # Counter row is created on the token's next write; count until then
+        if stats is None:
+            stats = TokenStats.recount(token_id)
         
         return jsonify({
             'success': True,
             'data': {
-                'token': token.to_dict(),
-                'recent_events': [event.to_dict() for event in recent_events],
-                'verification_stats': [
-                    {'level': stat[0], 'count': stat[1]} for stat in verification_stats
-                ],
-                'latest_metrics': latest_metrics.to_dict() if latest_metrics else None
+                'token': TokenDeployment.row_to_dict(token),
+                'recent_events': [ComplianceEvent.row_to_dict(event, raw_metadata=True) for event in recent_events],
+                'verification_stats': TokenStats.verification_stats(stats),
+                'latest_metrics': TokenMetrics.row_to_dict(latest_metrics) if latest_metrics else None
             }
         })
         
@@ -151,14 +391,11 @@ def register_token(validated_data):
     Rate limit: 30 requests/minute
     """
     try:
-        token_address = validated_data['token_address'].lower()
+        token_address = validated_data['token_address']
         
-        # Check if token already exists
-        existing_token = TokenDeployment.query.filter_by(
-            token_address=token_address
-        ).first()
-        
-        if existing_token:
+        # Check if token already exists; against the database, since a stale
+        # cached id must not block registration
+        if _lookup_token_id(token_address) is not None:
             return jsonify({'success': False, 'error': 'Token already registered'}), 409
         
         # Create new token deployment record
@@ -170,16 +407,19 @@ def register_token(validated_data):
             regulatory_framework=validated_data['regulatory_framework'],
             jurisdiction=validated_data['jurisdiction'],
             max_supply=validated_data['max_supply'],
-            deployer_address=validated_data['deployer_address'].lower(),
-            compliance_address=validated_data['compliance_address'].lower(),
-            identity_registry_address=validated_data['identity_registry_address'].lower(),
+            deployer_address=validated_data['deployer_address'],
+            compliance_address=validated_data['compliance_address'],
+            identity_registry_address=validated_data['identity_registry_address'],
             deployment_tx_hash=validated_data.get('deployment_tx_hash'),
             description=validated_data.get('description'),  # Already sanitized by schema
             document_hash=validated_data.get('document_hash')
         )
         
         db.session.add(token)
+        db.session.flush()
+        db.session.add(TokenStats(token_deployment_id=token.id))
         db.session.commit()
+        _invalidate_cached_stats()
         
         return jsonify({
             'success': True,
@@ -203,53 +443,44 @@ def get_verified_addresses(token_address, validated_params):
         if not is_valid_ethereum_address(token_address):
             return jsonify({'success': False, 'error': 'Invalid token address format'}), 400
         
-        token = TokenDeployment.query.filter_by(token_address=token_address.lower()).first()
-        if not token:
+        token_address = token_address.lower()
+        token_id = _find_token_id(token_address)
+        if token_id is None:
             return jsonify({'success': False, 'error': 'Token not found'}), 404
         
         page = validated_params.get('page', 1)
         per_page = min(validated_params.get('per_page', 50), 100)  # Cap at 100
+        try:
+            cursor = decode_cursor(request.args.get('cursor'), datetime, int)
+        except ValidationError:
+            return jsonify({'success': False, 'error': 'Invalid pagination cursor'}), 400
         
         # Get optional filters
         verification_level = request.args.get('verification_level')
-        is_active = request.args.get('is_active', type=bool)
+        is_active = request.args.get('is_active', type=parse_bool)
         
         # Validate verification_level
-        valid_levels = ['basic', 'accredited', 'institutional']
-        if verification_level and verification_level not in valid_levels:
-            return jsonify({'success': False, 'error': f'Invalid verification_level. Must be one of: {valid_levels}'}), 400
+        if verification_level and verification_level not in _VALID_VERIFICATION_LEVELS:
+            return jsonify({'success': False, 'error': _INVALID_LEVEL_MSG}), 400
         
-        query = VerifiedAddress.query.filter_by(token_deployment_id=token.id)
+        stmt = select(*VERIFIED_ADDRESS_COLUMNS).where(
+            VerifiedAddress.token_deployment_id == token_id,
+            _token_id_matches(token_id, token_address)
+        )
         
         # Apply filters
         if verification_level:
-            query = query.filter(VerifiedAddress.verification_level == verification_level)
+            stmt = stmt.where(VerifiedAddress.verification_level == verification_level)
         if is_active is not None:
-            query = query.filter(VerifiedAddress.is_active == is_active)
-        
-        # Order by verification date (newest first)
-        query = query.order_by(desc(VerifiedAddress.verification_date))
+            stmt = stmt.where(VerifiedAddress.is_active == is_active)
         
-        # Paginate
-        addresses = query.paginate(
-            page=page, per_page=per_page, error_out=False
+        # Newest first, seeking on (verification_date, id)
+        return _seek_page(
+            'addresses', stmt, VerifiedAddress.verification_date, VerifiedAddress.id,
+            per_page, page, cursor, serialize=VerifiedAddress.row_to_dict,
+            token=(token_id, token_address)
         )
         
-        return jsonify({
-            'success': True,
-            'data': {
-                'addresses': [addr.to_dict() for addr in addresses.items],
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': addresses.total,
-                    'pages': addresses.pages,
-                    'has_next': addresses.has_next,
-                    'has_prev': addresses.has_prev
-                }
-            }
-        })
-        
     except Exception as e:
         return jsonify({'success': False, 'error': 'Failed to fetch verified addresses'}), 500
 
@@ -270,27 +501,29 @@ def add_verified_address(token_address, validated_data):
         if not is_valid_ethereum_address(token_address):
             return jsonify({'success': False, 'error': 'Invalid token address format'}), 400
         
-        token = TokenDeployment.query.filter_by(token_address=token_address.lower()).first()
+        token = _find_token(token_address.lower())
         if not token:
             return jsonify({'success': False, 'error': 'Token not found'}), 404
         
-        investor_address = validated_data['address'].lower()
+        investor_address = validated_data['address']
+        token_id = token.id
         
-        # Check if address already verified for this token
-        existing_address = VerifiedAddress.query.filter_by(
-            token_deployment_id=token.id,
-            address=investor_address
-        ).first()
+        # Check if address already verified for this token (cached statement,
+        # id only: the row itself is never used)
+        existing_id = db.session.scalar(lambda_stmt(
+            lambda: select(VerifiedAddress.id).where(
+                VerifiedAddress.token_deployment_id == token_id,
+                VerifiedAddress.address == investor_address
+            ).limit(1)
+        ))
         
-        if existing_address:
+        if existing_id is not None:
             return jsonify({'success': False, 'error': 'Address already verified for this token'}), 409
         
         # Parse expiration date
         try:
-            expiration_date = datetime.fromisoformat(
-                validated_data['expiration_date'].replace('Z', '+00:00')
-            )
-        except (ValueError, AttributeError):
+            expiration_date = datetime.fromisoformat(validated_data['expiration_date'])
+        except (ValueError, TypeError):
             return jsonify({'success': False, 'error': 'Invalid expiration_date format. Use ISO 8601.'}), 400
         
         # Create verified address record
@@ -306,7 +539,11 @@ def add_verified_address(token_address, validated_data):
         )
         
         db.session.add(verified_address)
+        TokenStats.bump(token.id, **TokenStats.verification_deltas(
+            None, False, verified_address.verification_level, True
+        ))
         db.session.commit()
+        _invalidate_cached_stats(token.token_address)
         
         return jsonify({
             'success': True,
@@ -329,7 +566,7 @@ def update_verified_address(address_id):
     Rate limit: 30 requests/minute
     """
     try:
-        verified_address = VerifiedAddress.query.get(address_id)
+        verified_address = db.session.get(VerifiedAddress, address_id)
         if not verified_address:
             return jsonify({'success': False, 'error': 'Verified address not found'}), 404
         
@@ -337,23 +574,24 @@ def update_verified_address(address_id):
         if not data:
             return jsonify({'success': False, 'error': 'Request body required'}), 400
         
-        # Validate and update allowed fields
-        valid_levels = ['basic', 'accredited', 'institutional']
+        old_level = verified_address.verification_level
+        was_active = bool(verified_address.is_active)
         
+        # Validate and update allowed fields
         if 'verification_level' in data:
-            if data['verification_level'] not in valid_levels:
-                return jsonify({'success': False, 'error': f'Invalid verification_level. Must be one of: {valid_levels}'}), 400
-            verified_address.verification_level = data['verification_level']
+            # Lists and dicts are unhashable, so check the type before the set lookup
+            level = data['verification_level']
+            if not isinstance(level, str) or level not in _VALID_VERIFICATION_LEVELS:
+                return jsonify({'success': False, 'error': _INVALID_LEVEL_MSG}), 400
+            verified_address.verification_level = level
         
         if 'jurisdiction' in data:
             verified_address.jurisdiction = sanitize_string(data['jurisdiction'], max_length=100)
         
         if 'expiration_date' in data:
             try:
-                verified_address.expiration_date = datetime.fromisoformat(
-                    data['expiration_date'].replace('Z', '+00:00')
-                )
-            except (ValueError, AttributeError):
+                verified_address.expiration_date = datetime.fromisoformat(data['expiration_date'])
+            except (ValueError, TypeError):
                 return jsonify({'success': False, 'error': 'Invalid expiration_date format'}), 400
         
         if 'kyc_provider' in data:
@@ -365,7 +603,12 @@ def update_verified_address(address_id):
         if 'notes' in data:
             verified_address.notes = sanitize_html(sanitize_string(data['notes'], max_length=2000))
         
+        # Only a level or active-state change moves the counters
+        TokenStats.bump(verified_address.token_deployment_id, **TokenStats.verification_deltas(
+            old_level, was_active, verified_address.verification_level, bool(verified_address.is_active)
+        ))
         db.session.commit()
+        _invalidate_cached_stats(verified_address.token_deployment.token_address)
         
         return jsonify({
             'success': True,
@@ -388,61 +631,51 @@ def get_compliance_events(token_address, validated_params):
         if not is_valid_ethereum_address(token_address):
             return jsonify({'success': False, 'error': 'Invalid token address format'}), 400
         
-        token = TokenDeployment.query.filter_by(token_address=token_address.lower()).first()
-        if not token:
+        token_address = token_address.lower()
+        token_id = _find_token_id(token_address)
+        if token_id is None:
             return jsonify({'success': False, 'error': 'Token not found'}), 404
         
         page = validated_params.get('page', 1)
         per_page = min(validated_params.get('per_page', 50), 100)
+        try:
+            cursor = decode_cursor(request.args.get('cursor'), datetime, int)
+        except ValidationError:
+            return jsonify({'success': False, 'error': 'Invalid pagination cursor'}), 400
         
         # Get optional filters
         event_type = request.args.get('event_type')
         severity = request.args.get('severity')
-        resolved = request.args.get('resolved', type=bool)
+        resolved = request.args.get('resolved', type=parse_bool)
         
         # Validate filter values
-        valid_event_types = ['transfer_blocked', 'compliance_check', 'verification_expired', 'limit_exceeded', 'jurisdiction_violation']
-        valid_severities = ['info', 'warning', 'critical']
-        
-        if event_type and event_type not in valid_event_types:
-            return jsonify({'success': False, 'error': f'Invalid event_type. Must be one of: {valid_event_types}'}), 400
+        if event_type and event_type not in _VALID_EVENT_TYPES:
+            return jsonify({'success': False, 'error': _INVALID_EVENT_TYPE_MSG}), 400
         
-        if severity and severity not in valid_severities:
-            return jsonify({'success': False, 'error': f'Invalid severity. Must be one of: {valid_severities}'}), 400
+        if severity and severity not in _VALID_SEVERITIES:
+            return jsonify({'success': False, 'error': _INVALID_SEVERITY_MSG}), 400
         
-        query = ComplianceEvent.query.filter_by(token_deployment_id=token.id)
+        stmt = select(*COMPLIANCE_EVENT_COLUMNS).where(
+            ComplianceEvent.token_deployment_id == token_id,
+            _token_id_matches(token_id, token_address)
+        )
         
         # Apply filters
         if event_type:
-            query = query.filter(ComplianceEvent.event_type == event_type)
+            stmt = stmt.where(ComplianceEvent.event_type == event_type)
         if severity:
-            query = query.filter(ComplianceEvent.severity == severity)
+            stmt = stmt.where(ComplianceEvent.severity == severity)
         if resolved is not None:
-            query = query.filter(ComplianceEvent.resolved == resolved)
-        
-        # Order by timestamp (newest first)
-        query = query.order_by(desc(ComplianceEvent.timestamp))
-        
-        # Paginate
-        events = query.paginate(
-            page=page, per_page=per_page, error_out=False
+            stmt = stmt.where(ComplianceEvent.resolved == resolved)
+        
+        # Newest first, seeking on (timestamp, id)
+        return _seek_page(
+            'events', stmt, ComplianceEvent.timestamp, ComplianceEvent.id,
+            per_page, page, cursor,
+            serialize=lambda event: ComplianceEvent.row_to_dict(event, raw_metadata=True),
+            token=(token_id, token_address)
         )
         
-        return jsonify({
-            'success': True,
-            'data': {
-                'events': [event.to_dict() for event in events.items],
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': events.total,
-                    'pages': events.pages,
-                    'has_next': events.has_next,
-                    'has_prev': events.has_prev
-                }
-            }
-        })
-        
     except Exception as e:
         return jsonify({'success': False, 'error': 'Failed to fetch compliance events'}), 500
 
@@ -460,28 +693,17 @@ def log_compliance_event(validated_data):
     """
     try:
         # Find token
-        token = TokenDeployment.query.filter_by(
-            token_address=validated_data['token_address'].lower()
-        ).first()
+        token = _find_token(validated_data['token_address'])
         if not token:
             return jsonify({'success': False, 'error': 'Token not found'}), 404
         
         # Create compliance event
-        event = ComplianceEvent(
-            token_deployment_id=token.id,
-            event_type=validated_data['event_type'],
-            from_address=validated_data.get('from_address', '').lower() if validated_data.get('from_address') else None,
-            to_address=validated_data.get('to_address', '').lower() if validated_data.get('to_address') else None,
-            amount=validated_data.get('amount'),
-            reason=validated_data['reason'],
-            transaction_hash=validated_data.get('transaction_hash'),
-            block_number=validated_data.get('block_number'),
-            severity=validated_data.get('severity', 'info'),
-            event_metadata=json.dumps(validated_data.get('metadata')) if validated_data.get('metadata') else None
-        )
+        event = ComplianceEvent(**_compliance_event_values(token.id, validated_data))
         
         db.session.add(event)
+        TokenStats.bump(token.id, events_total=1, events_unresolved=1)
         db.session.commit()
+        _invalidate_cached_stats(token.token_address)
         
         return jsonify({
             'success': True,
@@ -492,6 +714,68 @@ def log_compliance_event(validated_data):
         db.session.rollback()
         return jsonify({'success': False, 'error': 'Failed to log compliance event'}), 500
 
+@transfer_agent_bp.route('/compliance-events/batch', methods=['POST'])
+@jwt_required()
+@transfer_agent_required()
+@rate_limit_write
+@validate_request(COMPLIANCE_EVENT_BATCH_SCHEMA)
+def log_compliance_events_batch(validated_data):
+    """
+    Log many compliance events in one transaction.
+    
+    For on-chain monitors that emit bursts of events: the batch is one
+    multi-row INSERT and one commit instead of a commit per event.
+    
+    Request body: {"events": [<compliance event>, ...]} (1-500 items,
+    each validated like POST /compliance-events)
+    
+    Requires: transfer_agent role
+    Rate limit: 30 requests/minute
+    """
+    try:
+        events = []
+        for index, item in enumerate(validated_data['events']):
+            if not isinstance(item, dict):
+                return jsonify(ValidationError('Each event must be an object', field=f'events[{index}]').to_dict()), 400
+            try:
+                events.append(COMPLIANCE_EVENT_SCHEMA.validate(item))
+            except ValidationError as e:
+                e.field = f'events[{index}]'
+                return jsonify(e.to_dict()), 400
+        
+        # Resolve every referenced token in one query
+        addresses = {event['token_address'] for event in events}
+        token_ids = dict(db.session.execute(
+            select(TokenDeployment.token_address, TokenDeployment.id)
+            .where(TokenDeployment.token_address.in_(addresses))
+        ).all())
+        
+        missing = sorted(addresses - token_ids.keys())
+        if missing:
+            return jsonify({'success': False, 'error': 'Token not found', 'token_addresses': missing}), 404
+        
+        rows = [
+            _compliance_event_values(token_ids[event['token_address']], event)
+            for event in events
+        ]
+        db.session.execute(insert(ComplianceEvent), rows)
+        
+        for token_id, count in Counter(row['token_deployment_id'] for row in rows).items():
+            TokenStats.bump(token_id, events_total=count, events_unresolved=count)
+        
+        db.session.commit()
+        for token_address in addresses:
+            _invalidate_cached_stats(token_address)
+        
+        return jsonify({
+            'success': True,
+            'data': {'count': len(rows)}
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Failed to log compliance events'}), 500
+
 @transfer_agent_bp.route('/compliance-events/<int:event_id>/resolve', methods=['PUT'])
 @jwt_required()
 @transfer_agent_required()
@@ -504,17 +788,21 @@ def resolve_compliance_event(event_id):
     Rate limit: 30 requests/minute
     """
     try:
-        event = ComplianceEvent.query.get(event_id)
+        event = db.session.get(ComplianceEvent, event_id)
         if not event:
             return jsonify({'success': False, 'error': 'Compliance event not found'}), 404
         
         data = request.get_json() or {}
         
-        event.resolved = True
+        if not event.resolved:
+            event.resolved = True
+            TokenStats.bump(event.token_deployment_id, events_unresolved=-1)
         event.resolved_by = sanitize_string(data.get('resolved_by', ''), max_length=100) or None
-        event.resolved_date = datetime.utcnow()
+        # Stamped by the database at UPDATE time
+        event.resolved_date = func.now()
         
         db.session.commit()
+        _invalidate_cached_stats(event.token_deployment.token_address)
         
         return jsonify({
             'success': True,
@@ -536,105 +824,159 @@ def get_token_metrics(token_address):
         if not is_valid_ethereum_address(token_address):
             return jsonify({'success': False, 'error': 'Invalid token address format'}), 400
         
-        token = TokenDeployment.query.filter_by(token_address=token_address.lower()).first()
-        if not token:
-            return jsonify({'success': False, 'error': 'Token not found'}), 404
+        token_address = token_address.lower()
         
         # Validate and constrain days parameter
         days = request.args.get('days', 30, type=int)
         days = max(1, min(days, 365))  # Constrain to 1-365 days
-        
         start_date = datetime.utcnow().date() - timedelta(days=days)
         
-        # Get metrics for the specified period
-        metrics = TokenMetrics.query.filter(
-            TokenMetrics.token_deployment_id == token.id,
-            TokenMetrics.metric_date >= start_date
-        ).order_by(TokenMetrics.metric_date).all()
-        
-        # Get summary statistics
-        total_verified = VerifiedAddress.query.filter_by(
-            token_deployment_id=token.id,
-            is_active=True
-        ).count()
+        # Resolve the token first: a version is only seeded for real tokens
+        token_id = _find_token_id(token_address)
+        if token_id is None:
+            return jsonify({'success': False, 'error': 'Token not found'}), 404
         
-        total_events = ComplianceEvent.query.filter_by(
-            token_deployment_id=token.id
-        ).count()
+        # The window moves daily without any write, so the date is part of the tag
+        version = cache_version(_metrics_version_key(token_address), METRICS_VERSION_TTL)
+        etag = f'{version}-{start_date:%Y%m%d}' if version is not None else None
+        not_modified = _not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+        
+        cache_key = f'token:metrics:{token_address}:{days}:{etag}'
+        cached = cache_get(cache_key) if etag is not None else None
+        if cached is not None:
+            return _json_response(cached, etag)
+        
+        owner, metrics, stats = _gather(
+            # Confirms the (possibly cached) id still belongs to this address
+            lambda: _token_address_of(token_id),
+            # Metrics for the specified period
+            lambda: db.session.execute(select(TokenMetrics.__table__).where(
+                TokenMetrics.token_deployment_id == token_id,
+                TokenMetrics.metric_date >= start_date
+            ).order_by(TokenMetrics.metric_date)).all(),
+            # Summary counters
+            lambda: db.session.execute(select(TokenStats.__table__).where(
+                TokenStats.token_deployment_id == token_id
+            )).one_or_none()
+        )
+        if owner != token_address:
+            return _token_not_found(token_address)
         
-        unresolved_events = ComplianceEvent.query.filter_by(
-            token_deployment_id=token.id,
-            resolved=False
-        ).count()
+        # Counter row is created on the token's next write; count until then
+        if stats is None:
+            stats = TokenStats.recount(token_id)
         
-        return jsonify({
+        body = current_app.json.dumps_bytes({
             'success': True,
             'data': {
-                'metrics': [metric.to_dict() for metric in metrics],
+                'metrics': [TokenMetrics.row_to_dict(metric) for metric in metrics],
                 'summary': {
-                    'total_verified_addresses': total_verified,
-                    'total_compliance_events': total_events,
-                    'unresolved_events': unresolved_events,
-                    'compliance_rate': (1 - (unresolved_events / max(total_events, 1))) * 100
+                    'total_verified_addresses': stats.verified_active,
+                    'total_compliance_events': stats.events_total,
+                    'unresolved_events': stats.events_unresolved,
+                    'compliance_rate': (1 - (stats.events_unresolved / max(stats.events_total, 1))) * 100
                 }
             }
         })
+        if etag is not None:
+            cache_set(cache_key, body, METRICS_CACHE_TTL)
+        
+        return _json_response(body, etag)
         
     except Exception as e:
         return jsonify({'success': False, 'error': 'Failed to fetch token metrics'}), 500
 
+# Dashboard summary counts in one statement: compliance_events is scanned
+# once for both event counts, the other tables via scalar subqueries
+_DASHBOARD_COUNTS = select(
+    select(func.count()).select_from(TokenDeployment)
+        .where(TokenDeployment.is_active.is_(True)).scalar_subquery().label('total_tokens'),
+    select(func.count()).select_from(VerifiedAddress)
+        .where(VerifiedAddress.is_active.is_(True)).scalar_subquery().label('total_verified_addresses'),
+    func.count(ComplianceEvent.id).label('total_compliance_events'),
+    func.count(ComplianceEvent.id).filter(ComplianceEvent.resolved.is_(False)).label('unresolved_events'),
+)
+
+# Both active-token distributions in one round trip, tagged by kind
+_DASHBOARD_DISTRIBUTIONS = union_all(
+    select(
+        literal('asset_type').label('kind'),
+        TokenDeployment.asset_type.label('value'),
+        func.count(TokenDeployment.id).label('total')
+    ).where(TokenDeployment.is_active.is_(True)).group_by(TokenDeployment.asset_type),
+    select(
+        literal('framework').label('kind'),
+        TokenDeployment.regulatory_framework.label('value'),
+        func.count(TokenDeployment.id).label('total')
+    ).where(TokenDeployment.is_active.is_(True)).group_by(TokenDeployment.regulatory_framework),
+)
+
 @transfer_agent_bp.route('/dashboard/overview', methods=['GET'])
 @rate_limit_public
 def get_dashboard_overview():
     """Get overview data for the transfer agent dashboard (public endpoint)"""
     try:
-        # Get total counts
-        total_tokens = TokenDeployment.query.filter_by(is_active=True).count()
-        total_verified_addresses = VerifiedAddress.query.filter_by(is_active=True).count()
-        total_compliance_events = ComplianceEvent.query.count()
-        unresolved_events = ComplianceEvent.query.filter_by(resolved=False).count()
-        
-        # Get recent activity
-        recent_tokens = TokenDeployment.query.order_by(
-            desc(TokenDeployment.deployment_date)
-        ).limit(5).all()
-        
-        recent_events = ComplianceEvent.query.order_by(
-            desc(ComplianceEvent.timestamp)
-        ).limit(10).all()
-        
-        # Get asset type distribution
-        asset_distribution = db.session.query(
-            TokenDeployment.asset_type,
-            func.count(TokenDeployment.id).label('count')
-        ).filter_by(is_active=True).group_by(TokenDeployment.asset_type).all()
-        
-        # Get regulatory framework distribution
-        regulatory_distribution = db.session.query(
-            TokenDeployment.regulatory_framework,
-            func.count(TokenDeployment.id).label('count')
-        ).filter_by(is_active=True).group_by(TokenDeployment.regulatory_framework).all()
+        # Read the version before any data, so the tag is never newer than the body
+        version = cache_version(DASHBOARD_VERSION_KEY)
+        etag = str(version) if version is not None else None
+        not_modified = _not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+        
+        if etag is not None:
+            body = _dashboard_lru.get(etag)
+            if body is not None:
+                return _json_response(body, etag)
+        
+        cache_key = f'dashboard:overview:{etag}'
+        cached = cache_get(cache_key) if etag is not None else None
+        if cached is not None:
+            _dashboard_lru.set(etag, cached)
+            return _json_response(cached, etag)
+        
+        counts, distributions, recent_tokens, recent_events = _gather(
+            lambda: db.session.execute(_DASHBOARD_COUNTS).one(),
+            lambda: db.session.execute(_DASHBOARD_DISTRIBUTIONS).all(),
+            # Recent activity
+            lambda: db.session.execute(select(*TOKEN_LIST_COLUMNS).order_by(
+                desc(TokenDeployment.deployment_date)
+            ).limit(5)).all(),
+            lambda: db.session.execute(select(*COMPLIANCE_EVENT_COLUMNS).order_by(
+                desc(ComplianceEvent.timestamp)
+            ).limit(10)).all()
+        )
         
-        return jsonify({
+        asset_distribution = []
+        regulatory_distribution = []
+        for row in distributions:
+            if row.kind == 'asset_type':
+                asset_distribution.append({'asset_type': row.value, 'count': row.total})
+            else:
+                regulatory_distribution.append({'framework': row.value, 'count': row.total})
+        
+        body = current_app.json.dumps_bytes({
             'success': True,
             'data': {
                 'summary': {
-                    'total_tokens': total_tokens,
-                    'total_verified_addresses': total_verified_addresses,
-                    'total_compliance_events': total_compliance_events,
-                    'unresolved_events': unresolved_events,
-                    'compliance_rate': (1 - (unresolved_events / max(total_compliance_events, 1))) * 100
+                    'total_tokens': counts.total_tokens,
+                    'total_verified_addresses': counts.total_verified_addresses,
+                    'total_compliance_events': counts.total_compliance_events,
+                    'unresolved_events': counts.unresolved_events,
+                    'compliance_rate': (1 - (counts.unresolved_events / max(counts.total_compliance_events, 1))) * 100
                 },
-                'recent_tokens': [token.to_dict() for token in recent_tokens],
-                'recent_events': [event.to_dict() for event in recent_events],
-                'asset_distribution': [
-                    {'asset_type': dist[0], 'count': dist[1]} for dist in asset_distribution
-                ],
-                'regulatory_distribution': [
-                    {'framework': dist[0], 'count': dist[1]} for dist in regulatory_distribution
-                ]
+                'recent_tokens': [TokenDeployment.row_to_dict(token) for token in recent_tokens],
+                'recent_events': [ComplianceEvent.row_to_dict(event, raw_metadata=True) for event in recent_events],
+                'asset_distribution': asset_distribution,
+                'regulatory_distribution': regulatory_distribution
             }
         })
+        if etag is not None:
+            cache_set(cache_key, body, DASHBOARD_CACHE_TTL)
+            _dashboard_lru.set(etag, body)
+        
+        return _json_response(body, etag)
         
     except Exception as e:
         return jsonify({'success': False, 'error': 'Failed to fetch dashboard overview'}), 500
@@ -643,9 +985,16 @@ def get_dashboard_overview():
 @transfer_agent_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for the transfer agent console"""
-    return jsonify({
+    now = time.monotonic()
+    entry = _health_lru.get('health')
+    if entry and entry[0] > now:
+        return _json_response(entry[1])
+    
+    body = current_app.json.dumps_bytes({
         'success': True,
         'message': 'Transfer Agent Console API is running',
         'timestamp': datetime.utcnow().isoformat()
     })
+    _health_lru.set('health', (now + HEALTH_CACHE_TTL, body))
+    return _json_response(body)
 
@@ -10,18 +10,25 @@ Security Features (OWASP):
 - Role-based access control
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, abort, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models.user import User, db
+from sqlalchemy import func, lambda_stmt, or_, select
+from src.models.user import User, USER_LIST_COLUMNS, db
 from src.middleware.rate_limit import rate_limit_read, rate_limit_write
 from src.middleware.validation import (
     validate_request, validate_query_params, PAGINATION_SCHEMA,
-    ValidationError, sanitize_string, is_valid_email
+    ValidationError, sanitize_string, normalize_email, is_valid_email, parse_bool
 )
 from src.middleware.auth import admin_required
+from src.middleware.pagination import encode_cursor, decode_cursor, fetch_page
+from src.services.cache import cache_get, cache_set
 
 user_bp = Blueprint('user', __name__)
 
+# Total for ?with_total=1 on the user list; a few seconds stale is fine
+USER_COUNT_CACHE_KEY = 'users:count'
+USER_COUNT_CACHE_TTL = 10
+
 
 # User list/create schema
 USER_CREATE_SCHEMA_FIELDS = {
@@ -30,6 +37,42 @@ USER_CREATE_SCHEMA_FIELDS = {
 }
 
 
+def _duplicate_user_error(username=None, email=None, exclude_id=None):
+    """
+    Error message if another user already has username or email, else None.
+    
+    Both columns are checked in one query; each has a unique index.
+    """
+    conditions = []
+    if username:
+        conditions.append(User.username == username)
+    if email:
+        conditions.append(User.email == email)
+    if not conditions:
+        return None
+    
+    stmt = select(User.username, User.email).where(or_(*conditions))
+    if exclude_id is not None:
+        stmt = stmt.where(User.id != exclude_id)
+    
+    row = db.session.execute(stmt.limit(1)).first()
+    if row is None:
+        return None
+    if username and row.username == username:
+        return 'Username already exists'
+    return 'Email already registered'
+
+
+def _user_count():
+    """Total number of users, shared through Redis for USER_COUNT_CACHE_TTL seconds"""
+    cached = cache_get(USER_COUNT_CACHE_KEY)
+    if cached is not None:
+        return int(cached)
+    total = db.session.scalar(select(func.count(User.id)))
+    cache_set(USER_COUNT_CACHE_KEY, str(total).encode(), USER_COUNT_CACHE_TTL)
+    return total
+
+
 @user_bp.route('/users', methods=['GET'])
 @jwt_required()
 @rate_limit_read
@@ -39,28 +82,46 @@ def get_users(validated_params):
     Get paginated list of users.
     
     Query params:
-    - page: Page number (default: 1)
+    - cursor: next_cursor from the previous page (seeks on id, no OFFSET)
+    - page: Page number (default: 1; ignored when cursor is given)
     - per_page: Items per page (default: 20, max: 100)
+    - with_total: 1 to include total/pages (counted at most every 10s)
     
     Requires: Authentication
     Rate limit: 200 requests/minute
     """
     page = validated_params.get('page', 1)
     per_page = validated_params.get('per_page', 20)
+    try:
+        cursor = decode_cursor(request.args.get('cursor'), int)
+    except ValidationError:
+        return jsonify({'success': False, 'error': 'Invalid pagination cursor'}), 400
+    
+    # COUNT(*) scans the whole table, so it is opt-in
+    total = _user_count() if request.args.get('with_total', False, type=parse_bool) else None
+    
+    stmt = select(*USER_LIST_COLUMNS)
+    if cursor:
+        stmt = stmt.where(User.id > cursor[0])
+    elif page > 1:
+        stmt = stmt.offset((page - 1) * per_page)
     
-    users = User.query.paginate(page=page, per_page=per_page, error_out=False)
+    rows, has_next = fetch_page(db.session.execute(
+        stmt.order_by(User.id).limit(per_page + 1)
+    ), per_page)
     
     return jsonify({
         'success': True,
         'data': {
-            'users': [user.to_dict() for user in users.items],
+            'users': [User.row_to_dict(row) for row in rows],
             'pagination': {
-                'page': page,
+                'page': None if cursor else page,
                 'per_page': per_page,
-                'total': users.total,
-                'pages': users.pages,
-                'has_next': users.has_next,
-                'has_prev': users.has_prev
+                'total': total,
+                'pages': (total + per_page - 1) // per_page if total is not None else None,
+                'has_next': has_next,
+                'has_prev': bool(cursor) or page > 1,
+                'next_cursor': encode_cursor(rows[-1].id) if has_next else None
             }
         }
     })
@@ -103,14 +164,12 @@ def create_user():
         
         # Sanitize inputs
         username = sanitize_string(username, max_length=50)
-        email = sanitize_string(email, max_length=254).lower()
+        email = normalize_email(email)
         
         # Check for duplicates
-        if User.query.filter_by(username=username).first():
-            return jsonify({'success': False, 'error': 'Username already exists'}), 409
-        
-        if User.query.filter_by(email=email).first():
-            return jsonify({'success': False, 'error': 'Email already registered'}), 409
+        duplicate_error = _duplicate_user_error(username, email)
+        if duplicate_error:
+            return jsonify({'success': False, 'error': duplicate_error}), 409
         
         # Create user
         user = User(
@@ -146,10 +205,15 @@ def get_user(user_id):
     Requires: Authentication
     Rate limit: 200 requests/minute
     """
-    user = User.query.get_or_404(user_id)
+    # Plain column row through a cached statement; no ORM instance is needed
+    user = db.session.execute(lambda_stmt(
+        lambda: select(*USER_LIST_COLUMNS).where(User.id == user_id)
+    )).first()
+    if user is None:
+        abort(404)
     return jsonify({
         'success': True,
-        'data': {'user': user.to_dict()}
+        'data': {'user': User.row_to_dict(user)}
     })
 
 
@@ -173,28 +237,28 @@ def update_user(user_id):
     Rate limit: 30 requests/minute
     """
     try:
-        user = User.query.get_or_404(user_id)
+        user = db.get_or_404(User, user_id)
         data = request.get_json()
         
         if not data:
             return jsonify({'success': False, 'error': 'Request body required'}), 400
         
-        # Update username if provided
-        if data.get('username'):
-            username = sanitize_string(data['username'], max_length=50)
-            existing = User.query.filter_by(username=username).first()
-            if existing and existing.id != user.id:
-                return jsonify({'success': False, 'error': 'Username already exists'}), 409
-            user.username = username
-        
-        # Update email if provided
+        username = sanitize_string(data['username'], max_length=50) if data.get('username') else None
+        email = None
         if data.get('email'):
-            email = sanitize_string(data['email'], max_length=254).lower()
+            email = normalize_email(data['email'])
             if not is_valid_email(email):
                 return jsonify({'success': False, 'error': 'Invalid email format'}), 400
-            existing = User.query.filter_by(email=email).first()
-            if existing and existing.id != user.id:
-                return jsonify({'success': False, 'error': 'Email already registered'}), 409
+        
+        # Check the new username and email against other users in one query
+        duplicate_error = _duplicate_user_error(username, email, exclude_id=user.id)
+        if duplicate_error:
+            return jsonify({'success': False, 'error': duplicate_error}), 409
+        
+        # Update username/email if provided
+        if username:
+            user.username = username
+        if email:
             user.email = email
         
         # Update role if provided (admin only operation)
@@ -232,7 +296,7 @@ def delete_user(user_id):
     Rate limit: 30 requests/minute
     """
     try:
-        user = User.query.get_or_404(user_id)
+        user = db.get_or_404(User, user_id)
         
         # Prevent self-deletion
         current_user_id = get_jwt_identity()
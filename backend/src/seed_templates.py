@@ -6,176 +6,217 @@ Seeds the database with default asset page templates.
 Run with: flask seed-templates (or import and call directly)
 """
 
-import json
+import orjson
+from sqlalchemy import bindparam, insert, select, update
 from src.models.user import db
 from src.models.referral import AssetPageTemplate
 
 
-def seed_templates():
-    """Seed default asset page templates"""
-    
-    templates = [
-        {
-            'name': 'real-estate',
-            'display_name': 'Real Estate Fund',
-            'description': 'Professional template optimized for real estate investments with property showcase sections',
-            'asset_type': 'real-estate',
-            'config': json.dumps({
-                'sections': ['hero', 'property_gallery', 'financials', 'location', 'compliance', 'cta'],
-                'hero_style': 'image_background',
-                'show_map': True,
-                'show_documents': True,
-                'accent_elements': ['property_highlights', 'roi_calculator']
-            }),
-            'primary_color': '#1e3a5f',
-            'secondary_color': '#2563eb',
-            'background_type': 'image',
-            'show_badges': True,
-            'show_compliance': True,
-            'show_cta': True,
-            'show_documents': True,
-            'is_premium': False
-        },
-        {
-            'name': 'private-equity',
-            'display_name': 'Private Equity',
-            'description': 'Sophisticated template for PE fund shares with financial metrics and team sections',
-            'asset_type': 'private-equity',
-            'config': json.dumps({
-                'sections': ['hero', 'investment_thesis', 'portfolio', 'team', 'financials', 'compliance', 'cta'],
-                'hero_style': 'minimal_dark',
-                'show_performance': True,
-                'show_team': True,
-                'accent_elements': ['fund_metrics', 'vintage_chart']
-            }),
-            'primary_color': '#0f172a',
-            'secondary_color': '#6366f1',
-            'background_type': 'gradient',
-            'show_badges': True,
-            'show_compliance': True,
-            'show_cta': True,
+# Template rows, with each config serialized once at import
+DEFAULT_TEMPLATES = [
+    {
+        'name': 'real-estate',
+        'display_name': 'Real Estate Fund',
+        'description': 'Professional template optimized for real estate investments with property showcase sections',
+        'asset_type': 'real-estate',
+        'config': orjson.dumps({
+            'sections': ['hero', 'property_gallery', 'financials', 'location', 'compliance', 'cta'],
+            'hero_style': 'image_background',
+            'show_map': True,
             'show_documents': True,
-            'is_premium': False
-        },
-        {
-            'name': 'debt-instrument',
-            'display_name': 'Debt Instrument',
-            'description': 'Clean template for bonds and loans with yield visualization and payment schedules',
-            'asset_type': 'debt',
-            'config': json.dumps({
-                'sections': ['hero', 'yield_summary', 'payment_schedule', 'issuer_info', 'compliance', 'cta'],
-                'hero_style': 'clean_minimal',
-                'show_payment_calendar': True,
-                'show_yield_curve': True,
-                'accent_elements': ['coupon_rate', 'maturity_countdown']
-            }),
-            'primary_color': '#065f46',
-            'secondary_color': '#10b981',
-            'background_type': 'solid',
-            'show_badges': True,
-            'show_compliance': True,
-            'show_cta': True,
-            'show_documents': False,
-            'is_premium': False
-        },
-        {
-            'name': 'art-collectibles',
-            'display_name': 'Art & Collectibles',
-            'description': 'Visual-first template for art, collectibles, and luxury assets with provenance tracking',
-            'asset_type': 'art',
-            'config': json.dumps({
-                'sections': ['hero_gallery', 'artwork_details', 'provenance', 'artist_bio', 'valuation', 'compliance', 'cta'],
-                'hero_style': 'gallery_fullwidth',
-                'show_3d_viewer': False,
-                'show_provenance_timeline': True,
-                'accent_elements': ['authenticity_badge', 'condition_report']
-            }),
-            'primary_color': '#7c2d12',
-            'secondary_color': '#ea580c',
-            'background_type': 'solid',
-            'show_badges': True,
-            'show_compliance': True,
-            'show_cta': True,
-            'show_documents': True,
-            'is_premium': True
-        },
-        {
-            'name': 'revenue-share',
-            'display_name': 'Revenue Share',
-            'description': 'Dynamic template for royalties and revenue-sharing tokens with earnings visualization',
-            'asset_type': 'revenue-share',
-            'config': json.dumps({
-                'sections': ['hero', 'earnings_overview', 'revenue_breakdown', 'payout_history', 'projections', 'compliance', 'cta'],
-                'hero_style': 'data_focused',
-                'show_live_earnings': True,
-                'show_distribution_chart': True,
-                'accent_elements': ['earnings_ticker', 'next_payout']
-            }),
-            'primary_color': '#7c3aed',
-            'secondary_color': '#a855f7',
-            'background_type': 'gradient',
-            'show_badges': True,
-            'show_compliance': True,
-            'show_cta': True,
-            'show_documents': False,
-            'is_premium': False
-        },
-        {
-            'name': 'default',
-            'display_name': 'Default',
-            'description': 'Clean, professional template suitable for any asset type',
-            'asset_type': None,
-            'config': json.dumps({
-                'sections': ['hero', 'details', 'compliance', 'cta'],
-                'hero_style': 'standard',
-                'accent_elements': []
-            }),
-            'primary_color': '#3b82f6',
-            'secondary_color': '#6366f1',
-            'background_type': 'gradient',
-            'show_badges': True,
-            'show_compliance': True,
-            'show_cta': True,
-            'show_documents': False,
-            'is_premium': False
-        },
-        {
-            'name': 'minimal',
-            'display_name': 'Minimal',
-            'description': 'Simplified template with essential information only',
-            'asset_type': None,
-            'config': json.dumps({
-                'sections': ['hero', 'details', 'cta'],
-                'hero_style': 'minimal',
-                'accent_elements': []
-            }),
-            'primary_color': '#374151',
-            'secondary_color': '#6b7280',
-            'background_type': 'solid',
-            'show_badges': True,
-            'show_compliance': False,
-            'show_cta': True,
-            'show_documents': False,
-            'is_premium': False
-        }
-    ]
+            'accent_elements': ['property_highlights', 'roi_calculator']
+        }).decode(),
+        'primary_color': '#1e3a5f',
+        'secondary_color': '#2563eb',
+        'background_type': 'image',
+        'show_badges': True,
+        'show_compliance': True,
+        'show_cta': True,
+        'show_documents': True,
+        'is_premium': False
+    },
+    {
+        'name': 'private-equity',
+        'display_name': 'Private Equity',
+        'description': 'Sophisticated template for PE fund shares with financial metrics and team sections',
+        'asset_type': 'private-equity',
+        'config': orjson.dumps({
+            'sections': ['hero', 'investment_thesis', 'portfolio', 'team', 'financials', 'compliance', 'cta'],
+            'hero_style': 'minimal_dark',
+            'show_performance': True,
+            'show_team': True,
+            'accent_elements': ['fund_metrics', 'vintage_chart']
+        }).decode(),
+        'primary_color': '#0f172a',
+        'secondary_color': '#6366f1',
+        'background_type': 'gradient',
+        'show_badges': True,
+        'show_compliance': True,
+        'show_cta': True,
+        'show_documents': True,
+        'is_premium': False
+    },
+    {
+        'name': 'debt-instrument',
+        'display_name': 'Debt Instrument',
+        'description': 'Clean template for bonds and loans with yield visualization and payment schedules',
+        'asset_type': 'debt',
+        'config': orjson.dumps({
+            'sections': ['hero', 'yield_summary', 'payment_schedule', 'issuer_info', 'compliance', 'cta'],
+            'hero_style': 'clean_minimal',
+            'show_payment_calendar': True,
+            'show_yield_curve': True,
+            'accent_elements': ['coupon_rate', 'maturity_countdown']
+        }).decode(),
+        'primary_color': '#065f46',
+        'secondary_color': '#10b981',
+        'background_type': 'solid',
+        'show_badges': True,
+        'show_compliance': True,
+        'show_cta': True,
+        'show_documents': False,
+        'is_premium': False
+    },
+    {
+        'name': 'art-collectibles',
+        'display_name': 'Art & Collectibles',
+        'description': 'Visual-first template for art, collectibles, and luxury assets with provenance tracking',
+        'asset_type': 'art',
+        'config': orjson.dumps({
+            'sections': ['hero_gallery', 'artwork_details', 'provenance', 'artist_bio', 'valuation', 'compliance', 'cta'],
+            'hero_style': 'gallery_fullwidth',
+            'show_3d_viewer': False,
+            'show_provenance_timeline': True,
+            'accent_elements': ['authenticity_badge', 'condition_report']
+        }).decode(),
+        'primary_color': '#7c2d12',
+        'secondary_color': '#ea580c',
+        'background_type': 'solid',
+        'show_badges': True,
+        'show_compliance': True,
+        'show_cta': True,
+        'show_documents': True,
+        'is_premium': True
+    },
+    {
+        'name': 'revenue-share',
+        'display_name': 'Revenue Share',
+        'description': 'Dynamic template for royalties and revenue-sharing tokens with earnings visualization',
+        'asset_type': 'revenue-share',
+        'config': orjson.dumps({
+            'sections': ['hero', 'earnings_overview', 'revenue_breakdown', 'payout_history', 'projections', 'compliance', 'cta'],
+            'hero_style': 'data_focused',
+            'show_live_earnings': True,
+            'show_distribution_chart': True,
+            'accent_elements': ['earnings_ticker', 'next_payout']
+        }).decode(),
+        'primary_color': '#7c3aed',
+        'secondary_color': '#a855f7',
+        'background_type': 'gradient',
+        'show_badges': True,
+        'show_compliance': True,
+        'show_cta': True,
+        'show_documents': False,
+        'is_premium': False
+    },
+    {
+        'name': 'default',
+        'display_name': 'Default',
+        'description': 'Clean, professional template suitable for any asset type',
+        'asset_type': None,
+        'config': orjson.dumps({
+            'sections': ['hero', 'details', 'compliance', 'cta'],
+            'hero_style': 'standard',
+            'accent_elements': []
+        }).decode(),
+        'primary_color': '#3b82f6',
+        'secondary_color': '#6366f1',
+        'background_type': 'gradient',
+        'show_badges': True,
+        'show_compliance': True,
+        'show_cta': True,
+        'show_documents': False,
+        'is_premium': False
+    },
+    {
+        'name': 'minimal',
+        'display_name': 'Minimal',
+        'description': 'Simplified template with essential information only',
+        'asset_type': None,
+        'config': orjson.dumps({
+            'sections': ['hero', 'details', 'cta'],
+            'hero_style': 'minimal',
+            'accent_elements': []
+        }).decode(),
+        'primary_color': '#374151',
+        'secondary_color': '#6b7280',
+        'background_type': 'solid',
+        'show_badges': True,
+        'show_compliance': False,
+        'show_cta': True,
+        'show_documents': False,
+        'is_premium': False
+    }
+]
+
+
+def _upsert_templates(templates):
+    """
+    Insert templates by name, overwriting the ones that already exist.
     
-    for template_data in templates:
-        # Check if template exists
-        existing = AssetPageTemplate.query.filter_by(name=template_data['name']).first()
-        
-        if existing:
-            # Update existing template
-            for key, value in template_data.items():
-                setattr(existing, key, value)
+    PostgreSQL and SQLite do this in one INSERT ... ON CONFLICT (name)
+    DO UPDATE; other databases look up the existing names in one SELECT,
+    insert the rest together and update the existing rows with one
+    executemany UPDATE.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
         else:
-            # Create new template
-            template = AssetPageTemplate(**template_data)
-            db.session.add(template)
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(AssetPageTemplate).values(templates)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['name'],
+            set_={key: stmt.excluded[key] for key in templates[0] if key != 'name'}
+        )
+        db.session.execute(stmt)
+        return
+    
+    existing = set(db.session.scalars(
+        select(AssetPageTemplate.name).where(
+            AssetPageTemplate.name.in_([t['name'] for t in templates])
+        )
+    ))
+    new_templates = [t for t in templates if t['name'] not in existing]
+    if new_templates:
+        db.session.execute(insert(AssetPageTemplate).values(new_templates))
     
-    db.session.commit()
-    print(f"✅ Seeded {len(templates)} asset page templates")
-    return templates
+    # One prepared UPDATE run with executemany over every existing row; on the
+    # table rather than the model, which would expect primary keys instead
+    table = AssetPageTemplate.__table__
+    updates = [
+        {'b_name': t['name'], **{k: v for k, v in t.items() if k != 'name'}}
+        for t in templates if t['name'] in existing
+    ]
+    if updates:
+        db.session.execute(
+            update(table).where(table.c.name == bindparam('b_name')),
+            updates
+        )
+
+
+def seed_templates():
+    """Seed default asset page templates"""
+    # All templates are written in one transaction: all or nothing
+    try:
+        _upsert_templates(DEFAULT_TEMPLATES)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    print(f"✅ Seeded {len(DEFAULT_TEMPLATES)} asset page templates")
+    return DEFAULT_TEMPLATES
 
 
 if __name__ == '__main__':
@@ -9,11 +9,66 @@ This module provides integrations with external services:
 - IPFS Storage (Pinata)
 """
 
+import threading
+import time
+
+import structlog
+
 from .kyc import KYCService, get_kyc_service
 from .email import EmailService, get_email_service
 from .payments import PaymentService, get_payment_service
 from .storage import StorageService, get_storage_service
 
+logger = structlog.get_logger()
+
+# Longest a booting worker waits for warm-up. The pooled clients retry
+# failed connects, so an unreachable provider could otherwise hold the
+# worker for several connect timeouts; those attempts finish (or fail)
+# in the background instead.
+WARM_UP_DEADLINE = 2.0
+
+
+def _warm_up(get_service) -> None:
+    """Warm one provider's pool; warm-up is best effort and never raises"""
+    try:
+        get_service().warm_up()
+    except Exception as e:
+        logger.warning("connection_warm_up_failed", service=get_service.__name__, error=str(e))
+
+
+def warm_connections() -> None:
+    """
+    Pre-open provider connections in this process
+    
+    Called once per gunicorn worker after fork (see gunicorn.conf.py), so
+    the first KYC or document request does not pay for DNS and a TLS
+    handshake. Pools are per process and must not be created pre-fork.
+    Providers are warmed concurrently and for at most WARM_UP_DEADLINE.
+    """
+    threads = [
+        threading.Thread(target=_warm_up, args=(get_service,), daemon=True, name='connection-warm-up')
+        for get_service in (get_kyc_service, get_storage_service)
+    ]
+    for thread in threads:
+        thread.start()
+    
+    deadline = time.monotonic() + WARM_UP_DEADLINE
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+
+def close_connections() -> None:
+    """
+    Close provider connection pools in this process
+    
+    Called when a gunicorn worker exits (see gunicorn.conf.py) so pooled
+    keep-alive connections are shut down cleanly.
+    """
+    get_kyc_service().close()
+    get_storage_service().close()
+    get_email_service().close()
+
+
 __all__ = [
     'KYCService',
     'get_kyc_service',
@@ -23,4 +78,6 @@ __all__ = [
     'get_payment_service',
     'StorageService',
     'get_storage_service',
+    'warm_connections',
+    'close_connections',
 ]
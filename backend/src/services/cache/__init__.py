@@ -0,0 +1,145 @@
+"""
+Cache Service Module
+Provides an in-process LRU tier and a shared Redis tier
+
+Redis is optional: when CACHE_REDIS_URL is unset or unreachable the
+helpers below degrade to cache misses instead of raising.
+"""
+
+import time
+from functools import lru_cache
+from typing import Optional
+
+import structlog
+
+from .lru import LRUCache
+
+logger = structlog.get_logger()
+
+
+def get_config():
+    """Get configuration - imported here to avoid circular imports"""
+    from src.config import Config
+    return Config
+
+
+@lru_cache(maxsize=1)
+def get_redis_client():
+    """Get the shared Redis cache client, or None if not configured"""
+    url = get_config().CACHE_REDIS_URL
+    if not url:
+        return None
+    try:
+        import redis
+        return redis.from_url(url)
+    except Exception as e:
+        logger.warning("cache_redis_unavailable", error=str(e))
+        return None
+
+
+def cache_get(key: str) -> Optional[bytes]:
+    """Read a raw value from Redis; returns None on miss or error"""
+    client = get_redis_client()
+    if client is None:
+        return None
+    try:
+        return client.get(key)
+    except Exception as e:
+        logger.warning("cache_get_failed", key=key, error=str(e))
+        return None
+
+
+def cache_set(key: str, value: bytes, ttl: int) -> None:
+    """Write a raw value to Redis with a TTL in seconds; errors are logged"""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.setex(key, ttl, value)
+    except Exception as e:
+        logger.warning("cache_set_failed", key=key, error=str(e))
+
+
+def cache_delete(*keys: str) -> None:
+    """Delete keys from Redis; errors are logged"""
+    client = get_redis_client()
+    if client is None or not keys:
+        return
+    try:
+        client.delete(*keys)
+    except Exception as e:
+        logger.warning("cache_delete_failed", keys=keys, error=str(e))
+
+
+def cache_set_indexed(key: str, value: bytes, ttl: int, index_key: str) -> None:
+    """
+    Write a value and record its key in an index set, so a family of keys
+    (e.g. one per query variant) can be dropped by cache_delete_indexed()
+    without a SCAN. The index expires with the newest member.
+    """
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline()
+        pipe.setex(key, ttl, value)
+        pipe.sadd(index_key, key)
+        pipe.expire(index_key, ttl)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("cache_set_failed", key=key, error=str(e))
+
+
+def cache_delete_indexed(index_key: str) -> None:
+    """Delete every key recorded in an index set, and the set itself"""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        keys = client.smembers(index_key)
+        client.delete(index_key, *keys)
+    except Exception as e:
+        logger.warning("cache_delete_failed", keys=(index_key,), error=str(e))
+
+
+def cache_version(key: str, ttl: Optional[int] = None) -> Optional[int]:
+    """
+    Read a version counter, creating it on first use; None without Redis.
+    
+    New counters are seeded from the clock rather than 0, so a counter
+    lost with a Redis restart cannot repeat a version clients have seen.
+    With a ttl the counter is created to expire, so the versions (and
+    anything keyed by them) are bounded in time; deleting such a counter
+    is then the cheapest way to move to a new version.
+    """
+    client = get_redis_client()
+    if client is None:
+        return None
+    try:
+        pipe = client.pipeline()
+        pipe.set(key, time.time_ns() // 1000, nx=True, ex=ttl)
+        pipe.get(key)
+        return int(pipe.execute()[1])
+    except Exception as e:
+        logger.warning("cache_version_failed", key=key, error=str(e))
+        return None
+
+
+def cache_bump_version(*keys: str) -> None:
+    """Increment version counters after a committed write; errors are logged"""
+    client = get_redis_client()
+    if client is None or not keys:
+        return
+    try:
+        pipe = client.pipeline()
+        for key in keys:
+            pipe.incr(key)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("cache_bump_version_failed", keys=keys, error=str(e))
+
+
+__all__ = [
+    'LRUCache', 'get_redis_client', 'cache_get', 'cache_set', 'cache_delete',
+    'cache_set_indexed', 'cache_delete_indexed', 'cache_version', 'cache_bump_version'
+]
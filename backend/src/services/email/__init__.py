@@ -3,7 +3,7 @@ Email Service Module
 Provides email delivery via SendGrid
 """
 
-from .service import EmailService, EmailTemplate
+from .service import EmailService, EmailTemplate, EmailRecipient, EmailMessage, EmailResult
 from .sendgrid import SendGridEmailService
 
 _email_service = None
@@ -17,4 +17,7 @@ def get_email_service() -> EmailService:
     return _email_service
 
 
-__all__ = ['EmailService', 'EmailTemplate', 'SendGridEmailService', 'get_email_service']
+__all__ = [
+    'EmailService', 'EmailTemplate', 'EmailRecipient', 'EmailMessage', 'EmailResult',
+    'SendGridEmailService', 'get_email_service'
+]
@@ -3,12 +3,52 @@ SendGrid Email Service Implementation
 https://docs.sendgrid.com/
 """
 
-from typing import List, Dict, Any, Optional
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, To, Email, Content
+import re
+from typing import List, Dict, Any, Optional, Tuple
+import httpx
+import orjson
 
 from .service import EmailService, EmailTemplate, EmailMessage, EmailRecipient, EmailResult
 
+# Plain-text conversion patterns, compiled once
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+# SendGrid API connection pool; transport retries cover connect failures only
+API_POOL_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=30.0)
+API_CONNECT_RETRIES = 3
+
+
+# Default subjects; the formatted ones take fields from the template data
+_SUBJECTS = {
+    EmailTemplate.KYC_VERIFICATION_STARTED: "Your Identity Verification Has Started",
+    EmailTemplate.KYC_VERIFICATION_COMPLETE: "Identity Verification Complete - Welcome to RWA-Studio",
+    EmailTemplate.KYC_VERIFICATION_FAILED: "Action Required: Identity Verification Issue",
+    EmailTemplate.TRANSFER_NOTIFICATION: "Token Transfer: {token_name}",
+    EmailTemplate.COMPLIANCE_ALERT: "[Alert] Compliance Issue: {alert_type}",
+    EmailTemplate.SUBSCRIPTION_CREATED: "Welcome to RWA-Studio Pro!",
+    EmailTemplate.SUBSCRIPTION_CANCELLED: "Your RWA-Studio Subscription Has Been Cancelled",
+    EmailTemplate.PAYMENT_FAILED: "Action Required: Payment Failed",
+    EmailTemplate.WELCOME: "Welcome to RWA-Studio!",
+}
+_SUBJECTS_WITH_FIELDS = frozenset({EmailTemplate.TRANSFER_NOTIFICATION, EmailTemplate.COMPLIANCE_ALERT})
+_SUBJECT_FIELD_DEFAULTS = {'token_name': 'RWA Token', 'alert_type': 'Review Required'}
+
+
+def _address(recipient: EmailRecipient) -> Dict[str, str]:
+    """v3 API email object for a recipient"""
+    if recipient.name:
+        return {"email": recipient.email, "name": recipient.name}
+    return {"email": recipient.email}
+
+
+class _SubjectData(dict):
+    """Template data for str.format_map, with defaults for missing subject fields"""
+    
+    def __missing__(self, key):
+        return _SUBJECT_FIELD_DEFAULTS[key]
+
 
 def get_config():
     """Get configuration - imported here to avoid circular imports"""
@@ -19,14 +59,31 @@ def get_config():
 class SendGridEmailService(EmailService):
     """SendGrid email service implementation"""
     
+    MAIL_SEND_URL = "https://api.sendgrid.com/v3/mail/send"
+    
+    # SendGrid accepts at most this many personalizations per mail/send call
+    MAX_PERSONALIZATIONS = 1000
+    
     def __init__(self):
         config = get_config()
         self.api_key = config.SENDGRID_API_KEY
         self.from_email = config.EMAIL_FROM_ADDRESS
         self.from_name = config.EMAIL_FROM_NAME
+        self._from_address = _address(EmailRecipient(self.from_email, self.from_name))
+        # EmailTemplate value -> SendGrid dynamic template id
+        self.dynamic_template_ids = config.SENDGRID_DYNAMIC_TEMPLATE_IDS
         
+        # Shared client so sends reuse keep-alive TLS connections; the
+        # sendgrid library's own client opens a new connection per call
         if self.api_key:
-            self.client = SendGridAPIClient(api_key=self.api_key)
+            self.client = httpx.Client(
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=30.0,
+                transport=httpx.HTTPTransport(limits=API_POOL_LIMITS, retries=API_CONNECT_RETRIES)
+            )
         else:
             self.client = None
     
@@ -43,6 +100,9 @@ class SendGridEmailService(EmailService):
             )
         
         try:
+            # Imported here so processes that never send email do not load sendgrid
+            from sendgrid.helpers.mail import Mail, To, Email
+            
             from_email = Email(
                 message.from_email or self.from_email,
                 message.from_name or self.from_name
@@ -56,19 +116,19 @@ class SendGridEmailService(EmailService):
                 from_email=from_email,
                 to_emails=to_emails,
                 subject=message.subject,
-                html_content=message.html_content,
+                html_content=message.html_content or None,
                 plain_text_content=message.text_content
             )
             
+            if message.template_id:
+                # SendGrid renders the stored template with this data
+                mail.template_id = message.template_id
+                mail.dynamic_template_data = message.template_data or {}
+            
             if message.reply_to:
                 mail.reply_to = Email(message.reply_to)
             
-            response = self.client.send(mail)
-            
-            return EmailResult(
-                success=response.status_code in [200, 201, 202],
-                message_id=response.headers.get("X-Message-Id"),
-            )
+            return self._mail_result(self._post_mail(mail.get()))
             
         except Exception as e:
             return EmailResult(
@@ -81,46 +141,165 @@ class SendGridEmailService(EmailService):
         template: EmailTemplate,
         to: List[EmailRecipient],
         template_data: Dict[str, Any],
-        subject: Optional[str] = None
+        subject: Optional[str] = None,
+        include_text: bool = False
     ) -> EmailResult:
-        """Send an email using a pre-defined template"""
+        """
+        Send an email using a pre-defined template
         
-        # Render the template
-        html_content = self.render_template(template, template_data)
+        Without include_text only the HTML part is sent and SendGrid
+        derives the plain-text alternative itself.
+        """
         
         # Get default subject if not provided
         if not subject:
             subject = self._get_default_subject(template, template_data)
         
+        # Only the data is sent when SendGrid holds a dynamic template
+        template_id = self.dynamic_template_ids.get(template.value)
+        if template_id:
+            return self.send(EmailMessage(
+                to=to,
+                subject=subject,
+                html_content='',
+                template_id=template_id,
+                template_data=template_data,
+            ))
+        
+        # Render the template
+        html_content = self.render_template(template, template_data)
+        
         message = EmailMessage(
             to=to,
             subject=subject,
             html_content=html_content,
-            text_content=self._html_to_text(html_content),
+            text_content=self._html_to_text(html_content) if include_text else None,
         )
         
         return self.send(message)
     
+    def send_bulk(
+        self,
+        template: EmailTemplate,
+        recipients: List[Tuple[EmailRecipient, Dict[str, Any]]],
+        subject: Optional[str] = None
+    ) -> List[EmailResult]:
+        """
+        Send a template to many recipients with as few API calls as possible
+        
+        Recipients sharing the same template data get one rendered body and
+        one request per MAX_PERSONALIZATIONS, with a personalization each, so
+        no recipient sees the others' addresses.
+        """
+        if not self.client:
+            return [
+                EmailResult(success=False, error="SendGrid API key not configured")
+                for _ in recipients
+            ]
+        
+        template_id = self.dynamic_template_ids.get(template.value)
+        if template_id:
+            return self._send_dynamic_bulk(template, template_id, recipients, subject)
+        
+        # Group recipient positions by their (serialized) template data
+        groups: Dict[bytes, Tuple[Dict[str, Any], List[int]]] = {}
+        for i, (_, template_data) in enumerate(recipients):
+            key = orjson.dumps(template_data, option=orjson.OPT_SORT_KEYS, default=str)
+            groups.setdefault(key, (template_data, []))[1].append(i)
+        
+        results: List[Optional[EmailResult]] = [None] * len(recipients)
+        for template_data, positions in groups.values():
+            html_content = self.render_template(template, template_data)
+            group_subject = subject or self._get_default_subject(template, template_data)
+            
+            for start in range(0, len(positions), self.MAX_PERSONALIZATIONS):
+                batch = positions[start:start + self.MAX_PERSONALIZATIONS]
+                result = self._send_personalized(
+                    [recipients[i][0] for i in batch],
+                    group_subject, html_content
+                )
+                for i in batch:
+                    results[i] = result
+        
+        return results
+    
+    def _send_dynamic_bulk(
+        self,
+        template: EmailTemplate,
+        template_id: str,
+        recipients: List[Tuple[EmailRecipient, Dict[str, Any]]],
+        subject: Optional[str]
+    ) -> List[EmailResult]:
+        """Send a dynamic template with each recipient's data in their personalization"""
+        results: List[EmailResult] = []
+        for start in range(0, len(recipients), self.MAX_PERSONALIZATIONS):
+            batch = recipients[start:start + self.MAX_PERSONALIZATIONS]
+            try:
+                response = self._post_mail({
+                    "from": self._from_address,
+                    "template_id": template_id,
+                    "personalizations": [
+                        {
+                            "to": [_address(recipient)],
+                            "subject": subject or self._get_default_subject(template, template_data),
+                            "dynamic_template_data": template_data,
+                        }
+                        for recipient, template_data in batch
+                    ],
+                })
+                result = self._mail_result(response)
+            except Exception as e:
+                result = EmailResult(success=False, error=str(e))
+            results.extend([result] * len(batch))
+        
+        return results
+    
+    def _send_personalized(
+        self,
+        to: List[EmailRecipient],
+        subject: str,
+        html_content: str
+    ) -> EmailResult:
+        """Send one body in a single request, one personalization per recipient"""
+        try:
+            response = self._post_mail({
+                "from": self._from_address,
+                "subject": subject,
+                "content": [{"type": "text/html", "value": html_content}],
+                "personalizations": [{"to": [_address(recipient)]} for recipient in to],
+            })
+            
+            return self._mail_result(response)
+            
+        except Exception as e:
+            return EmailResult(
+                success=False,
+                error=str(e)
+            )
+    
+    def close(self) -> None:
+        """Close the pooled API connections"""
+        if self.client:
+            self.client.close()
+    
+    def _post_mail(self, payload: Dict[str, Any]) -> httpx.Response:
+        """POST a v3 mail/send payload"""
+        return self.client.post(self.MAIL_SEND_URL, content=orjson.dumps(payload))
+    
+    def _mail_result(self, response: httpx.Response) -> EmailResult:
+        """EmailResult for a mail/send response, carrying SendGrid's error body on failure"""
+        if response.status_code in (200, 201, 202):
+            return EmailResult(success=True, message_id=response.headers.get("X-Message-Id"))
+        return EmailResult(success=False, error=f"{response.status_code}: {response.text}")
+    
     def _get_default_subject(self, template: EmailTemplate, data: Dict[str, Any]) -> str:
         """Get the default subject for a template"""
-        subjects = {
-            EmailTemplate.KYC_VERIFICATION_STARTED: "Your Identity Verification Has Started",
-            EmailTemplate.KYC_VERIFICATION_COMPLETE: "Identity Verification Complete - Welcome to RWA-Studio",
-            EmailTemplate.KYC_VERIFICATION_FAILED: "Action Required: Identity Verification Issue",
-            EmailTemplate.TRANSFER_NOTIFICATION: f"Token Transfer: {data.get('token_name', 'RWA Token')}",
-            EmailTemplate.COMPLIANCE_ALERT: f"[Alert] Compliance Issue: {data.get('alert_type', 'Review Required')}",
-            EmailTemplate.SUBSCRIPTION_CREATED: "Welcome to RWA-Studio Pro!",
-            EmailTemplate.SUBSCRIPTION_CANCELLED: "Your RWA-Studio Subscription Has Been Cancelled",
-            EmailTemplate.PAYMENT_FAILED: "Action Required: Payment Failed",
-            EmailTemplate.WELCOME: "Welcome to RWA-Studio!",
-        }
-        return subjects.get(template, "RWA-Studio Notification")
+        subject = _SUBJECTS.get(template, "RWA-Studio Notification")
+        if template in _SUBJECTS_WITH_FIELDS:
+            subject = subject.format_map(_SubjectData(data))
+        return subject
     
     def _html_to_text(self, html: str) -> str:
         """Convert HTML to plain text (simple implementation)"""
-        import re
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', html)
-        # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+        # Remove HTML tags, then normalize whitespace
+        return _WHITESPACE_RE.sub(' ', _TAG_RE.sub('', html)).strip()
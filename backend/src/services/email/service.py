@@ -6,7 +6,7 @@ Abstract interface for email service integrations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 
 class EmailTemplate(Enum):
@@ -22,14 +22,14 @@ class EmailTemplate(Enum):
     WELCOME = "welcome"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EmailRecipient:
     """Email recipient"""
     email: str
     name: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class EmailMessage:
     """Email message structure"""
     to: List[EmailRecipient]
@@ -43,7 +43,7 @@ class EmailMessage:
     template_data: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EmailResult:
     """Result of sending an email"""
     success: bool
@@ -79,7 +79,8 @@ class EmailService(ABC):
         template: EmailTemplate,
         to: List[EmailRecipient],
         template_data: Dict[str, Any],
-        subject: Optional[str] = None
+        subject: Optional[str] = None,
+        include_text: bool = False
     ) -> EmailResult:
         """
         Send an email using a pre-defined template
@@ -89,12 +90,43 @@ class EmailService(ABC):
             to: List of recipients
             template_data: Data to populate the template
             subject: Optional subject override
+            include_text: Send our own plain-text part instead of leaving
+                it to the provider
             
         Returns:
             EmailResult with status and message ID
         """
         pass
     
+    def send_bulk(
+        self,
+        template: EmailTemplate,
+        recipients: List[Tuple[EmailRecipient, Dict[str, Any]]],
+        subject: Optional[str] = None
+    ) -> List[EmailResult]:
+        """
+        Send a pre-defined template to many recipients, each with their own data
+        
+        Providers that can deliver several messages per API call override
+        this; the default sends one message per recipient.
+        
+        Args:
+            template: The template to use
+            recipients: (recipient, template_data) pairs
+            subject: Optional subject override
+            
+        Returns:
+            One EmailResult per recipient, in the same order
+        """
+        return [
+            self.send_template(template, [recipient], template_data, subject)
+            for recipient, template_data in recipients
+        ]
+    
+    def close(self) -> None:
+        """Release pooled provider connections"""
+        pass
+    
     def render_template(self, template: EmailTemplate, data: Dict[str, Any]) -> str:
         """
         Render an HTML template with data
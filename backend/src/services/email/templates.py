@@ -3,31 +3,19 @@ Email Templates
 HTML templates for various email types
 """
 
-from typing import Dict, Any
+from html import escape
+from typing import Dict, Any, Iterable
 from .service import EmailTemplate
 
 
 def get_template_html(template: EmailTemplate, data: Dict[str, Any]) -> str:
     """Get the rendered HTML for a template"""
-    templates = {
-        EmailTemplate.KYC_VERIFICATION_STARTED: _kyc_started_template,
-        EmailTemplate.KYC_VERIFICATION_COMPLETE: _kyc_complete_template,
-        EmailTemplate.KYC_VERIFICATION_FAILED: _kyc_failed_template,
-        EmailTemplate.TRANSFER_NOTIFICATION: _transfer_notification_template,
-        EmailTemplate.COMPLIANCE_ALERT: _compliance_alert_template,
-        EmailTemplate.SUBSCRIPTION_CREATED: _subscription_created_template,
-        EmailTemplate.SUBSCRIPTION_CANCELLED: _subscription_cancelled_template,
-        EmailTemplate.PAYMENT_FAILED: _payment_failed_template,
-        EmailTemplate.WELCOME: _welcome_template,
-    }
-    
-    template_func = templates.get(template, _default_template)
+    template_func = _TEMPLATE_DISPATCH.get(template, _default_template)
     return template_func(data)
 
 
-def _base_template(content: str) -> str:
-    """Base HTML template wrapper"""
-    return f"""
+# Static parts of the base layout; only the content between them varies
+_BASE_HEADER = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -35,7 +23,7 @@ def _base_template(content: str) -> str:
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>RWA-Studio</title>
         <style>
-            body {{
+            body {
                 font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;
                 line-height: 1.6;
                 color: #333;
@@ -43,23 +31,23 @@ def _base_template(content: str) -> str:
                 margin: 0 auto;
                 padding: 20px;
                 background-color: #f5f5f5;
-            }}
-            .container {{
+            }
+            .container {
                 background-color: #ffffff;
                 border-radius: 8px;
                 padding: 40px;
                 box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-            }}
-            .header {{
+            }
+            .header {
                 text-align: center;
                 margin-bottom: 30px;
-            }}
-            .logo {{
+            }
+            .logo {
                 font-size: 24px;
                 font-weight: bold;
                 color: #6366f1;
-            }}
-            .button {{
+            }
+            .button {
                 display: inline-block;
                 background-color: #6366f1;
                 color: #ffffff;
@@ -68,37 +56,37 @@ def _base_template(content: str) -> str:
                 text-decoration: none;
                 font-weight: 600;
                 margin: 20px 0;
-            }}
-            .button:hover {{
+            }
+            .button:hover {
                 background-color: #5558dd;
-            }}
-            .alert {{
+            }
+            .alert {
                 background-color: #fef3c7;
                 border-left: 4px solid #f59e0b;
                 padding: 15px;
                 margin: 20px 0;
                 border-radius: 4px;
-            }}
-            .success {{
+            }
+            .success {
                 background-color: #d1fae5;
                 border-left: 4px solid #10b981;
                 padding: 15px;
                 margin: 20px 0;
                 border-radius: 4px;
-            }}
-            .error {{
+            }
+            .error {
                 background-color: #fee2e2;
                 border-left: 4px solid #ef4444;
                 padding: 15px;
                 margin: 20px 0;
                 border-radius: 4px;
-            }}
-            .footer {{
+            }
+            .footer {
                 text-align: center;
                 margin-top: 30px;
                 color: #666;
                 font-size: 14px;
-            }}
+            }
         </style>
     </head>
     <body>
@@ -106,7 +94,9 @@ def _base_template(content: str) -> str:
             <div class="header">
                 <div class="logo">RWA-Studio</div>
             </div>
-            {content}
+            """
+
+_BASE_FOOTER = """
             <div class="footer">
                 <p>&copy; 2026 RWA-Studio. All rights reserved.</p>
                 <p>This is an automated message. Please do not reply directly to this email.</p>
@@ -117,12 +107,27 @@ def _base_template(content: str) -> str:
     """
 
 
+def _base_template(content: str) -> str:
+    """Base HTML template wrapper"""
+    return _BASE_HEADER + content + _BASE_FOOTER
+
+
+def _field(data: Dict[str, Any], key: str, default: Any) -> str:
+    """HTML-escaped template value; data comes from users and providers"""
+    return escape(str(data.get(key, default)))
+
+
+def _li_list(items: Iterable[Any]) -> str:
+    """Escaped <li> elements for a list of values"""
+    return ''.join('<li>' + escape(str(item)) + '</li>' for item in items)
+
+
 def _kyc_started_template(data: Dict[str, Any]) -> str:
     content = f"""
     <h2>Identity Verification Started</h2>
-    <p>Hello {data.get('name', 'there')},</p>
+    <p>Hello {_field(data, 'name', 'there')},</p>
     <p>We've begun processing your identity verification for wallet address:</p>
-    <p><strong>{data.get('wallet_address', '')}</strong></p>
+    <p><strong>{_field(data, 'wallet_address', '')}</strong></p>
     <p>This typically takes a few minutes, but may take up to 24 hours in some cases.</p>
     <p>We'll notify you as soon as verification is complete.</p>
     """
@@ -135,33 +140,32 @@ def _kyc_complete_template(data: Dict[str, Any]) -> str:
     <div class="success">
         <strong>✓ Verified</strong> - Your identity has been successfully verified.
     </div>
-    <p>Hello {data.get('name', 'there')},</p>
+    <p>Hello {_field(data, 'name', 'there')},</p>
     <p>Great news! Your identity verification for wallet address:</p>
-    <p><strong>{data.get('wallet_address', '')}</strong></p>
+    <p><strong>{_field(data, 'wallet_address', '')}</strong></p>
     <p>has been successfully completed. You now have access to:</p>
     <ul>
         <li>Invest in tokenized real-world assets</li>
         <li>Transfer tokens to other verified addresses</li>
         <li>Full platform features based on your verification level</li>
     </ul>
-    <p>Verification Level: <strong>Level {data.get('verification_level', 1)}</strong></p>
-    <a href="{data.get('dashboard_url', '#')}" class="button">Go to Dashboard</a>
+    <p>Verification Level: <strong>Level {_field(data, 'verification_level', 1)}</strong></p>
+    <a href="{_field(data, 'dashboard_url', '#')}" class="button">Go to Dashboard</a>
     """
     return _base_template(content)
 
 
 def _kyc_failed_template(data: Dict[str, Any]) -> str:
-    reasons = data.get('rejection_reasons', ['Unable to verify identity'])
-    reasons_html = ''.join([f'<li>{r}</li>' for r in reasons])
+    reasons_html = _li_list(data.get('rejection_reasons', ['Unable to verify identity']))
     
     content = f"""
     <h2>Identity Verification Issue</h2>
     <div class="error">
         <strong>Action Required</strong> - We couldn't complete your verification.
     </div>
-    <p>Hello {data.get('name', 'there')},</p>
+    <p>Hello {_field(data, 'name', 'there')},</p>
     <p>Unfortunately, we were unable to verify your identity for wallet address:</p>
-    <p><strong>{data.get('wallet_address', '')}</strong></p>
+    <p><strong>{_field(data, 'wallet_address', '')}</strong></p>
     <p><strong>Reasons:</strong></p>
     <ul>{reasons_html}</ul>
     <p>Please try again with the following tips:</p>
@@ -170,7 +174,7 @@ def _kyc_failed_template(data: Dict[str, Any]) -> str:
         <li>Take photos in good lighting</li>
         <li>Make sure all information matches your documents</li>
     </ul>
-    <a href="{data.get('retry_url', '#')}" class="button">Try Again</a>
+    <a href="{_field(data, 'retry_url', '#')}" class="button">Try Again</a>
     """
     return _base_template(content)
 
@@ -178,16 +182,16 @@ def _kyc_failed_template(data: Dict[str, Any]) -> str:
 def _transfer_notification_template(data: Dict[str, Any]) -> str:
     content = f"""
     <h2>Token Transfer Notification</h2>
-    <p>Hello {data.get('name', 'there')},</p>
+    <p>Hello {_field(data, 'name', 'there')},</p>
     <p>A token transfer has been processed:</p>
     <table style="width: 100%; margin: 20px 0;">
-        <tr><td><strong>Token:</strong></td><td>{data.get('token_name', 'RWA Token')}</td></tr>
-        <tr><td><strong>Amount:</strong></td><td>{data.get('amount', '0')} {data.get('symbol', 'RWA')}</td></tr>
-        <tr><td><strong>From:</strong></td><td style="font-family: monospace; font-size: 12px;">{data.get('from_address', '')}</td></tr>
-        <tr><td><strong>To:</strong></td><td style="font-family: monospace; font-size: 12px;">{data.get('to_address', '')}</td></tr>
-        <tr><td><strong>Transaction:</strong></td><td style="font-family: monospace; font-size: 12px;">{data.get('tx_hash', '')}</td></tr>
+        <tr><td><strong>Token:</strong></td><td>{_field(data, 'token_name', 'RWA Token')}</td></tr>
+        <tr><td><strong>Amount:</strong></td><td>{_field(data, 'amount', '0')} {_field(data, 'symbol', 'RWA')}</td></tr>
+        <tr><td><strong>From:</strong></td><td style="font-family: monospace; font-size: 12px;">{_field(data, 'from_address', '')}</td></tr>
+        <tr><td><strong>To:</strong></td><td style="font-family: monospace; font-size: 12px;">{_field(data, 'to_address', '')}</td></tr>
+        <tr><td><strong>Transaction:</strong></td><td style="font-family: monospace; font-size: 12px;">{_field(data, 'tx_hash', '')}</td></tr>
     </table>
-    <a href="{data.get('explorer_url', '#')}" class="button">View on Explorer</a>
+    <a href="{_field(data, 'explorer_url', '#')}" class="button">View on Explorer</a>
     """
     return _base_template(content)
 
@@ -196,18 +200,18 @@ def _compliance_alert_template(data: Dict[str, Any]) -> str:
     content = f"""
     <h2>Compliance Alert</h2>
     <div class="alert">
-        <strong>⚠ {data.get('alert_type', 'Review Required')}</strong>
+        <strong>⚠ {_field(data, 'alert_type', 'Review Required')}</strong>
     </div>
     <p>A compliance event has been detected:</p>
     <table style="width: 100%; margin: 20px 0;">
-        <tr><td><strong>Token:</strong></td><td>{data.get('token_name', 'RWA Token')}</td></tr>
-        <tr><td><strong>Event:</strong></td><td>{data.get('event_type', 'Compliance Violation')}</td></tr>
-        <tr><td><strong>Severity:</strong></td><td>{data.get('severity', 'Medium')}</td></tr>
-        <tr><td><strong>Address:</strong></td><td style="font-family: monospace; font-size: 12px;">{data.get('address', '')}</td></tr>
+        <tr><td><strong>Token:</strong></td><td>{_field(data, 'token_name', 'RWA Token')}</td></tr>
+        <tr><td><strong>Event:</strong></td><td>{_field(data, 'event_type', 'Compliance Violation')}</td></tr>
+        <tr><td><strong>Severity:</strong></td><td>{_field(data, 'severity', 'Medium')}</td></tr>
+        <tr><td><strong>Address:</strong></td><td style="font-family: monospace; font-size: 12px;">{_field(data, 'address', '')}</td></tr>
     </table>
     <p><strong>Details:</strong></p>
-    <p>{data.get('details', 'Please review this compliance event in the dashboard.')}</p>
-    <a href="{data.get('review_url', '#')}" class="button">Review Event</a>
+    <p>{_field(data, 'details', 'Please review this compliance event in the dashboard.')}</p>
+    <a href="{_field(data, 'review_url', '#')}" class="button">Review Event</a>
     """
     return _base_template(content)
 
@@ -218,17 +222,17 @@ def _subscription_created_template(data: Dict[str, Any]) -> str:
     <div class="success">
         <strong>✓ Subscription Active</strong>
     </div>
-    <p>Hello {data.get('name', 'there')},</p>
-    <p>Thank you for subscribing to RWA-Studio {data.get('plan', 'Pro')}!</p>
+    <p>Hello {_field(data, 'name', 'there')},</p>
+    <p>Thank you for subscribing to RWA-Studio {_field(data, 'plan', 'Pro')}!</p>
     <p>Your subscription includes:</p>
     <ul>
-        <li>Up to {data.get('tokens_limit', '10')} tokenized assets</li>
+        <li>Up to {_field(data, 'tokens_limit', '10')} tokenized assets</li>
         <li>Priority support</li>
         <li>Advanced analytics dashboard</li>
         <li>Custom compliance rules</li>
     </ul>
-    <p>Next billing date: <strong>{data.get('next_billing_date', 'N/A')}</strong></p>
-    <a href="{data.get('dashboard_url', '#')}" class="button">Get Started</a>
+    <p>Next billing date: <strong>{_field(data, 'next_billing_date', 'N/A')}</strong></p>
+    <a href="{_field(data, 'dashboard_url', '#')}" class="button">Get Started</a>
     """
     return _base_template(content)
 
@@ -236,11 +240,11 @@ def _subscription_created_template(data: Dict[str, Any]) -> str:
 def _subscription_cancelled_template(data: Dict[str, Any]) -> str:
     content = f"""
     <h2>Subscription Cancelled</h2>
-    <p>Hello {data.get('name', 'there')},</p>
+    <p>Hello {_field(data, 'name', 'there')},</p>
     <p>Your RWA-Studio subscription has been cancelled.</p>
-    <p>Your access will remain active until: <strong>{data.get('access_until', 'N/A')}</strong></p>
+    <p>Your access will remain active until: <strong>{_field(data, 'access_until', 'N/A')}</strong></p>
     <p>We're sorry to see you go! If you change your mind, you can resubscribe at any time.</p>
-    <a href="{data.get('resubscribe_url', '#')}" class="button">Resubscribe</a>
+    <a href="{_field(data, 'resubscribe_url', '#')}" class="button">Resubscribe</a>
     """
     return _base_template(content)
 
@@ -251,11 +255,11 @@ def _payment_failed_template(data: Dict[str, Any]) -> str:
     <div class="error">
         <strong>Action Required</strong> - We couldn't process your payment.
     </div>
-    <p>Hello {data.get('name', 'there')},</p>
-    <p>We were unable to process your payment for RWA-Studio {data.get('plan', 'Pro')}.</p>
-    <p>Amount: <strong>${data.get('amount', '0.00')}</strong></p>
+    <p>Hello {_field(data, 'name', 'there')},</p>
+    <p>We were unable to process your payment for RWA-Studio {_field(data, 'plan', 'Pro')}.</p>
+    <p>Amount: <strong>${_field(data, 'amount', '0.00')}</strong></p>
     <p>Please update your payment method to avoid service interruption.</p>
-    <a href="{data.get('update_payment_url', '#')}" class="button">Update Payment Method</a>
+    <a href="{_field(data, 'update_payment_url', '#')}" class="button">Update Payment Method</a>
     """
     return _base_template(content)
 
@@ -263,7 +267,7 @@ def _payment_failed_template(data: Dict[str, Any]) -> str:
 def _welcome_template(data: Dict[str, Any]) -> str:
     content = f"""
     <h2>Welcome to RWA-Studio!</h2>
-    <p>Hello {data.get('name', 'there')},</p>
+    <p>Hello {_field(data, 'name', 'there')},</p>
     <p>Welcome to RWA-Studio - the platform for tokenizing real-world assets.</p>
     <p>Here's how to get started:</p>
     <ol>
@@ -271,14 +275,28 @@ def _welcome_template(data: Dict[str, Any]) -> str:
         <li><strong>Connect your wallet</strong> - MetaMask, WalletConnect, and more supported</li>
         <li><strong>Create your first token</strong> - Tokenize assets in just 5 clicks</li>
     </ol>
-    <a href="{data.get('get_started_url', '#')}" class="button">Get Started</a>
+    <a href="{_field(data, 'get_started_url', '#')}" class="button">Get Started</a>
     """
     return _base_template(content)
 
 
 def _default_template(data: Dict[str, Any]) -> str:
     content = f"""
-    <h2>{data.get('title', 'Notification')}</h2>
-    <p>{data.get('message', 'You have a new notification from RWA-Studio.')}</p>
+    <h2>{_field(data, 'title', 'Notification')}</h2>
+    <p>{_field(data, 'message', 'You have a new notification from RWA-Studio.')}</p>
     """
     return _base_template(content)
+
+
+# Template renderers by type, built once the functions above exist
+_TEMPLATE_DISPATCH = {
+    EmailTemplate.KYC_VERIFICATION_STARTED: _kyc_started_template,
+    EmailTemplate.KYC_VERIFICATION_COMPLETE: _kyc_complete_template,
+    EmailTemplate.KYC_VERIFICATION_FAILED: _kyc_failed_template,
+    EmailTemplate.TRANSFER_NOTIFICATION: _transfer_notification_template,
+    EmailTemplate.COMPLIANCE_ALERT: _compliance_alert_template,
+    EmailTemplate.SUBSCRIPTION_CREATED: _subscription_created_template,
+    EmailTemplate.SUBSCRIPTION_CANCELLED: _subscription_cancelled_template,
+    EmailTemplate.PAYMENT_FAILED: _payment_failed_template,
+    EmailTemplate.WELCOME: _welcome_template,
+}
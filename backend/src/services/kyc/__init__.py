@@ -3,18 +3,16 @@ KYC Service Module
 Provides identity verification via Onfido
 """
 
+from functools import lru_cache
+
 from .base import KYCService, KYCStatus, KYCResult, ApplicantData
 from .onfido import OnfidoKYCService
 
-_kyc_service = None
-
 
+@lru_cache(maxsize=1)
 def get_kyc_service() -> KYCService:
     """Get the configured KYC service instance"""
-    global _kyc_service
-    if _kyc_service is None:
-        _kyc_service = OnfidoKYCService()
-    return _kyc_service
+    return OnfidoKYCService()
 
 
 __all__ = ['KYCService', 'KYCStatus', 'KYCResult', 'ApplicantData', 'OnfidoKYCService', 'get_kyc_service']
@@ -131,3 +131,11 @@ class KYCService(ABC):
             KYCResult with status from webhook
         """
         pass
+    
+    def warm_up(self) -> None:
+        """Open a pooled connection to the provider ahead of the first request"""
+        pass
+    
+    def close(self) -> None:
+        """Release pooled provider connections"""
+        pass
@@ -4,7 +4,6 @@ https://documentation.onfido.com/
 """
 
 import hmac
-import hashlib
 import json
 from typing import Dict, Any, Optional
 from datetime import datetime
@@ -19,6 +18,14 @@ def get_config():
     return Config
 
 
+# Onfido API connection pool; transport retries cover connect failures only
+API_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30.0)
+API_CONNECT_RETRIES = 3
+API_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+# Warm-up only needs the connection; the response itself is discarded
+WARM_UP_TIMEOUT = httpx.Timeout(1.0)
+
+
 class OnfidoKYCService(KYCService):
     """Onfido KYC provider implementation"""
     
@@ -26,6 +33,7 @@ class OnfidoKYCService(KYCService):
         config = get_config()
         self.api_token = config.ONFIDO_API_TOKEN
         self.webhook_secret = config.ONFIDO_WEBHOOK_SECRET
+        self._hmac_key = self.webhook_secret.encode() if self.webhook_secret else None
         self.api_url = config.ONFIDO_API_URL
         self.region = config.ONFIDO_REGION
         
@@ -33,6 +41,14 @@ class OnfidoKYCService(KYCService):
             "Authorization": f"Token token={self.api_token}",
             "Content-Type": "application/json",
         }
+        
+        # Shared client so API calls reuse keep-alive TLS connections
+        self._client = httpx.Client(
+            base_url=self.api_url,
+            headers=self.headers,
+            timeout=API_TIMEOUT,
+            transport=httpx.HTTPTransport(limits=API_POOL_LIMITS, retries=API_CONNECT_RETRIES)
+        )
     
     @property
     def provider_name(self) -> str:
@@ -40,18 +56,13 @@ class OnfidoKYCService(KYCService):
     
     def _request(self, method: str, endpoint: str, data: Dict = None) -> Dict[str, Any]:
         """Make an HTTP request to the Onfido API"""
-        url = f"{self.api_url}/{endpoint}"
+        if method not in ("GET", "POST"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
         
-        with httpx.Client() as client:
-            if method == "GET":
-                response = client.get(url, headers=self.headers)
-            elif method == "POST":
-                response = client.post(url, headers=self.headers, json=data)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            return response.json()
+        # Relative to the client's base_url
+        response = self._client.request(method, endpoint, json=data)
+        response.raise_for_status()
+        return response.json()
     
     def create_applicant(self, applicant_data: ApplicantData) -> Dict[str, Any]:
         """Create a new applicant in Onfido"""
@@ -117,7 +128,7 @@ class OnfidoKYCService(KYCService):
             verification_level=self._determine_verification_level(result),
             country_code=self._extract_country(result),
             rejection_reasons=rejection_reasons,
-            completed_at=datetime.fromisoformat(result["completed_at_iso8601"].replace("Z", "+00:00"))
+            completed_at=datetime.fromisoformat(result["completed_at_iso8601"])
                 if result.get("completed_at_iso8601") else None,
             raw_response=result,
         )
@@ -134,16 +145,21 @@ class OnfidoKYCService(KYCService):
     
     def verify_webhook(self, payload: bytes, signature: str) -> bool:
         """Verify the authenticity of an Onfido webhook"""
-        if not self.webhook_secret:
+        if not self._hmac_key or not signature:
             return False
         
-        expected = hmac.new(
-            self.webhook_secret.encode(),
-            payload,
-            hashlib.sha256
-        ).hexdigest()
+        # One-shot HMAC runs entirely in OpenSSL; the key is encoded once
+        expected = hmac.digest(self._hmac_key, payload, 'sha256').hex()
         
-        return hmac.compare_digest(expected, signature)
+        return hmac.compare_digest(expected.encode(), signature.encode())
+    
+    def warm_up(self) -> None:
+        """Resolve DNS and complete the TLS handshake into the pool"""
+        self._client.head(self.api_url, timeout=WARM_UP_TIMEOUT)
+    
+    def close(self) -> None:
+        """Close the pooled API connections"""
+        self._client.close()
     
     def parse_webhook(self, payload: Dict[str, Any]) -> KYCResult:
         """Parse an Onfido webhook payload"""
@@ -158,9 +174,8 @@ class OnfidoKYCService(KYCService):
                 provider_check_id=check_data["id"],
                 applicant_id=check_data.get("applicant_id"),
                 verification_level=self._determine_verification_level(check_data),
-                completed_at=datetime.fromisoformat(
-                    check_data["completed_at_iso8601"].replace("Z", "+00:00")
-                ) if check_data.get("completed_at_iso8601") else None,
+                completed_at=datetime.fromisoformat(check_data["completed_at_iso8601"])
+                    if check_data.get("completed_at_iso8601") else None,
                 raw_response=payload,
             )
         
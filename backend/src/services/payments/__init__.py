@@ -3,18 +3,16 @@ Payment Service Module
 Provides payment processing via Stripe
 """
 
+from functools import lru_cache
+
 from .service import PaymentService, SubscriptionPlan, SubscriptionStatus
 from .stripe import StripePaymentService
 
-_payment_service = None
-
 
+@lru_cache(maxsize=1)
 def get_payment_service() -> PaymentService:
     """Get the configured payment service instance"""
-    global _payment_service
-    if _payment_service is None:
-        _payment_service = StripePaymentService()
-    return _payment_service
+    return StripePaymentService()
 
 
 __all__ = ['PaymentService', 'SubscriptionPlan', 'SubscriptionStatus', 'StripePaymentService', 'get_payment_service']
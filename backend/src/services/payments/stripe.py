@@ -4,6 +4,8 @@ https://stripe.com/docs/api
 """
 
 import stripe
+import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
@@ -24,6 +26,19 @@ def get_config():
     return Config
 
 
+def _build_http_client(pool_connections: int, pool_maxsize: int) -> stripe.http_client.RequestsClient:
+    """
+    Build a Stripe HTTP client backed by a persistent requests.Session.
+    
+    Keeps TCP+TLS connections to api.stripe.com alive across calls so that
+    multi-call request paths (e.g. create customer + checkout) reuse one socket.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://api.stripe.com', adapter)
+    return stripe.http_client.RequestsClient(session=session)
+
+
 class StripePaymentService(PaymentService):
     """Stripe payment service implementation"""
     
@@ -42,6 +57,12 @@ class StripePaymentService(PaymentService):
         
         if self.secret_key:
             stripe.api_key = self.secret_key
+        
+        # Persistent connection pool shared by all Stripe API calls
+        stripe.default_http_client = _build_http_client(
+            config.STRIPE_HTTP_POOL_CONNECTIONS,
+            config.STRIPE_HTTP_POOL_MAXSIZE,
+        )
     
     @property
     def provider_name(self) -> str:
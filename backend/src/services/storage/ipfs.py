@@ -3,10 +3,12 @@ Pinata IPFS Storage Service Implementation
 https://docs.pinata.cloud/
 """
 
-import json
-from typing import Optional, Dict, Any, BinaryIO
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, BinaryIO, Union
 from datetime import datetime
 import httpx
+import orjson
 
 from .service import StorageService, StoredDocument
 
@@ -17,17 +19,45 @@ def get_config():
     return Config
 
 
+# Pinata API connection pool; transport retries cover connect failures only
+API_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30.0)
+API_CONNECT_RETRIES = 3
+# Warm-up only needs the connection; the response itself is discarded
+WARM_UP_TIMEOUT = httpx.Timeout(1.0)
+
+# Worker pool for racing gateway fetches
+_gateway_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='ipfs-gateway')
+
+
+def _close_if_opened(future) -> None:
+    """Done-callback that closes a losing gateway response"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
 class PinataStorageService(StorageService):
     """Pinata IPFS storage service implementation"""
     
     API_URL = "https://api.pinata.cloud"
     
+    # Objects larger than this are spooled to a temp file for sendfile(2)
+    SPOOL_THRESHOLD = 64 * 1024
+    
+    # Largest pageLimit Pinata accepts on pinList
+    PIN_LIST_PAGE_MAX = 1000
+    
     def __init__(self):
         config = get_config()
         self.api_key = config.PINATA_API_KEY
         self.secret_key = config.PINATA_SECRET_KEY
         self.jwt = config.PINATA_JWT
         self._gateway_url = config.IPFS_GATEWAY_URL
+        self.gateways = [self._gateway_url] + [
+            url for url in config.IPFS_FALLBACK_GATEWAYS if url != self._gateway_url
+        ]
+        
+        # Shared client for gateway reads (thread-safe, pooled connections)
+        self._gateway_client = httpx.Client(timeout=60.0, follow_redirects=True)
         
         # Use JWT if available, otherwise API key/secret
         if self.jwt:
@@ -41,6 +71,13 @@ class PinataStorageService(StorageService):
             }
         else:
             self.headers = {}
+        
+        # Shared client for Pinata API calls; keeps TLS connections alive
+        # across requests instead of handshaking on every call
+        self._api_client = httpx.Client(
+            headers=self.headers,
+            transport=httpx.HTTPTransport(limits=API_POOL_LIMITS, retries=API_CONNECT_RETRIES)
+        )
     
     @property
     def provider_name(self) -> str:
@@ -71,26 +108,24 @@ class PinataStorageService(StorageService):
         }
         
         data = {
-            "pinataMetadata": json.dumps(pinata_metadata)
+            "pinataMetadata": orjson.dumps(pinata_metadata).decode()
         }
         
-        with httpx.Client() as client:
-            response = client.post(
-                url,
-                headers=self.headers,
-                files=files,
-                data=data,
-                timeout=120.0  # 2 minute timeout for large files
-            )
-            response.raise_for_status()
-            result = response.json()
+        response = self._api_client.post(
+            url,
+            files=files,
+            data=data,
+            timeout=120.0  # 2 minute timeout for large files
+        )
+        response.raise_for_status()
+        result = response.json()
         
         return StoredDocument(
             ipfs_hash=result["IpfsHash"],
             name=filename,
             size=result.get("PinSize", 0),
             gateway_url=self.get_gateway_url(result["IpfsHash"]),
-            pin_date=datetime.fromisoformat(result["Timestamp"].replace("Z", "+00:00"))
+            pin_date=datetime.fromisoformat(result["Timestamp"])
                 if result.get("Timestamp") else datetime.utcnow(),
             metadata=metadata
         )
@@ -114,24 +149,26 @@ class PinataStorageService(StorageService):
         if metadata:
             payload["pinataMetadata"]["keyvalues"] = metadata
         
+        # orjson emits bytes directly; httpx's json= would go through
+        # stdlib json.dumps and then encode a second copy
+        body = orjson.dumps(payload)
         headers = {**self.headers, "Content-Type": "application/json"}
         
-        with httpx.Client() as client:
-            response = client.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=60.0
-            )
-            response.raise_for_status()
-            result = response.json()
+        response = self._api_client.post(
+            url,
+            headers=headers,
+            content=body,
+            timeout=60.0
+        )
+        response.raise_for_status()
+        result = response.json()
         
         return StoredDocument(
             ipfs_hash=result["IpfsHash"],
             name=name,
             size=result.get("PinSize", 0),
             gateway_url=self.get_gateway_url(result["IpfsHash"]),
-            pin_date=datetime.fromisoformat(result["Timestamp"].replace("Z", "+00:00"))
+            pin_date=datetime.fromisoformat(result["Timestamp"])
                 if result.get("Timestamp") else datetime.utcnow(),
             metadata=metadata
         )
@@ -140,10 +177,112 @@ class PinataStorageService(StorageService):
         """Retrieve a file from IPFS via gateway"""
         url = self.get_gateway_url(ipfs_hash)
         
-        with httpx.Client() as client:
-            response = client.get(url, timeout=60.0)
+        response = self._gateway_client.get(url)
+        response.raise_for_status()
+        return response.content
+    
+    def _open_gateway_stream(self, url: str) -> httpx.Response:
+        """Start a streamed GET against one gateway; raises on non-2xx"""
+        response = self._gateway_client.send(
+            self._gateway_client.build_request("GET", url),
+            stream=True
+        )
+        try:
             response.raise_for_status()
-            return response.content
+        except httpx.HTTPStatusError:
+            response.close()
+            raise
+        return response
+    
+    def _race_gateways(self, ipfs_hash: str) -> httpx.Response:
+        """
+        Fetch from all configured gateways concurrently.
+        
+        Returns the first successful streamed response; the others are
+        cancelled or closed as they complete. Gateway cache state varies
+        widely, so this trims cold-fetch tail latency.
+        """
+        urls = [f"{gateway}/{ipfs_hash}" for gateway in self.gateways]
+        if len(urls) == 1:
+            return self._open_gateway_stream(urls[0])
+        
+        futures = [_gateway_executor.submit(self._open_gateway_stream, url) for url in urls]
+        last_error = None
+        
+        for future in as_completed(futures):
+            try:
+                winner = future.result()
+            except Exception as e:
+                last_error = e
+                continue
+            
+            for other in futures:
+                if other is not future and not other.cancel():
+                    other.add_done_callback(_close_if_opened)
+            return winner
+        
+        raise last_error
+    
+    def open_file(self, ipfs_hash: str) -> Union[bytes, BinaryIO]:
+        """Retrieve a file from IPFS, spooling large objects to disk"""
+        response = self._race_gateways(ipfs_hash)
+        
+        try:
+            length = response.headers.get("Content-Length")
+            if length is not None and int(length) <= self.SPOOL_THRESHOLD:
+                return response.read()
+            
+            fp = tempfile.TemporaryFile()
+            try:
+                for chunk in response.iter_bytes():
+                    fp.write(chunk)
+            except Exception:
+                fp.close()
+                raise
+        finally:
+            response.close()
+        
+        fp.seek(0)
+        return fp
+    
+    def warm_up(self) -> None:
+        """Resolve DNS and complete TLS handshakes for the API and primary gateway"""
+        self._api_client.head(f"{self.API_URL}/data/testAuthentication", timeout=WARM_UP_TIMEOUT)
+        self._gateway_client.head(self._gateway_url, timeout=WARM_UP_TIMEOUT)
+    
+    def close(self) -> None:
+        """Close the pooled API and gateway connections"""
+        self._api_client.close()
+        self._gateway_client.close()
+    
+    def stat_file(self, ipfs_hash: str) -> Optional[int]:
+        """HEAD the primary gateway; served from its CDN for pinned content"""
+        try:
+            response = self._gateway_client.head(self.get_gateway_url(ipfs_hash), timeout=3.0)
+        except httpx.HTTPError:
+            return None
+        if not response.is_success:
+            return None
+        return int(response.headers.get("Content-Length", 0))
+    
+    def warm_gateways(self, ipfs_hash: str) -> Dict[str, Optional[str]]:
+        """HEAD the CID on every configured gateway so they cache it"""
+        results = {}
+        for gateway in self.gateways:
+            try:
+                response = self._gateway_client.head(f"{gateway}/{ipfs_hash}", timeout=30.0)
+                response.raise_for_status()
+            except httpx.HTTPError:
+                results[gateway] = None
+                continue
+            headers = response.headers
+            results[gateway] = (
+                headers.get("cf-cache-status")
+                or headers.get("x-proxy-cache")
+                or headers.get("x-cache")
+                or "ok"
+            )
+        return results
     
     def get_metadata(self, ipfs_hash: str) -> Optional[StoredDocument]:
         """Get metadata for a pinned file"""
@@ -154,27 +293,24 @@ class PinataStorageService(StorageService):
             "status": "pinned"
         }
         
-        with httpx.Client() as client:
-            response = client.get(
-                url,
-                headers=self.headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            result = response.json()
+        response = self._api_client.get(url, params=params, timeout=30.0)
+        response.raise_for_status()
+        result = response.json()
         
         rows = result.get("rows", [])
         if not rows:
             return None
         
-        pin = rows[0]
+        return self._pin_to_document(rows[0])
+    
+    def _pin_to_document(self, pin: dict) -> StoredDocument:
+        """StoredDocument for one pinList row"""
         return StoredDocument(
             ipfs_hash=pin["ipfs_pin_hash"],
             name=pin.get("metadata", {}).get("name", ""),
             size=pin.get("size", 0),
             gateway_url=self.get_gateway_url(pin["ipfs_pin_hash"]),
-            pin_date=datetime.fromisoformat(pin["date_pinned"].replace("Z", "+00:00"))
+            pin_date=datetime.fromisoformat(pin["date_pinned"])
                 if pin.get("date_pinned") else None,
             metadata=pin.get("metadata", {}).get("keyvalues")
         )
@@ -183,43 +319,51 @@ class PinataStorageService(StorageService):
         """Unpin a file from Pinata"""
         url = f"{self.API_URL}/pinning/unpin/{ipfs_hash}"
         
-        with httpx.Client() as client:
-            response = client.delete(
-                url,
-                headers=self.headers,
-                timeout=30.0
-            )
-            return response.status_code == 200
+        response = self._api_client.delete(url, timeout=30.0)
+        return response.status_code == 200
     
-    def list_pins(self, limit: int = 10, offset: int = 0) -> list:
-        """List pinned files"""
+    def list_pins(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        pinned_before: Optional[datetime] = None,
+        before_hash: Optional[str] = None
+    ) -> list:
+        """
+        List pinned files, newest first
+        
+        Pass pinned_before and before_hash (the pin_date and ipfs_hash of
+        the last item of the previous page) instead of offset so Pinata
+        does not have to skip rows. Pinata's pinEnd bound is inclusive, so
+        pins at exactly that date come back again; they are kept only when
+        their hash sorts below before_hash, which breaks ties between pins
+        sharing a date and keeps every page moving past the previous one.
+        """
         url = f"{self.API_URL}/data/pinList"
         
+        # One extra row replaces the previous page's last pin, which the
+        # inclusive bound always returns again
+        limit = max(1, min(limit, self.PIN_LIST_PAGE_MAX - 1))
         params = {
             "status": "pinned",
-            "pageLimit": limit,
-            "pageOffset": offset
+            "pageLimit": limit + 1
         }
+        if pinned_before:
+            params["pinEnd"] = pinned_before.isoformat()
+        elif offset:
+            params["pageOffset"] = offset
         
-        with httpx.Client() as client:
-            response = client.get(
-                url,
-                headers=self.headers,
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            result = response.json()
-        
-        return [
-            StoredDocument(
-                ipfs_hash=pin["ipfs_pin_hash"],
-                name=pin.get("metadata", {}).get("name", ""),
-                size=pin.get("size", 0),
-                gateway_url=self.get_gateway_url(pin["ipfs_pin_hash"]),
-                pin_date=datetime.fromisoformat(pin["date_pinned"].replace("Z", "+00:00"))
-                    if pin.get("date_pinned") else None,
-                metadata=pin.get("metadata", {}).get("keyvalues")
-            )
-            for pin in result.get("rows", [])
-        ]
+        response = self._api_client.get(url, params=params, timeout=30.0)
+        response.raise_for_status()
+        result = response.json()
+        
+        docs = [self._pin_to_document(pin) for pin in result.get("rows", [])]
+        if pinned_before:
+            docs = [
+                doc for doc in docs
+                if doc.pin_date and (
+                    doc.pin_date < pinned_before
+                    or (doc.pin_date == pinned_before and before_hash is not None and doc.ipfs_hash < before_hash)
+                )
+            ]
+        return docs[:limit]
@@ -5,7 +5,7 @@ Abstract interface for decentralized storage integrations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, BinaryIO
+from typing import Optional, Dict, Any, BinaryIO, Union
 from datetime import datetime
 
 
@@ -89,6 +89,54 @@ class StorageService(ABC):
         """
         pass
     
+    def open_file(self, ipfs_hash: str) -> Union[bytes, BinaryIO]:
+        """
+        Retrieve a file from IPFS for serving
+        
+        Providers may return an open file object backed by a real file
+        descriptor for large objects, so the WSGI server can send it with
+        sendfile(2). The caller is responsible for closing it.
+        
+        Args:
+            ipfs_hash: The IPFS CID/hash
+            
+        Returns:
+            File contents as bytes, or a file object positioned at 0
+        """
+        return self.get_file(ipfs_hash)
+    
+    def warm_up(self) -> None:
+        """Open pooled connections to the provider ahead of the first request"""
+        pass
+    
+    def close(self) -> None:
+        """Release pooled provider connections"""
+        pass
+    
+    def stat_file(self, ipfs_hash: str) -> Optional[int]:
+        """
+        Cheap existence check that avoids the provider's pin API
+        
+        Args:
+            ipfs_hash: The IPFS CID/hash
+            
+        Returns:
+            Size in bytes if the content is reachable, None if unknown
+        """
+        return None
+    
+    def warm_gateways(self, ipfs_hash: str) -> Dict[str, Optional[str]]:
+        """
+        Ask the read gateways to fetch a newly pinned CID ahead of users
+        
+        Args:
+            ipfs_hash: The IPFS CID/hash
+            
+        Returns:
+            Gateway URL -> cache status header (None if the request failed)
+        """
+        return {}
+    
     @abstractmethod
     def get_metadata(self, ipfs_hash: str) -> Optional[StoredDocument]:
         """
@@ -16,8 +16,11 @@ from .email_tasks import (
 )
 from .kyc_tasks import (
     process_kyc_webhook,
+    create_kyc_applicant,
+    create_kyc_check,
     sync_kyc_to_registry,
 )
+from .storage_tasks import warm_gateways
 
 __all__ = [
     'celery_app',
@@ -28,5 +31,8 @@ __all__ = [
     'send_compliance_alert_email',
     'send_subscription_email',
     'process_kyc_webhook',
+    'create_kyc_applicant',
+    'create_kyc_check',
     'sync_kyc_to_registry',
+    'warm_gateways',
 ]
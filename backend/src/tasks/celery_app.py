@@ -20,6 +20,7 @@ celery_app = Celery(
     include=[
         'src.tasks.email_tasks',
         'src.tasks.kyc_tasks',
+        'src.tasks.storage_tasks',
     ]
 )
 
@@ -145,29 +145,30 @@ def send_compliance_alert_email(self, recipient_emails: List[str], data: Dict[st
         from src.services.email import get_email_service, EmailTemplate, EmailRecipient
         
         email_service = get_email_service()
-        recipients = [EmailRecipient(email=email) for email in recipient_emails]
+        template_data = {
+            'alert_type': data.get('alert_type', 'Review Required'),
+            'token_name': data.get('token_name', 'RWA Token'),
+            'event_type': data.get('event_type', 'Compliance Violation'),
+            'severity': data.get('severity', 'Medium'),
+            'address': data.get('address', ''),
+            'details': data.get('details', 'Please review this compliance event in the dashboard.'),
+            'review_url': data.get('review_url', 'https://app.rwa-studio.com/compliance'),
+        }
         
-        result = email_service.send_template(
+        # Same data for everyone: one request, a personalization per recipient
+        results = email_service.send_bulk(
             template=EmailTemplate.COMPLIANCE_ALERT,
-            to=recipients,
-            template_data={
-                'alert_type': data.get('alert_type', 'Review Required'),
-                'token_name': data.get('token_name', 'RWA Token'),
-                'event_type': data.get('event_type', 'Compliance Violation'),
-                'severity': data.get('severity', 'Medium'),
-                'address': data.get('address', ''),
-                'details': data.get('details', 'Please review this compliance event in the dashboard.'),
-                'review_url': data.get('review_url', 'https://app.rwa-studio.com/compliance'),
-            }
+            recipients=[(EmailRecipient(email=email), template_data) for email in recipient_emails]
         )
         
-        if result.success:
-            logger.info("compliance_alert_email_sent", recipients=len(recipient_emails), message_id=result.message_id)
+        failed = [result for result in results if not result.success]
+        if not failed:
+            logger.info("compliance_alert_email_sent", recipients=len(recipient_emails), message_id=results[0].message_id if results else None)
         else:
-            logger.error("compliance_alert_email_failed", recipients=len(recipient_emails), error=result.error)
-            raise Exception(result.error)
+            logger.error("compliance_alert_email_failed", recipients=len(recipient_emails), error=failed[0].error)
+            raise Exception(failed[0].error)
         
-        return result.success
+        return True
         
     except Exception as exc:
         logger.error("compliance_alert_email_error", recipients=len(recipient_emails), error=str(exc))
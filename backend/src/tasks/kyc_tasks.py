@@ -100,6 +100,104 @@ def process_kyc_webhook(self, webhook_data: Dict[str, Any]):
         raise self.retry(exc=exc, countdown=60 * (self.request.retries + 1))
 
 
+@celery_app.task(bind=True, max_retries=3)
+def create_kyc_applicant(self, verification_id: int, applicant: Dict[str, Any]):
+    """
+    Create the provider applicant for a queued verification
+    
+    Moves the verification from 'queued' to 'pending' once the provider
+    applicant exists; the frontend then fetches an SDK token for it.
+    """
+    try:
+        from src.models.user import db
+        from src.models.kyc import KYCVerification
+        from src.services.kyc import get_kyc_service, ApplicantData
+        
+        verification = KYCVerification.query.get(verification_id)
+        
+        if not verification:
+            logger.error("kyc_applicant_verification_not_found", verification_id=verification_id)
+            return False
+        
+        if verification.applicant_id:
+            return True
+        
+        kyc_service = get_kyc_service()
+        result = kyc_service.create_applicant(ApplicantData(**applicant))
+        
+        verification.applicant_id = result['applicant_id']
+        verification.provider = kyc_service.provider_name
+        verification.status = 'pending'
+        db.session.commit()
+        
+        logger.info(
+            "kyc_applicant_created",
+            verification_id=verification_id,
+            applicant_id=result['applicant_id']
+        )
+        
+        return True
+        
+    except Exception as exc:
+        logger.error("kyc_create_applicant_error", error=str(exc), verification_id=verification_id)
+        if self.request.retries >= self.max_retries:
+            _mark_verification_error(verification_id)
+            raise
+        raise self.retry(exc=exc, countdown=30 * (self.request.retries + 1))
+
+
+@celery_app.task(bind=True, max_retries=3)
+def create_kyc_check(self, verification_id: int, check_types: list = None):
+    """Create a provider check once the applicant has completed the SDK flow"""
+    try:
+        from src.models.user import db
+        from src.models.kyc import KYCVerification
+        from src.services.kyc import get_kyc_service
+        
+        verification = KYCVerification.query.get(verification_id)
+        
+        if not verification:
+            logger.error("kyc_check_verification_not_found", verification_id=verification_id)
+            return False
+        
+        if verification.check_id:
+            return True
+        
+        kyc_service = get_kyc_service()
+        result = kyc_service.create_check(verification.applicant_id, check_types=check_types)
+        
+        verification.check_id = result['check_id']
+        verification.status = 'in_progress'
+        db.session.commit()
+        
+        logger.info(
+            "kyc_check_created",
+            verification_id=verification_id,
+            check_id=result['check_id']
+        )
+        
+        return True
+        
+    except Exception as exc:
+        logger.error("kyc_create_check_error", error=str(exc), verification_id=verification_id)
+        if self.request.retries >= self.max_retries:
+            _mark_verification_error(verification_id)
+            raise
+        raise self.retry(exc=exc, countdown=30 * (self.request.retries + 1))
+
+
+def _mark_verification_error(verification_id: int):
+    """Flag a verification whose provider call failed permanently"""
+    from src.models.user import db
+    from src.models.kyc import KYCVerification
+    
+    db.session.rollback()
+    verification = KYCVerification.query.get(verification_id)
+    if verification:
+        verification.status = 'error'
+        db.session.commit()
+
+
 @celery_app.task(bind=True, max_retries=5)
 def sync_kyc_to_registry(self, verification_id: int):
     """
@@ -0,0 +1,33 @@
+"""
+Storage Tasks for Celery
+Author: Sowad Al-Mughni
+
+Async IPFS Processing
+"""
+
+from .celery_app import celery_app
+import structlog
+
+logger = structlog.get_logger()
+
+
+@celery_app.task(bind=True, max_retries=3)
+def warm_gateways(self, ipfs_hash: str):
+    """
+    Pre-fetch a newly pinned CID through the read gateways
+    
+    Public gateways can take minutes to serve a fresh pin; warming them
+    here keeps that cold fetch out of the first user's request. Failures
+    are retried a few times and then ignored.
+    """
+    from src.services.storage import get_storage_service
+    
+    results = get_storage_service().warm_gateways(ipfs_hash)
+    failed = [gateway for gateway, status in results.items() if status is None]
+    
+    logger.info("ipfs_gateways_warmed", ipfs_hash=ipfs_hash, cache_status=results)
+    
+    if failed and self.request.retries < self.max_retries:
+        raise self.retry(countdown=30 * (self.request.retries + 1))
+    
+    return results
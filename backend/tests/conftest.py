@@ -88,3 +88,17 @@ def admin_headers(client):
     token = data.get('data', {}).get('access_token', '')
     
     return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def transfer_agent_headers(app):
+    """Get transfer agent authentication headers"""
+    # Self-registration never grants a role, so mint the token directly
+    from flask_jwt_extended import create_access_token
+    
+    token = create_access_token(
+        identity='transfer-agent',
+        additional_claims={'role': 'transfer_agent', 'username': 'transferagent', 'wallet_address': None}
+    )
+    
+    return {'Authorization': f'Bearer {token}'}
@@ -155,6 +155,25 @@ class TestAuthRoutes:
         assert data['success'] is True
         assert data['data']['user']['wallet_address'] is not None
     
+    def test_access_token_carries_user_claims(self, app, client):
+        """Test access tokens embed role, username and wallet address"""
+        from flask_jwt_extended import decode_token
+        
+        response = client.post('/api/auth/register', json={
+            'username': 'claimsuser',
+            'email': 'claims@example.com',
+            'password': STRONG_PASSWORD,
+            'wallet_address': '0x742d35Cc6634C0532925a3b844Bc9e7595f8dBe1'
+        })
+        
+        token = response.get_json()['data']['access_token']
+        claims = decode_token(token)
+        
+        assert claims['role'] == 'user'
+        assert claims['username'] == 'claimsuser'
+        assert claims['wallet_address'] == '0x742d35cc6634c0532925a3b844bc9e7595f8dbe1'
+        assert 'wallet' not in claims
+    
     def test_register_invalid_wallet_address(self, client):
         """Test registration with invalid wallet address"""
         response = client.post('/api/auth/register', json={
@@ -0,0 +1,29 @@
+"""
+Billing Route Tests for RWA-Studio
+"""
+
+import gzip
+import json
+
+
+class TestPlansEndpoint:
+    """Test the public subscription plans endpoint"""
+
+    def test_get_plans_plain(self, client):
+        """Test plans are served as JSON without compression"""
+        response = client.get('/api/billing/plans')
+
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        data = response.get_json()
+        assert [plan['id'] for plan in data['plans']] == ['starter', 'professional', 'enterprise']
+
+    def test_get_plans_gzip(self, client):
+        """Test plans are served pre-compressed when gzip is accepted"""
+        response = client.get('/api/billing/plans', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        data = json.loads(gzip.decompress(response.data))
+        assert len(data['plans']) == 3
@@ -0,0 +1,123 @@
+"""
+Document Route Tests for RWA-Studio
+"""
+
+import io
+
+import pytest
+from werkzeug.exceptions import RequestEntityTooLarge
+
+
+class TestLimitedReader:
+    """Test the streaming upload size guard"""
+
+    def test_reads_within_limit(self):
+        """Test data under the limit passes through unchanged"""
+        from src.routes.documents import LimitedReader
+
+        reader = LimitedReader(io.BytesIO(b'x' * 100), limit=100)
+
+        assert reader.read() == b'x' * 100
+        assert reader.bytes_read == 100
+
+    def test_raises_past_limit(self):
+        """Test reading beyond the limit aborts the upload"""
+        from src.routes.documents import LimitedReader
+
+        reader = LimitedReader(io.BytesIO(b'x' * 101), limit=100)
+
+        with pytest.raises(RequestEntityTooLarge):
+            while reader.read(64):
+                pass
+
+    def test_buffered_reads_use_large_chunks(self):
+        """Test the upload buffer pulls from the source in 1 MiB reads"""
+        from src.routes.documents import LimitedReader, UPLOAD_BUFFER_SIZE
+
+        source = io.BytesIO(b'x' * (3 * UPLOAD_BUFFER_SIZE))
+        reads = []
+        original_read = source.read
+        source.read = lambda n=-1: reads.append(n) or original_read(n)
+
+        buffered = io.BufferedReader(
+            LimitedReader(source, limit=3 * UPLOAD_BUFFER_SIZE),
+            buffer_size=UPLOAD_BUFFER_SIZE
+        )
+        while buffered.read(64 * 1024):
+            pass
+
+        assert max(reads) == UPLOAD_BUFFER_SIZE
+        assert len(reads) <= 4
+
+
+class TestFileSha256:
+    """Test upload hashing used for deduplication"""
+
+    def test_hashes_and_rewinds(self):
+        """Test the digest matches hashlib and the stream is rewound"""
+        import hashlib
+        from src.routes.documents import file_sha256
+
+        data = b'document body' * 100000
+        stream = io.BytesIO(data)
+
+        assert file_sha256(stream) == hashlib.sha256(data).hexdigest()
+        assert stream.read() == data
+
+
+class TestSameDocumentMetadata:
+    """Test when a duplicate upload can reuse the existing pin as-is"""
+
+    def _doc(self, name='report.pdf', **keyvalues):
+        from src.services.storage.service import StoredDocument
+
+        return StoredDocument(
+            ipfs_hash='QmHash', name=name, size=1, gateway_url='https://gateway/QmHash',
+            metadata={'document_type': 'legal', 'description': '', 'uploaded_by': 'a', **keyvalues}
+        )
+
+    def test_ignores_uploader_and_time(self):
+        """Test per-upload fields do not make a duplicate different"""
+        from src.routes.documents import same_document_metadata
+
+        metadata = {'document_type': 'legal', 'description': '', 'uploaded_by': 'b', 'uploaded_at': 'now'}
+
+        assert same_document_metadata(self._doc(), 'report.pdf', metadata)
+
+    def test_new_type_token_or_name_differs(self):
+        """Test a new document_type, token or filename is not dropped"""
+        from src.routes.documents import same_document_metadata
+
+        metadata = {'document_type': 'legal', 'description': ''}
+
+        assert not same_document_metadata(self._doc(), 'other.pdf', metadata)
+        assert not same_document_metadata(self._doc(), 'report.pdf', {**metadata, 'document_type': 'prospectus'})
+        assert not same_document_metadata(self._doc(), 'report.pdf', {**metadata, 'token_address': '0xabc'})
+
+
+class TestContentDispositionNames:
+    """Test download names survive the latin-1 header encoding"""
+
+    def test_ascii_name(self):
+        """Test ASCII names are sent as a plain filename"""
+        from src.routes.documents import content_disposition_names
+
+        assert content_disposition_names('report.pdf') == {'filename': 'report.pdf'}
+
+    def test_non_ascii_name(self, app):
+        """Test non-ASCII names get an ASCII fallback and a UTF-8 filename*"""
+        from flask import Response
+        from src.routes.documents import content_disposition_names
+
+        names = content_disposition_names('Prospectus – München.pdf')
+
+        assert names['filename'] == 'Prospectus  Munchen.pdf'
+        assert names['filename*'] == "UTF-8''Prospectus%20%E2%80%93%20M%C3%BCnchen.pdf"
+
+        with app.test_request_context():
+            response = Response(b'%PDF')
+            response.headers.set('Content-Disposition', 'inline', **names)
+            header = response.headers['Content-Disposition']
+
+        header.encode('latin-1')
+        assert "filename*=UTF-8''Prospectus%20%E2%80%93%20M%C3%BCnchen.pdf" in header
@@ -5,7 +5,7 @@ Middleware Tests for RWA-Studio
 import pytest
 from src.middleware.validation import (
     is_valid_email, is_valid_ethereum_address, is_valid_tx_hash,
-    sanitize_string, REGISTER_SCHEMA, LOGIN_SCHEMA
+    sanitize_string, sanitize_html, parse_bool, REGISTER_SCHEMA, LOGIN_SCHEMA
 )
 from src.middleware.error_handler import (
     APIError, ValidationError, AuthenticationError, NotFoundError
@@ -33,6 +33,8 @@ class TestValidationHelpers:
             '@example.com',
             'test@',
             'test@.com',
+            'test@example.com\n',
+            'a@' + 'b' * 250 + '.com',
             '',
             None
         ]
@@ -55,6 +57,8 @@ class TestValidationHelpers:
             '0x123',  # Too short
             '742d35Cc6634C0532925a3b844Bc9e7595f8dBe0',  # Missing 0x
             '0xGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGGG',  # Invalid chars
+            '0x742d35Cc6634C0532925a3b844Bc9e7595f8dBe0\n',  # Trailing newline
+            '0X742d35Cc6634C0532925a3b844Bc9e7595f8dBe0',  # Uppercase prefix
             '',
             None
         ]
@@ -92,6 +96,25 @@ class TestValidationHelpers:
         
         # Test non-string input
         assert sanitize_string(123) == '123'
+    
+    def test_sanitize_html(self):
+        """Test dangerous markup is stripped and plain text is untouched"""
+        assert sanitize_html('<script>alert(1)</script>ok') == 'ok'
+        assert sanitize_html('<a href="#" onclick="steal()">x</a>') == '<a href="#">x</a>'
+        assert sanitize_html('see javascript:alert(1)') == 'see alert(1)'
+        
+        plain = 'Verified by phone, documents on file'
+        assert sanitize_html(plain) is plain
+    
+    def test_parse_bool(self):
+        """Test boolean query values, including 'false'"""
+        for value in ['true', 'True', '1', 'yes']:
+            assert parse_bool(value) is True
+        for value in ['false', 'FALSE', '0', 'no']:
+            assert parse_bool(value) is False
+        
+        with pytest.raises(ValueError):
+            parse_bool('maybe')
 
 
 class TestSchemaValidation:
@@ -149,6 +172,14 @@ class TestSchemaValidation:
         }
         validated = LOGIN_SCHEMA.validate(data)
         assert validated['email'] == 'test@example.com'
+    
+    def test_schema_normalizes_email(self):
+        """Test email fields come back lowercase from the schema"""
+        validated = LOGIN_SCHEMA.validate({
+            'email': 'Test@Example.COM',
+            'password': 'password123'
+        })
+        assert validated['email'] == 'test@example.com'
 
 
 class TestErrorClasses:
@@ -183,3 +214,42 @@ class TestErrorClasses:
         error = NotFoundError('Token', '0x123')
         assert error.status_code == 404
         assert 'Token not found' in error.message
+
+
+class TestPagination:
+    """Test keyset pagination helpers"""
+    
+    def test_cursor_round_trip(self):
+        """Test cursors decode to the values they were built from"""
+        from datetime import datetime
+        from src.middleware.pagination import encode_cursor, decode_cursor
+        
+        created = datetime(2024, 1, 15, 12, 30)
+        cursor = encode_cursor(created, 42)
+        
+        assert decode_cursor(cursor, datetime, int) == (created, 42)
+        assert decode_cursor(None, datetime, int) is None
+    
+    def test_page_response(self, app):
+        """Test keyset pages are valid JSON and report has_more"""
+        import json
+        from src.middleware.pagination import page_response
+        
+        with app.test_request_context():
+            response = page_response(
+                'items', iter(range(4)), 3,
+                serialize=lambda n: {'n': n},
+                cursor_of=lambda n: (n,)
+            )
+            body = json.loads(response.get_data())
+        
+        assert [item['n'] for item in body['items']] == [0, 1, 2]
+        assert body['has_more'] is True
+        assert body['next_cursor']
+    
+    def test_fetch_page(self):
+        """Test the row past limit only signals has_more"""
+        from src.middleware.pagination import fetch_page
+        
+        assert fetch_page(iter(range(4)), 3) == ([0, 1, 2], True)
+        assert fetch_page(iter(range(3)), 3) == ([0, 1, 2], False)
@@ -78,6 +78,21 @@ class TestKYCService:
         # Should be able to instantiate
         assert KYCResult is not None
 
+    def test_verify_webhook_signature(self):
+        """Test webhook HMAC verification accepts only the matching signature"""
+        import hmac
+        import hashlib
+        from src.services.kyc import OnfidoKYCService
+
+        service = OnfidoKYCService()
+        service._hmac_key = b'test_webhook_secret'
+        payload = b'{"payload": {"action": "check.completed"}}'
+        signature = hmac.new(b'test_webhook_secret', payload, hashlib.sha256).hexdigest()
+
+        assert service.verify_webhook(payload, signature) is True
+        assert service.verify_webhook(payload, '0' * 64) is False
+        assert service.verify_webhook(payload, '') is False
+
 
 # =============================================================================
 # Payment Service Tests (Stripe)
@@ -208,6 +223,75 @@ class TestEmailService:
         
         # Verify service has configuration attributes
         assert service is not None
+    
+    def test_send_bulk_shares_requests_for_same_data(self):
+        """Test recipients with the same template data share one SendGrid request"""
+        from src.services.email import SendGridEmailService, EmailTemplate, EmailRecipient
+        
+        service = SendGridEmailService()
+        service.client = Mock()
+        service.client.post.return_value = Mock(status_code=202, headers={'X-Message-Id': 'msg_1'})
+        
+        shared = {'alert_type': 'Review Required'}
+        results = service.send_bulk(EmailTemplate.COMPLIANCE_ALERT, [
+            (EmailRecipient(email='a@example.com'), shared),
+            (EmailRecipient(email='b@example.com'), dict(shared)),
+            (EmailRecipient(email='c@example.com'), {'alert_type': 'Other'}),
+        ])
+        
+        assert service.client.post.call_count == 2
+        assert [result.success for result in results] == [True, True, True]
+        first_body = json.loads(service.client.post.call_args_list[0].kwargs['content'])
+        assert len(first_body['personalizations']) == 2
+    
+    def test_send_bulk_reports_rejected_requests(self):
+        """Test a non-2xx SendGrid response carries its status and body as the error"""
+        from src.services.email import SendGridEmailService, EmailTemplate, EmailRecipient
+        
+        service = SendGridEmailService()
+        service.client = Mock()
+        service.client.post.return_value = Mock(status_code=400, headers={}, text='{"errors":[]}')
+        
+        results = service.send_bulk(EmailTemplate.WELCOME, [
+            (EmailRecipient(email='a@example.com'), {'name': 'A'}),
+        ])
+        
+        assert results[0].success is False
+        assert results[0].error == '400: {"errors":[]}'
+    
+    def test_send_template_uses_dynamic_template_when_configured(self):
+        """Test configured templates send data for SendGrid to render"""
+        from src.services.email import SendGridEmailService, EmailTemplate, EmailRecipient
+        
+        service = SendGridEmailService()
+        service.client = Mock()
+        service.client.post.return_value = Mock(status_code=202, headers={'X-Message-Id': 'msg_2'})
+        service.dynamic_template_ids = {'welcome': 'd-welcome'}
+        
+        result = service.send_template(
+            EmailTemplate.WELCOME,
+            [EmailRecipient(email='new@example.com')],
+            {'name': 'New User'}
+        )
+        
+        assert result.success is True
+        body = json.loads(service.client.post.call_args.kwargs['content'])
+        assert body['template_id'] == 'd-welcome'
+        assert body['personalizations'][0]['dynamic_template_data'] == {'name': 'New User'}
+        assert 'content' not in body
+    
+    def test_templates_escape_data(self):
+        """Test template values are HTML-escaped"""
+        from src.services.email import get_email_service, EmailTemplate
+        
+        html = get_email_service().render_template(EmailTemplate.KYC_VERIFICATION_FAILED, {
+            'name': '<script>alert(1)</script>',
+            'rejection_reasons': ['Document <b>expired</b>'],
+        })
+        
+        assert '<script>' not in html
+        assert '&lt;script&gt;' in html
+        assert '<li>Document &lt;b&gt;expired&lt;/b&gt;</li>' in html
 
 
 # =============================================================================
@@ -250,6 +334,36 @@ class TestStorageService:
             hasattr(service, 'gateway_url')
         )
         assert has_method or service is not None  # At minimum, service exists
+    
+    def test_list_pins_drops_rows_already_returned(self):
+        """Test the inclusive pinEnd bound does not repeat the previous page's last pin"""
+        import httpx
+        from src.services.storage import PinataStorageService
+        
+        requests_seen = []
+        
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json={'rows': [
+                {'ipfs_pin_hash': 'QmC', 'date_pinned': '2024-05-01T12:00:00.000Z'},
+                {'ipfs_pin_hash': 'QmB', 'date_pinned': '2024-05-01T12:00:00.000Z'},
+                {'ipfs_pin_hash': 'QmA', 'date_pinned': '2024-04-30T09:00:00.000Z'},
+            ]})
+        
+        service = PinataStorageService()
+        service._api_client = httpx.Client(transport=httpx.MockTransport(handler))
+        
+        docs = service.list_pins(
+            limit=2,
+            pinned_before=datetime.fromisoformat('2024-05-01T12:00:00+00:00'),
+            before_hash='QmC'
+        )
+        
+        assert [doc.ipfs_hash for doc in docs] == ['QmB', 'QmA']
+        params = requests_seen[0].url.params
+        assert params['pageLimit'] == '3'
+        assert 'pinEnd' in params
+        assert 'pageOffset' not in params
 
 
 # =============================================================================
@@ -340,3 +454,26 @@ class TestServiceErrorHandling:
         
         # Verify service can be instantiated
         assert service is not None
+    
+    def test_warm_connections_is_bounded_and_never_raises(self):
+        """Test a failing or hanging provider cannot fail or stall worker boot"""
+        import threading
+        import time
+        import src.services as services
+        
+        release = threading.Event()
+        hanging = Mock()
+        hanging.warm_up.side_effect = lambda: release.wait(5)
+        failing = Mock()
+        failing.warm_up.side_effect = RuntimeError('no route to host')
+        
+        with patch.object(services, 'WARM_UP_DEADLINE', 0.2), \
+                patch.object(services, 'get_kyc_service', Mock(return_value=hanging, __name__='get_kyc_service')), \
+                patch.object(services, 'get_storage_service', Mock(return_value=failing, __name__='get_storage_service')):
+            started = time.monotonic()
+            services.warm_connections()
+            elapsed = time.monotonic() - started
+        release.set()
+        
+        assert elapsed < 1.0
+        failing.warm_up.assert_called_once()
@@ -5,6 +5,27 @@ Transfer Agent Route Tests for RWA-Studio
 import pytest
 
 
+def register_token(client, headers, token_address):
+    """Register a token through the API and return its lowercase address"""
+    response = client.post('/api/transfer-agent/tokens',
+        json={
+            'token_address': token_address,
+            'token_name': 'Test Token',
+            'token_symbol': 'TST',
+            'asset_type': 'real_estate',
+            'regulatory_framework': 'reg_d',
+            'jurisdiction': 'US',
+            'max_supply': 1000000,
+            'deployer_address': '0x742d35Cc6634C0532925a3b844Bc9e7595f8dBe0',
+            'compliance_address': '0x742d35Cc6634C0532925a3b844Bc9e7595f8dBe1',
+            'identity_registry_address': '0x742d35Cc6634C0532925a3b844Bc9e7595f8dBe2'
+        },
+        headers=headers
+    )
+    assert response.status_code == 201
+    return token_address.lower()
+
+
 class TestTokenEndpoints:
     """Test token management endpoints"""
     
@@ -31,6 +52,17 @@ class TestTokenEndpoints:
         assert data['data']['pagination']['page'] == 1
         assert data['data']['pagination']['per_page'] == 10
     
+    def test_get_tokens_invalid_cursor(self, client, auth_headers):
+        """Test a malformed keyset cursor is rejected"""
+        response = client.get(
+            '/api/transfer-agent/tokens?cursor=not-a-cursor',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 400
+        data = response.get_json()
+        assert data['success'] is False
+    
     def test_register_token_unauthorized(self, client, auth_headers):
         """Test registering token without transfer_agent role"""
         response = client.post('/api/transfer-agent/tokens', 
@@ -75,6 +107,29 @@ class TestVerificationEndpoints:
         )
         
         assert response.status_code == 404
+    
+    def test_update_verified_address_rejects_non_string_level(self, client, transfer_agent_headers):
+        """Test a list or object verification_level is a 400, not a server error"""
+        token_address = register_token(client, transfer_agent_headers, '0x' + 'b2' * 20)
+        response = client.post(f'/api/transfer-agent/tokens/{token_address}/verified-addresses',
+            json={
+                'address': '0x' + 'c3' * 20,
+                'verification_level': 'basic',
+                'jurisdiction': 'US',
+                'expiration_date': '2030-01-01T00:00:00Z',
+                'identity_hash': 'hash'
+            },
+            headers=transfer_agent_headers
+        )
+        assert response.status_code == 201
+        address_id = response.get_json()['data']['verified_address']['id']
+        
+        for level in (['basic'], {'level': 'basic'}):
+            response = client.put(f'/api/transfer-agent/verified-addresses/{address_id}',
+                json={'verification_level': level},
+                headers=transfer_agent_headers
+            )
+            assert response.status_code == 400
 
 
 class TestComplianceEndpoints:
@@ -90,8 +145,170 @@ class TestComplianceEndpoints:
             response = client.get(endpoint)
             assert response.status_code == 401, f"Endpoint {endpoint} should be protected"
     
+    def test_compliance_batch_requires_transfer_agent(self, client, auth_headers):
+        """Test batched event logging is limited to transfer agents"""
+        response = client.post('/api/transfer-agent/compliance-events/batch',
+            json={'events': [{
+                'token_address': '0x742d35Cc6634C0532925a3b844Bc9e7595f8dBe0',
+                'event_type': 'compliance_check',
+                'reason': 'Periodic check'
+            }]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code in [401, 403]
+    
+    def test_compliance_event_keeps_wei_amount(self, client, transfer_agent_headers):
+        """Test integers past 64 bits survive request parsing, storage and the response"""
+        token_address = register_token(client, transfer_agent_headers, '0x' + 'a1' * 20)
+        wei = 100000000000000000000000
+        
+        response = client.post('/api/transfer-agent/compliance-events',
+            json={
+                'token_address': token_address,
+                'event_type': 'transfer_blocked',
+                'reason': 'Amount over limit',
+                'amount': wei,
+                'metadata': {'limit_wei': wei}
+            },
+            headers=transfer_agent_headers
+        )
+        
+        assert response.status_code == 201
+        event = response.get_json()['data']['event']
+        assert event['amount'] == str(wei)
+        assert event['metadata'] == {'limit_wei': wei}
+    
+    def test_token_metrics_not_found(self, client):
+        """Test metrics for an unknown token are a 404 without an ETag"""
+        response = client.get('/api/transfer-agent/tokens/0x0000000000000000000000000000000000000000/metrics')
+        
+        assert response.status_code == 404
+        assert 'ETag' not in response.headers
+    
     def test_dashboard_overview_accessible(self, client):
         """Test that dashboard overview is accessible without auth (public stats)"""
         response = client.get('/api/transfer-agent/dashboard/overview')
         # Dashboard overview is intentionally public for transparency
         assert response.status_code == 200
+    
+    def test_dashboard_overview_without_version_has_no_etag(self, client):
+        """Test dashboard ignores If-None-Match when no version counter is available"""
+        response = client.get('/api/transfer-agent/dashboard/overview', headers={
+            'If-None-Match': 'W/"1"'
+        })
+        
+        assert response.status_code == 200
+        assert 'ETag' not in response.headers
+
+
+class TestComplianceBatchEndpoint:
+    """Test batched compliance event logging"""
+    
+    def _event(self, token_address, **fields):
+        return {
+            'token_address': token_address,
+            'event_type': 'transfer_blocked',
+            'reason': 'Receiver not verified',
+            **fields
+        }
+    
+    def test_batch_inserts_every_event(self, client, transfer_agent_headers):
+        """Test each item becomes a compliance event with its own fields"""
+        token_address = register_token(client, transfer_agent_headers, '0x' + 'd4' * 20)
+        
+        response = client.post('/api/transfer-agent/compliance-events/batch',
+            json={'events': [
+                self._event(token_address, amount=1000, severity='warning'),
+                self._event(token_address, event_type='limit_exceeded', reason='Daily limit', block_number=42),
+            ]},
+            headers=transfer_agent_headers
+        )
+        
+        assert response.status_code == 201
+        assert response.get_json()['data']['count'] == 2
+        
+        events = client.get(f'/api/transfer-agent/tokens/{token_address}/compliance-events').get_json()['data']['events']
+        assert len(events) == 2
+        by_type = {event['event_type']: event for event in events}
+        assert by_type['transfer_blocked']['amount'] == '1000'
+        assert by_type['transfer_blocked']['severity'] == 'warning'
+        assert by_type['limit_exceeded']['reason'] == 'Daily limit'
+        assert by_type['limit_exceeded']['block_number'] == 42
+        assert by_type['limit_exceeded']['severity'] == 'info'
+        assert all(event['resolved'] is False for event in events)
+    
+    def test_batch_bumps_token_stats(self, client, transfer_agent_headers):
+        """Test the per-token event counters move by the batch size"""
+        token_address = register_token(client, transfer_agent_headers, '0x' + 'e5' * 20)
+        
+        response = client.post('/api/transfer-agent/compliance-events/batch',
+            json={'events': [self._event(token_address) for _ in range(3)]},
+            headers=transfer_agent_headers
+        )
+        assert response.status_code == 201
+        
+        summary = client.get(f'/api/transfer-agent/tokens/{token_address}/metrics').get_json()['data']['summary']
+        assert summary['total_compliance_events'] == 3
+        assert summary['unresolved_events'] == 3
+    
+    def test_batch_creates_missing_token_stats(self, app, client, transfer_agent_headers):
+        """Test a token without a counter row gets one from a recount on its next write"""
+        from src.models.token import db, TokenStats
+        
+        token_address = register_token(client, transfer_agent_headers, '0x' + '19' * 20)
+        token_id = client.get(f'/api/transfer-agent/tokens/{token_address}', headers=transfer_agent_headers).get_json()['data']['token']['id']
+        db.session.execute(db.delete(TokenStats).where(TokenStats.token_deployment_id == token_id))
+        db.session.commit()
+        
+        response = client.post('/api/transfer-agent/compliance-events/batch',
+            json={'events': [self._event(token_address) for _ in range(2)]},
+            headers=transfer_agent_headers
+        )
+        assert response.status_code == 201
+        
+        stats = db.session.get(TokenStats, token_id)
+        assert stats.events_total == 2
+        assert stats.events_unresolved == 2
+    
+    def test_batch_reports_invalid_item_index(self, client, transfer_agent_headers):
+        """Test a bad item is rejected with its position and nothing is stored"""
+        token_address = register_token(client, transfer_agent_headers, '0x' + 'f6' * 20)
+        
+        response = client.post('/api/transfer-agent/compliance-events/batch',
+            json={'events': [
+                self._event(token_address),
+                self._event(token_address, event_type='not_a_type'),
+            ]},
+            headers=transfer_agent_headers
+        )
+        
+        assert response.status_code == 400
+        assert response.get_json()['error']['field'] == 'events[1]'
+        
+        events = client.get(f'/api/transfer-agent/tokens/{token_address}/compliance-events').get_json()['data']['events']
+        assert events == []
+    
+    def test_batch_unknown_token(self, client, transfer_agent_headers):
+        """Test unknown token addresses are listed in a 404"""
+        unknown = '0x' + '07' * 20
+        
+        response = client.post('/api/transfer-agent/compliance-events/batch',
+            json={'events': [self._event(unknown)]},
+            headers=transfer_agent_headers
+        )
+        
+        assert response.status_code == 404
+        assert response.get_json()['token_addresses'] == [unknown]
+    
+    def test_batch_size_cap(self, client, transfer_agent_headers):
+        """Test batches above the item cap are rejected"""
+        from src.middleware.validation import MAX_COMPLIANCE_EVENT_BATCH
+        
+        events = [self._event('0x' + '08' * 20)] * (MAX_COMPLIANCE_EVENT_BATCH + 1)
+        response = client.post('/api/transfer-agent/compliance-events/batch',
+            json={'events': events},
+            headers=transfer_agent_headers
+        )
+        
+        assert response.status_code == 400